@@ -5,7 +5,7 @@ For Gaurav Rajput (DevOps Engineer)
 """
 import sys
 import os
-import time
+import asyncio
 import argparse
 from datetime import datetime
 
@@ -15,6 +15,8 @@ from src.auto_apply.link_extractor import LinkExtractor
 from src.auto_apply.job_filter import JobFilter
 from src.auto_apply.email_sender import EmailApplicationSender
 from src.auto_apply.tracker import ApplicationTracker
+from src.auto_apply.dispatcher import ApplicationDispatcher
+from config.settings import AUTO_APPLY
 from src.utils.logger import get_logger
 
 logger = get_logger('auto_apply')
@@ -36,6 +38,12 @@ def main():
                        help='Minimum skill match score percentage')
     parser.add_argument('--email-only', action='store_true', 
                        help='Only apply to jobs with email applications')
+    parser.add_argument('--concurrency', type=int, default=AUTO_APPLY['concurrency'], 
+                       help='Parallel email send workers')
+    parser.add_argument('--rate-per-minute', type=float, default=AUTO_APPLY['rate_per_minute'], 
+                       help='Maximum emails per minute overall')
+    parser.add_argument('--domain-rate-per-minute', type=float, default=AUTO_APPLY['domain_rate_per_minute'], 
+                       help='Maximum emails per minute to one recipient domain')
     
     args = parser.parse_args()
     
@@ -100,70 +108,60 @@ def main():
         print(f"   • Email-ready jobs in filtered set: {len(filtered_email_jobs)}")
     else:
         print("   • Email-ready jobs in filtered set: 0")
-    
-    # Prioritize email jobs by moving them to the front
-    email_jobs = [j for j in filtered_jobs if j.get('application_type') == 'email']
-    non_email_jobs = [j for j in filtered_jobs if j.get('application_type') != 'email']
-    filtered_jobs = email_jobs + non_email_jobs
     print()
     
     # Step 3: Apply to jobs
     print(f"📧 Step 3: Applying to jobs...")
     print(f"   Mode: {'DRY RUN' if args.dry_run else 'LIVE'}")
+    print(f"   Workers: {args.concurrency} | Rate: {args.rate_per_minute}/min overall, "
+          f"{args.domain_rate_per_minute}/min per recipient domain")
     print()
     
-    applications_sent = 0
     remaining_quota = args.max_applications - stats['today']
     
-    for i, job in enumerate(filtered_jobs):
+    # One query for everything already applied to (instead of one per job)
+    applied_ids = tracker.get_applied_message_ids()
+    new_jobs = [j for j in filtered_jobs if j['message_id'] not in applied_ids]
+    email_jobs = [j for j in new_jobs if j['application_type'] == 'email']
+    manual_jobs = [] if args.email_only else [j for j in new_jobs if j['application_type'] != 'email']
+    
+    def report(job, result):
+        # Recorded as each send completes, so an interrupted run never re-sends
+        if not args.dry_run:
+            tracker.record_application(job, 'sent' if result['status'] == 'sent' else 'failed')
+        print(f"\n📧 Job: {job['message_text'].split(chr(10))[0][:60]}...")
+        print(f"   Group: {job['group_name']}")
+        print(f"   Match Score: {job.get('match_score', 0):.1f}%")
+        print(f"   Email: {job['application_link']}")
+        if result['status'] in ['sent', 'dry_run']:
+            print(f"   ✅ Application {'would be ' if args.dry_run else ''}sent!")
+            if result.get('cc'):
+                print(f"   📋 CC: {result['cc']}")
+        else:
+            print(f"   ❌ Failed: {result.get('error', 'Unknown error')}")
+    
+    dispatcher = ApplicationDispatcher(
+        email_sender,
+        concurrency=args.concurrency,
+        rate_per_minute=args.rate_per_minute,
+        domain_rate_per_minute=args.domain_rate_per_minute,
+        dry_run=args.dry_run
+    )
+    # Dry runs send nothing, so they preview every email job
+    results = asyncio.run(dispatcher.dispatch(
+        email_jobs,
+        quota=None if args.dry_run else remaining_quota,
+        on_result=report
+    ))
+    
+    applications_sent = 0
+    if not args.dry_run:
+        applications_sent = sum(1 for _, result in results if result['status'] == 'sent')
         if applications_sent >= remaining_quota:
             print(f"\n⚠️  Reached daily limit ({args.max_applications} applications)")
-            break
-        
-        # Skip if already applied
-        if tracker.is_already_applied(job['message_id']):
-            logger.debug(f"Already applied to job {job['message_id']}")
-            continue
-        
-        # Filter for email-only if requested
-        if args.email_only and job['application_type'] != 'email':
-            continue
-        
-        # Apply based on type
-        if job['application_type'] == 'email':
-            print(f"\n📧 Job {i+1}: {job['message_text'].split(chr(10))[0][:60]}...")
-            print(f"   Group: {job['group_name']}")
-            print(f"   Match Score: {job.get('match_score', 0):.1f}%")
-            print(f"   Email: {job['application_link']}")
-            
-            # Send application
-            result = email_sender.send_application(
-                job['application_link'], 
-                job, 
-                dry_run=args.dry_run
-            )
-            
-            if result['status'] in ['sent', 'dry_run']:
-                print(f"   ✅ Application {'would be ' if args.dry_run else ''}sent!")
-                if result.get('cc'):
-                    print(f"   📋 CC: {result['cc']}")
-                
-                # Track application
-                if not args.dry_run:
-                    tracker.record_application(job, 'sent')
-                    applications_sent += 1
-                    
-                    # Delay between applications
-                    if applications_sent < remaining_quota:
-                        delay = 10  # 10 seconds between emails
-                        print(f"   ⏳ Waiting {delay} seconds...")
-                        time.sleep(delay)
-            else:
-                print(f"   ❌ Failed: {result.get('error', 'Unknown error')}")
-                if not args.dry_run:
-                    tracker.record_application(job, 'failed')
-        
-        elif job['application_type'] == 'linkedin':
+    
+    for i, job in enumerate(manual_jobs):
+        if job['application_type'] == 'linkedin':
             print(f"\n🔗 Job {i+1}: LinkedIn (Manual action required)")
             print(f"   Link: {job['application_link']}")
             print(f"   Match Score: {job.get('match_score', 0):.1f}%")
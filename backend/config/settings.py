@@ -63,7 +63,11 @@ PATHS = {
     'json': os.path.join(PROJECT_ROOT, 'data/json/'),
     'database': os.path.join(PROJECT_ROOT, 'data/database/'),
     'sessions': os.path.join(PROJECT_ROOT, 'sessions/'),
-    'groups_json': os.path.join(PROJECT_ROOT, 'data.json')
+    'groups_json': os.path.join(PROJECT_ROOT, 'data.json'),
+    'metrics': os.path.join(PROJECT_ROOT, 'data/metrics/'),
+    'profiles': os.path.join(PROJECT_ROOT, 'data/profiles/'),
+    'backups': os.path.join(PROJECT_ROOT, 'data/backups/'),
+    'archive': os.path.join(PROJECT_ROOT, 'data/archive/')
 }
 
 # Job Keywords
@@ -105,7 +109,13 @@ JOB_KEYWORDS = {
 LOGGING = {
     'level': 'INFO',
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    'date_format': '%Y-%m-%d %H:%M:%S'
+    'date_format': '%Y-%m-%d %H:%M:%S',
+    'backend': 'queue',  # 'queue' = background writer thread, 'sync' = write inline
+    'rotation': 'size',  # 'size', 'time' or None
+    'max_bytes': 10 * 1024 * 1024,  # Size rotation threshold (10MB)
+    'when': 'midnight',  # Time rotation interval
+    'backup_count': 7,
+    'structured': False  # True = JSON lines (.jsonl) log files
 }
 
 # CSV Columns
@@ -124,6 +134,93 @@ CSV_COLUMNS = {
 RUNTIME = {
     'check_interval': 3600,
     'total_days': 30,
-    'startup_delay': (5, 15)
+    'startup_delay': (5, 15),
+    'resume_max_age_hours': 24  # An interrupted cycle older than this is dropped, not resumed
 }
 
+
+# Cheap non-job prefilter in front of MessageClassifier.classify
+PREFILTER = {
+    'enabled': True,
+    'min_words': 4,  # Shorter texts never reach classification (0 = off)
+    'short_words': 10,  # Texts up to this long also need contact / apply details (0 = off)
+    'audit_every': 50  # Fully classify every Nth rejected text: measures CPU saved and false rejects
+}
+
+# Ingest pipeline in fetch_messages: fetch -> filter -> enrich -> persist,
+# joined by bounded queues (a full queue pauses the stage before it).
+# Benchmark the stages with scripts/benchmark_pipeline.py before scaling one
+INGEST_PIPELINE = {
+    'workers': 4,  # Thread pool for the offloaded stages and CSV writes
+    'queue_size': 50,  # Items buffered in front of each stage
+    # Prefilter + content hash: ~10us/msg, cheaper than a thread hand-off, so on the loop
+    'filter': {'concurrency': 1, 'batch_size': 25, 'offload': False},
+    # Classify + near-duplicate lookup + verify + link extraction (cross-posts skip the last two)
+    'enrich': {'concurrency': 2, 'batch_size': 5, 'offload': True},
+    # Re-posts, DB + CSV: one transaction per batch, so it waits up to
+    # linger seconds for a fuller batch. Always one worker (owns the indexes)
+    'persist': {'batch_size': 20, 'linger': 0.05}
+}
+
+# Near-duplicate (cross-post) detection
+NEAR_DUPLICATE = {
+    'enabled': True,
+    'shingle_size': 3,  # Words per shingle fed into the SimHash
+    'max_hamming_distance': 3,  # <= 3 of 64 bits differ = same job
+    'window_days': 30  # Only clusters seen this recently are kept in memory
+}
+
+# Auto-apply dispatch (auto_apply.py)
+AUTO_APPLY = {
+    'concurrency': 4,  # Parallel send workers (one SMTP session each)
+    'rate_per_minute': 20,  # All emails combined
+    'burst': 5,
+    'domain_rate_per_minute': 2,  # Per recipient domain, e.g. company.com
+    'domain_burst': 1
+}
+
+# SQLite backup and compaction (src/utils/maintenance.py run_database_maintenance)
+DB_MAINTENANCE = {
+    'backup_interval_hours': 24,
+    'backup_keep': 7,  # Newest backups kept in PATHS['backups']
+    'backup_pages_per_step': 256,  # Pages copied per step of the online backup
+    'backup_step_sleep': 0.05,  # Seconds between steps, writers get the lock here
+    'checkpoint_interval_minutes': 60,  # wal_checkpoint(TRUNCATE)
+    'optimize_interval_hours': 24,  # PRAGMA optimize
+    'vacuum_interval_hours': 24,  # PRAGMA incremental_vacuum
+    'incremental_vacuum_pages': 2000,  # Free pages returned to the OS per run
+    'full_vacuum_free_ratio': 0.2  # Offline only: VACUUM once into incremental mode above this
+}
+
+# Monthly archive of old messages (src/storage/archive.py)
+ARCHIVE = {
+    'enabled': True,
+    'max_age_days': 90,  # Older messages move to data/archive/messages_YYYY_MM.db
+    'interval_hours': 24  # How often maintenance runs the archiver
+}
+
+# Per-group activity counters and anomaly scores (src/services/group_trends.py)
+GROUP_TRENDS = {
+    'enabled': True,
+    'retention_days': 60,  # Hourly buckets older than this are pruned by maintenance
+    'prune_interval_hours': 24,
+    'window_days': 14,  # Daily history the EWMA / z-score is computed over
+    'ewma_alpha': 0.3,
+    'z_threshold': 3.0,  # |z| at or above this = spike / drop / spam
+    'dead_after_days': 7,  # Fetched but no jobs for this long = dead group
+    'dead_min_fetches': 3,  # ...over at least this many fetches
+    'dead_fetch_every_n_cycles': 6  # Dead groups are only fetched every Nth cycle
+}
+
+# Sharded multi-process fetching (python run.py --writer / --worker).
+# One writer process owns the database and CSV files; workers on this or
+# other hosts lease shards of data.json from it over the network
+SHARDING = {
+    'num_shards': 16,  # Groups are split by a stable hash of their link
+    'lease_seconds': 600,  # A crashed worker's shard is taken over after this
+    'heartbeat_seconds': 60,  # Workers renew their lease this often
+    'idle_poll_seconds': 60,  # Worker wait when every shard is leased or fetched recently
+    'writer_host': os.getenv('FETCHER_WRITER_HOST', '127.0.0.1'),  # 0.0.0.0 to accept other hosts
+    'writer_port': int(os.getenv('FETCHER_WRITER_PORT', '50555')),
+    'authkey': os.getenv('FETCHER_WRITER_AUTHKEY', '')  # Required unless the writer is on loopback
+}
@@ -6,36 +6,45 @@ from flask import Flask, render_template, jsonify
 import sqlite3
 import os
 import sys
+import json
+import time
 from datetime import datetime, timedelta
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import PATHS, DATABASE
-from src.services.job_scorer import JobQualityScorer
-from src.utils.location_categorizer import LocationCategorizer
+from src.utils.metrics import metrics, render_prometheus
+
+# NOTE: the shared scorer / categorizer are imported inside the routes that
+# use them so the dashboard process starts without loading them.
 
 app = Flask(__name__)
 
+@app.before_request
+def _start_request_timer():
+    from flask import g
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_time(response):
+    from flask import g
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        metrics.histogram('dashboard_request_seconds', 'Dashboard request latency').observe(
+            time.perf_counter() - started)
+    return response
+
 def get_db_connection():
     """Get database connection"""
+    from src.storage.migrations import migrate
     db_path = os.path.join(PATHS['database'], DATABASE['name'])
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
     
-    # Ensure job_location column exists (migration for existing databases)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT job_location FROM messages LIMIT 1")
-    except sqlite3.OperationalError:
-        # Column doesn't exist, add it
-        try:
-            cursor.execute("ALTER TABLE messages ADD COLUMN job_location TEXT")
-            conn.commit()
-        except sqlite3.OperationalError:
-            # Column might have been added by another process, ignore
-            pass
+    # Schema upgrades run once per process, not per request
+    migrate(db_path)
     
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
     return conn
 
 @app.route('/')
@@ -105,6 +114,10 @@ def get_stats():
     cursor.execute("SELECT COUNT(*) FROM groups")
     groups_count = cursor.fetchone()[0]
     
+    # Identical re-posts of stored jobs (not counted in the job totals above)
+    cursor.execute("SELECT COUNT(*), COUNT(DISTINCT original_message_id) FROM reposts")
+    reposts_count, reposted_jobs_count = cursor.fetchone()
+    
     # Since we don't have verification_score in messages table
     verified_count = 0
     avg_score = 0
@@ -117,6 +130,8 @@ def get_stats():
         'freelance_jobs': freelance_count,
         'fresher_jobs': fresher_count,
         'total_groups': groups_count,
+        'reposts': reposts_count,
+        'reposted_jobs': reposted_jobs_count,
         'verified_jobs': verified_count,
         'avg_verification_score': round(avg_score, 2)
     })
@@ -223,14 +238,15 @@ def get_groups_by_date():
 def get_best_jobs():
     """Get best quality jobs (score >= 60) - both tech and non-tech"""
     from flask import request
+    from src.services.job_scorer import scorer
+    from src.utils.location_categorizer import categorizer
     conn = get_db_connection()
     cursor = conn.cursor()
-    categorizer = LocationCategorizer()
     
     # Get location filter from query parameter
     location_filter = request.args.get('location', None)
     
-    # Base query
+    # Base query (one row per job: cross-posted copies are not scored again)
     query = """
         SELECT 
             message_text,
@@ -240,10 +256,16 @@ def get_best_jobs():
             group_name,
             sender,
             account_used,
-            job_location
+            job_location,
+            (SELECT COUNT(*) FROM messages copies WHERE copies.cluster_id = messages.message_id)
+            + (SELECT COUNT(*) FROM reposts WHERE reposts.original_message_id IN (
+                SELECT message_id FROM messages copies
+                WHERE copies.cluster_id = messages.message_id OR copies.message_id = messages.message_id
+            )) AS cross_posts
         FROM messages
         WHERE job_type IS NOT NULL 
         AND job_type != ''
+        AND (cluster_id IS NULL OR cluster_id = message_id)
     """
     
     # Add location filter if provided
@@ -260,7 +282,6 @@ def get_best_jobs():
     cursor.execute(query)
     
     # Score each job
-    scorer = JobQualityScorer()
     scored_jobs = []
     
     for row in cursor.fetchall():
@@ -323,6 +344,7 @@ def get_best_jobs():
                 'score': score_result['total_score'],
                 'date': row['date'],
                 'group': row['group_name'],
+                'cross_posts': max(row['cross_posts'], 1),
                 'apply_link': score_result['apply_link']
             })
     
@@ -333,16 +355,75 @@ def get_best_jobs():
     conn.close()
     return jsonify(scored_jobs[:50])
 
+@app.route('/api/unique_jobs')
+def get_unique_jobs():
+    """Unique jobs (one per near-duplicate cluster) with how many groups posted each"""
+    from flask import request
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    job_type = request.args.get('job_type')
+    limit = min(request.args.get('limit', 100, type=int), 500)
+    
+    query = """
+        SELECT
+            COALESCE(cluster_id, message_id) AS job_id,
+            COUNT(*) AS cross_posts,
+            SUM((SELECT COUNT(*) FROM reposts WHERE reposts.original_message_id = messages.message_id)) AS reposts,
+            COUNT(DISTINCT group_name) AS groups,
+            MIN(date) AS first_posted,
+            MAX(date) AS last_posted
+        FROM messages
+        WHERE job_type IS NOT NULL AND job_type != ''
+    """
+    params = []
+    if job_type:
+        query += " AND job_type LIKE ?"
+        params.append(f"%{job_type}%")
+    query += """
+        GROUP BY job_id
+        ORDER BY cross_posts DESC, last_posted DESC
+        LIMIT ?
+    """
+    params.append(limit)
+    cursor.execute(query, params)
+    clusters = cursor.fetchall()
+    
+    jobs = []
+    for cluster in clusters:
+        cursor.execute("""
+            SELECT message_text, job_type, group_name, job_location
+            FROM messages WHERE message_id = ?
+        """, (cluster['job_id'],))
+        canonical = cursor.fetchone()
+        if not canonical:
+            continue
+        jobs.append({
+            'job_id': cluster['job_id'],
+            'message': canonical['message_text'],
+            'job_type': canonical['job_type'],
+            'group': canonical['group_name'],
+            'location': canonical['job_location'] or '',
+            'cross_posts': cluster['cross_posts'],
+            'reposts': cluster['reposts'],
+            'groups': cluster['groups'],
+            'first_posted': cluster['first_posted'],
+            'last_posted': cluster['last_posted']
+        })
+    
+    conn.close()
+    return jsonify(jobs)
+
 @app.route('/api/messages/<job_type>')
 def get_messages(job_type):
     """Get messages by type with optional location filter"""
     from flask import request
+    from src.utils.location_categorizer import categorizer
     conn = get_db_connection()
     cursor = conn.cursor()
     
     # Get location filter from query parameter
     location_filter = request.args.get('location', None)
-    categorizer = LocationCategorizer()
     
     # Base query parts
     base_select = """
@@ -500,31 +581,49 @@ def get_messages(job_type):
 
 @app.route('/api/group_details/<path:group_name>')
 def get_group_details(group_name):
-    """Get detailed information about a specific group"""
+    """
+    Get detailed information about a specific group
+    
+    ?archive=1 also returns archived messages (optionally limited with
+    ?since=YYYY-MM-DD so only the needed archive months are opened)
+    """
+    from flask import request
     from urllib.parse import unquote
+    from src.utils.location_categorizer import categorizer
     
     # Decode URL-encoded group name
     group_name = unquote(group_name)
+    include_archive = request.args.get('archive') in ('1', 'true')
+    since = request.args.get('since')
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get all messages from this group
-    cursor.execute("""
+    query = """
         SELECT 
             message_text,
             date,
             job_type,
             keywords_found,
             job_location
-        FROM messages
-        WHERE group_name = ?
+        FROM {table}
+        WHERE group_name = ? {since_filter}
         ORDER BY date DESC
-    """, (group_name,))
+    """
+    params = (group_name, since) if since else (group_name,)
+    since_filter = 'AND date >= ?' if since else ''
+    
+    # Get all messages from this group
+    if include_archive:
+        from src.storage.archive import messages_view
+        with messages_view(since=since) as conn:
+            rows = conn.execute(query.format(table='all_messages', since_filter=since_filter),
+                                params).fetchall()
+    else:
+        conn = get_db_connection()
+        rows = conn.execute(query.format(table='messages', since_filter=since_filter),
+                            params).fetchall()
+        conn.close()
     
-    categorizer = LocationCategorizer()
     messages = []
-    for row in cursor.fetchall():
+    for row in rows:
         # Categorize location for display
         location = ''
         try:
@@ -550,8 +649,6 @@ def get_group_details(group_name):
         first_message = messages[-1]['date'][:10]  # First message (oldest)
         last_message = messages[0]['date'][:10]    # Last message (newest)
     
-    conn.close()
-    
     return jsonify({
         'messages': messages,
         'firstMessage': first_message,
@@ -691,9 +788,9 @@ def get_fresher_analysis():
 @app.route('/api/messages_by_location/<location_filter>')
 def get_messages_by_location(location_filter):
     """Get messages filtered by location category (pan_india, remote, international)"""
+    from src.utils.location_categorizer import categorizer
     conn = get_db_connection()
     cursor = conn.cursor()
-    categorizer = LocationCategorizer()
     
     # Build query based on location filter
     if location_filter == 'pan_india':
@@ -854,9 +951,9 @@ def get_messages_by_location(location_filter):
 def get_messages_by_date(date, job_type):
     """Get messages by date and job type with optional location filter"""
     from flask import request
+    from src.utils.location_categorizer import categorizer
     conn = get_db_connection()
     cursor = conn.cursor()
-    categorizer = LocationCategorizer()
     
     # Get location filter from query parameter
     location_filter = request.args.get('location', None)
@@ -1065,6 +1162,77 @@ def get_messages_by_date(date, job_type):
     conn.close()
     return jsonify(messages)
 
+@app.route('/api/group_anomalies')
+def get_group_anomalies():
+    """Per-group activity trend and anomaly score (see src/services/group_trends.py)"""
+    from flask import request
+    from config.settings import GROUP_TRENDS
+    from src.services.group_trends import current_hour, score_groups
+
+    status = request.args.get('status')
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    now_hour = current_hour()
+    cursor.execute("""
+        SELECT group_link, hour, fetches, jobs, non_jobs, duplicates
+        FROM group_activity WHERE hour >= ?
+    """, (now_hour - GROUP_TRENDS['window_days'] * 24,))
+    scores = score_groups([tuple(row) for row in cursor.fetchall()], now_hour)
+    cursor.execute("SELECT group_link, group_name FROM groups")
+    names = {row['group_link']: row['group_name'] for row in cursor.fetchall()}
+    conn.close()
+
+    groups = []
+    for group_link, score in scores.items():
+        if status and score['status'] != status:
+            continue
+        groups.append({'group_link': group_link, 'group_name': names.get(group_link, group_link), **score})
+
+    # Most unusual first: dead groups, then by the larger of |z| and spam z
+    groups.sort(key=lambda g: (g['status'] != 'dead', -max(abs(g['z'] or 0), g['spam_z'] or 0)))
+    return jsonify(groups[:limit])
+
+@app.route('/api/db_size_history')
+def get_db_size_history():
+    """Database / WAL size recorded by each database maintenance run"""
+    from src.utils.maintenance import get_database_size_history
+    return jsonify(get_database_size_history())
+
+@app.route('/api/pattern_stats')
+def get_pattern_stats():
+    """Per-pattern calls, hits and match time in this dashboard process (scoring), slowest first"""
+    from src.utils.patterns import patterns
+    return jsonify(patterns.stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """
+    Prometheus text metrics: the latest cycle snapshot of the fetcher (or of
+    each sharded worker, labelled worker="<id>") + this dashboard process
+    """
+    import glob
+    from flask import Response
+    
+    snapshots = []
+    for snapshot_path in sorted(glob.glob(os.path.join(PATHS['metrics'], 'fetcher_metrics*.json'))):
+        # fetcher_metrics.json (single fetcher) or fetcher_metrics_<worker>.json
+        worker = os.path.basename(snapshot_path)[len('fetcher_metrics'):-len('.json')].lstrip('_')
+        try:
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                fetcher_snapshot = json.load(f)
+            fetcher_snapshot.setdefault('gauges', {})['fetcher_metrics_age_seconds'] = {
+                'help': 'Seconds since the fetcher wrote its last cycle snapshot',
+                'value': round(time.time() - os.path.getmtime(snapshot_path), 1)
+            }
+        except (OSError, ValueError):
+            continue
+        snapshots.append(({'worker': worker}, fetcher_snapshot) if worker else fetcher_snapshot)
+    
+    snapshots.append(metrics.snapshot())
+    return Response(render_prometheus(*snapshots), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     print("="*60)
     print("🌐 Starting Web Dashboard")
@@ -0,0 +1,147 @@
+"""
+Message Body Compression Benchmark
+Compares storage size and throughput of the body codecs on a synthetic job
+corpus: plain text, zlib, zlib with a trained dictionary and - when the
+zstandard package is installed - zstd with and without a dictionary. The
+dictionary is trained on one slice of the corpus and measured on the rest.
+
+Usage:
+  python3 scripts/benchmark_compression.py
+  python3 scripts/benchmark_compression.py --messages 50000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import JOB_KEYWORDS
+from src.core.fake_client import COMPANIES, JOB_TEMPLATES
+from src.storage.compression import (BodyCodec, ZLIB_DICT, ZSTD_DICT, train_dictionary,
+                                     zstd_available)
+import src.storage.compression as compression
+
+EXTRA_LINES = [
+    "Immediate joiners preferred.", "Notice period: 15-30 days.", "Share your updated CV.",
+    "Good communication skills required.", "5 days working, Mon-Fri.", "Health insurance and PF.",
+    "Interested candidates DM me.", "Please share in your network 🙏", "Walk-in interview this Saturday.",
+    "Hybrid: 3 days office.", "Referral bonus available.", "Only relevant profiles will be contacted.",
+]
+
+
+def make_corpus(count, seed=3):
+    """Job posts: a template, some skills and a few boilerplate lines"""
+    rng = random.Random(seed)
+    vocabulary = sorted({kw for kws in JOB_KEYWORDS.values() for kw in kws})
+    corpus = []
+    for i in range(count):
+        company = rng.choice(COMPANIES) + rng.choice(['', ' Pvt Ltd', ' Technologies', ' Solutions'])
+        body = rng.choice(JOB_TEMPLATES).format(
+            company=company, domain=company.lower().replace(' ', '') + '.com', handle=f"hr_{rng.randint(100, 999)}")
+        body += f"\nRef #{rng.randint(1000, 99999)}. Skills: " + ', '.join(rng.sample(vocabulary, rng.randint(3, 9)))
+        body += '\n' + '\n'.join(rng.sample(EXTRA_LINES, rng.randint(1, 4)))
+        corpus.append(body)
+    return corpus
+
+
+def _codecs(training):
+    """(label, BodyCodec) for every codec available here"""
+    codecs = []
+    # Force the plain codecs regardless of what is installed
+    saved = compression.zstandard
+    compression.zstandard = None
+    codecs.append(('zlib', BodyCodec()))
+    codec, data = train_dictionary(training, codec=ZLIB_DICT)
+    codecs.append((f'zlib + {len(data) // 1024}KB dict', BodyCodec({1: (codec, data)})))
+    compression.zstandard = saved
+
+    if zstd_available():
+        codecs.append(('zstd', BodyCodec()))
+        codec, data = train_dictionary(training, codec=ZSTD_DICT)
+        codecs.append((f'zstd + {len(data) // 1024}KB dict', BodyCodec({1: (codec, data)})))
+    return codecs
+
+
+def _db_size(values):
+    """Bytes of a VACUUMed table holding these bodies"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE bodies (id INTEGER PRIMARY KEY, message_text TEXT)')
+        conn.executemany('INSERT INTO bodies (message_text) VALUES (?)', ((v,) for v in values))
+        conn.commit()
+        conn.execute('VACUUM')
+        conn.close()
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+
+def run_benchmark(num_messages=20000, train_fraction=0.1):
+    corpus = make_corpus(num_messages)
+    split = int(len(corpus) * train_fraction)
+    training, evaluation = corpus[:split], corpus[split:]
+    raw_bytes = sum(len(body.encode('utf-8')) for body in evaluation)
+
+    results = [{'codec': 'plain text', 'bytes': raw_bytes, 'db_bytes': _db_size(evaluation),
+                'compress_mbs': None, 'decompress_mbs': None}]
+
+    for label, codec in _codecs(training):
+        started = time.perf_counter()
+        packed = [codec.compress(body) for body in evaluation]
+        compress_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        unpacked = [codec.decompress(value) for value in packed]
+        decompress_s = time.perf_counter() - started
+        assert unpacked == evaluation, f"{label}: round trip failed"
+
+        stored = sum(len(v) if isinstance(v, bytes) else len(v.encode('utf-8')) for v in packed)
+        results.append({
+            'codec': label,
+            'bytes': stored,
+            'db_bytes': _db_size(packed),
+            'compress_mbs': raw_bytes / 1e6 / compress_s,
+            'decompress_mbs': raw_bytes / 1e6 / decompress_s,
+        })
+
+    return {'messages': len(evaluation), 'trained_on': len(training), 'raw_bytes': raw_bytes,
+            'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark message body compression codecs')
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+
+    print("="*72)
+    print("MESSAGE BODY COMPRESSION BENCHMARK")
+    print("="*72)
+
+    r = run_benchmark(args.messages)
+    print(f"Corpus:     {r['messages']} synthetic job posts, {r['raw_bytes'] / 1e6:.2f}MB "
+          f"(avg {r['raw_bytes'] / r['messages']:.0f} bytes)")
+    print(f"Dictionary: trained on {r['trained_on']} other posts")
+    if not zstd_available():
+        print("            (zstandard not installed - zstd rows skipped)")
+    print()
+    print(f"{'codec':22s} {'bodies MB':>10} {'ratio':>7} {'table MB':>9} {'comp MB/s':>10} {'decomp MB/s':>12}")
+    for row in r['results']:
+        comp = f"{row['compress_mbs']:10.1f}" if row['compress_mbs'] else f"{'-':>10}"
+        decomp = f"{row['decompress_mbs']:12.1f}" if row['decompress_mbs'] else f"{'-':>12}"
+        print(f"{row['codec']:22s} {row['bytes'] / 1e6:10.2f} {r['raw_bytes'] / row['bytes']:6.2f}x "
+              f"{row['db_bytes'] / 1e6:9.2f} {comp} {decomp}")
+    print()
+    best = min(r['results'][1:], key=lambda row: row['db_bytes'])
+    print(f"✅ Round trips identical; best table size: {best['codec']} "
+          f"({r['results'][0]['db_bytes'] / best['db_bytes']:.1f}x smaller than plain)")
+    print("="*72)
+
+
+if __name__ == "__main__":
+    main()
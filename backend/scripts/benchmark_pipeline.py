@@ -0,0 +1,187 @@
+"""
+Ingest Pipeline Benchmark
+Times each ingest stage (fetch -> filter -> enrich -> persist) on its own
+against the offline FakeTelegramClient, then the whole pipeline with the
+INGEST_PIPELINE concurrency / batch sizes, so the slowest stage can be
+found and scaled on its own. Each mode runs in a fresh process with its
+own temp data dir, since the persist stage fills the database.
+
+Usage:
+  python3 scripts/benchmark_pipeline.py
+  python3 scripts/benchmark_pipeline.py --groups 40 --latency 0.05
+  python3 scripts/benchmark_pipeline.py --set enrich.concurrency=4 --set persist.linger=0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import INGEST_PIPELINE, PATHS
+
+STAGES = ['fetch', 'filter', 'enrich', 'persist']
+
+
+def _offline_fetcher(args):
+    """Fetcher over a FakeTelegramClient, data in a temp dir"""
+    offline_root = tempfile.mkdtemp(prefix='telegram_offline_')
+    for key in ('data', 'csv', 'json', 'database', 'sessions', 'metrics', 'backups', 'archive'):
+        PATHS[key] = os.path.join(offline_root, key, '')
+
+    from src.core.fake_client import FakeTelegramClient
+    from src.core.telegram_client import TelegramJobFetcher
+
+    fake = FakeTelegramClient(num_groups=args.groups, messages_per_group=args.messages, latency=args.latency)
+    fetcher = TelegramJobFetcher()
+    fetcher.use_offline_client(fake)
+    fetcher.delay_scale = 0
+    return fetcher, fake
+
+
+async def _groups(fetcher, fake):
+    """(entity, per-group state) for every fake group"""
+    groups = []
+    for group in fake.groups_data():
+        entity = await fake.get_entity(group['link'])
+        groups.append((entity, fetcher._ingest_group(entity.title, group['link'], 'offline')))
+    return groups
+
+
+async def _run_batches(func, items, batch_size):
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        if asyncio.iscoroutinefunction(func):
+            await func(batch)
+        else:
+            func(batch)
+
+
+async def bench_stages(args):
+    """
+    Each stage alone, one worker: per group, all of its messages through one
+    stage before the next (so persist fills the indexes as in the pipeline)
+    """
+    fetcher, fake = _offline_fetcher(args)
+    groups = await _groups(fetcher, fake)
+    seconds = {name: 0.0 for name in STAGES}
+    count = 0
+
+    for entity, group in groups:
+        started = time.perf_counter()
+        items = [item async for item in fetcher._fetch_stage(fake, entity, group)]
+        seconds['fetch'] += time.perf_counter() - started
+        count += len(items)
+
+        for name, func in (('filter', fetcher._filter_batch), ('enrich', fetcher._enrich_batch),
+                           ('persist', fetcher._persist_batch)):
+            started = time.perf_counter()
+            await _run_batches(func, items, INGEST_PIPELINE[name]['batch_size'])
+            seconds[name] += time.perf_counter() - started
+
+    return {
+        'items': count,
+        'seconds': seconds,
+        'jobs': sum(group['new_messages'] for _, group in groups),
+    }
+
+
+async def bench_pipeline(args):
+    """The whole pipeline, one run per group as in fetch_messages"""
+    fetcher, fake = _offline_fetcher(args)
+    groups = await _groups(fetcher, fake)
+    busy = {name: 0.0 for name in STAGES[1:]}
+    batches = {name: 0 for name in STAGES[1:]}
+
+    started = time.perf_counter()
+    for entity, group in groups:
+        stats = await fetcher._ingest_pipeline().run(fetcher._fetch_stage(fake, entity, group))
+        for name, stat in stats.items():
+            busy[name] += stat['seconds']
+            batches[name] += stat['batches']
+    wall = time.perf_counter() - started
+
+    return {
+        'items': sum(group['messages_checked'] for _, group in groups),
+        'wall': wall,
+        'busy': busy,
+        'batches': batches,
+        'jobs': sum(group['new_messages'] for _, group in groups),
+    }
+
+
+def _apply_overrides(overrides):
+    """--set stage.key=value into INGEST_PIPELINE"""
+    for override in overrides:
+        key, value = override.split('=', 1)
+        stage_name, option = key.split('.', 1)
+        INGEST_PIPELINE[stage_name][option] = float(value) if '.' in value else int(value)
+
+
+def _run_mode(mode, argv):
+    """Run one mode in a fresh process (own temp data dir and database)"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode] + argv,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ingest pipeline stages')
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=100, help='messages per group')
+    parser.add_argument('--latency', type=float, default=0.0, help='fake network delay per page (s)')
+    parser.add_argument('--set', action='append', default=[], metavar='STAGE.KEY=N',
+                        help='override INGEST_PIPELINE, e.g. enrich.concurrency=4')
+    parser.add_argument('--mode', choices=['stages', 'pipeline'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    _apply_overrides(args.set)
+
+    if args.mode:
+        bench = bench_stages if args.mode == 'stages' else bench_pipeline
+        print(json.dumps(asyncio.run(bench(args))))
+        return
+
+    argv = sys.argv[1:]
+    print("="*60)
+    print("INGEST PIPELINE BENCHMARK")
+    print("="*60)
+
+    stages = _run_mode('stages', argv)
+    pipeline = _run_mode('pipeline', argv)
+    seconds = stages['seconds']
+    n = stages['items']
+
+    print(f"Groups: {args.groups} x {args.messages} messages, latency {args.latency}s/page, "
+          f"{n} messages past the fetch checks")
+    print()
+    print(f"{'stage':10s} {'alone':>9s} {'us/msg':>8s} {'batch':>6s} {'workers':>8s} "
+          f"{'busy in pipeline':>17s} {'avg batch':>10s}")
+    for name in STAGES:
+        config = INGEST_PIPELINE.get(name, {})
+        line = (f"{name:10s} {seconds[name]:8.3f}s {1e6 * seconds[name] / max(n, 1):8.1f} "
+                f"{config.get('batch_size', '-'):>6} {config.get('concurrency', 1 if config else '-'):>8}")
+        if name in pipeline['busy']:
+            line += f" {pipeline['busy'][name]:16.3f}s {n / max(pipeline['batches'][name], 1):10.1f}"
+        print(line)
+    print()
+
+    slowest = max(STAGES, key=seconds.get)
+    total = sum(seconds.values())
+    print(f"Slowest stage alone:  {slowest} ({100 * seconds[slowest] / total:.0f}% of {total:.3f}s)")
+    print(f"Pipeline wall time:   {pipeline['wall']:.3f}s "
+          f"({total / pipeline['wall']:.1f}x the stages run one after another)")
+    print("Busy time of offloaded stages includes waits for a pool thread and the GIL")
+    print()
+    if stages['jobs'] != pipeline['jobs']:
+        print(f"❌ Jobs stored differ: stages alone {stages['jobs']}, pipeline {pipeline['jobs']}")
+        sys.exit(1)
+    print(f"✅ Same {pipeline['jobs']} jobs stored both ways")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
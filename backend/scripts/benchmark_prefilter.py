@@ -0,0 +1,133 @@
+"""
+Prefilter Benchmark
+Times the fetch path for one batch of texts without and with
+MessageClassifier.prefilter in front of hashing and classification, on a
+synthetic group mix: job posts, plain chatter and chatter that mentions
+jobs ("any job for freshers?"), which used to go through every keyword
+regex. Also counts the texts classify() tags as jobs that the prefilter
+rejects, split into real job posts (lost) and job-word chatter (false
+positives avoided).
+
+Usage:
+  python3 scripts/benchmark_prefilter.py
+  python3 scripts/benchmark_prefilter.py --messages 50000 --job-ratio 0.2
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.fake_client import CHATTER_TEMPLATES, FakeTelegramClient
+from src.services.classifier import MessageClassifier
+from src.services.near_duplicate import content_hash
+
+# Chatter of job groups that contains job words
+JOB_WORD_CHATTER = [
+    "Any job for freshers?",
+    "Is this job still open?",
+    "Who is the lead for this opening?",
+    "Senior devs please help, docker build fails on my laptop",
+    "Thanks, I got the job! 🙏",
+    "Which is better for a career, data analyst or web developer?",
+    "Does anyone know if they are hiring interns this year?",
+    "Please don't post the same job twice",
+    "Any remote opportunity for a junior designer?",
+    "Is the position filled already?",
+]
+
+
+def make_corpus(count, job_ratio, job_word_ratio, seed=11):
+    """(text, kind) pairs, kind in 'job', 'job_words', 'chatter'"""
+    rng = random.Random(seed)
+    jobs = FakeTelegramClient(num_groups=1, messages_per_group=1, job_ratio=1.0)
+    corpus = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < job_ratio:
+            corpus.append((jobs._message_text(rng), 'job'))
+        elif roll < job_ratio + job_word_ratio:
+            corpus.append((rng.choice(JOB_WORD_CHATTER), 'job_words'))
+        else:
+            corpus.append((rng.choice(CHATTER_TEMPLATES).format(handle='@member'), 'chatter'))
+    return corpus
+
+
+def full_path(classifier, text):
+    content_hash(text)
+    return classifier._classify(text)[0]
+
+
+def run_benchmark(num_messages=20000, job_ratio=0.3, job_word_ratio=0.2):
+    corpus = make_corpus(num_messages, job_ratio, job_word_ratio)
+    classifier = MessageClassifier()
+
+    started = time.perf_counter()
+    tagged = [full_path(classifier, text) for text, _ in corpus]
+    before_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    passed = []
+    for text, _ in corpus:
+        candidate = classifier.prefilter(text)
+        passed.append(candidate)
+        if candidate:
+            full_path(classifier, text)
+    after_s = time.perf_counter() - started
+
+    lost = {'job': 0, 'job_words': 0, 'chatter': 0}
+    for (text, kind), job_type, candidate in zip(corpus, tagged, passed):
+        if job_type and not candidate:
+            lost[kind] += 1
+
+    return {
+        'messages': num_messages,
+        'before_s': before_s,
+        'after_s': after_s,
+        'report': classifier.prefilter_report(),
+        'tagged': sum(1 for job_type in tagged if job_type),
+        'jobs_lost': lost['job'],
+        'false_positives_avoided': lost['job_words'] + lost['chatter'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the classification prefilter')
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--job-ratio', type=float, default=0.3)
+    parser.add_argument('--job-word-ratio', type=float, default=0.2, help='share of chatter with job words')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("PREFILTER BENCHMARK")
+    print("="*60)
+
+    r = run_benchmark(args.messages, args.job_ratio, args.job_word_ratio)
+    report = r['report']
+    n = r['messages']
+    print(f"Messages:             {n} ({args.job_ratio:.0%} job posts, {args.job_word_ratio:.0%} job-word chatter)")
+    print(f"Rejected:             {report['rejected']} ({100 * report['reject_rate']:.1f}%) - "
+          + ', '.join(f"{reason} {count}" for reason, count in report['by_reason'].items()))
+    print()
+    print(f"{'hash + classify all':22s} {r['before_s']:7.3f}s ({1e6 * r['before_s'] / n:6.1f}us/msg)")
+    print(f"{'prefilter first':22s} {r['after_s']:7.3f}s ({1e6 * r['after_s'] / n:6.1f}us/msg)")
+    if report['saved_seconds'] is not None:
+        print(f"{'audit estimate saved':22s} {report['saved_seconds']:7.3f}s "
+              f"({report['false_rejects']}/{report['audited']} audited rejects tagged by classify)")
+    print()
+    print(f"Tagged by classify:   {r['tagged']}")
+    print(f"Job posts lost:       {r['jobs_lost']}")
+    print(f"False positives avoided (job-word chatter classify tagged): {r['false_positives_avoided']}")
+    print()
+    if r['jobs_lost']:
+        print(f"❌ {r['jobs_lost']} job posts rejected")
+        sys.exit(1)
+    print("✅ No job posts rejected")
+    print(f"✅ Speedup: {r['before_s'] / r['after_s']:.1f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
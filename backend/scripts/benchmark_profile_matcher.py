@@ -0,0 +1,159 @@
+"""
+Profile Matcher Benchmark
+Scores the same jobs against many synthetic profiles two ways - one JobFilter
+per profile (a substring scan per keyword per profile, the old path) and one
+ProfileMatcher over all profiles - and checks both pick the same jobs.
+
+Usage:
+  python3 scripts/benchmark_profile_matcher.py
+  python3 scripts/benchmark_profile_matcher.py --profiles 100 --jobs 2000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import JOB_KEYWORDS
+from src.auto_apply.job_filter import JobFilter
+from src.auto_apply.profile_matcher import ProfileMatcher
+from src.core.fake_client import COMPANIES, JOB_TEMPLATES
+
+ROLES = [
+    'DevOps Engineer', 'Cloud Engineer', 'Platform Engineer', 'SRE Engineer', 'Python Developer',
+    'Backend Engineer', 'Data Scientist', 'React Native developer', 'Marketing Executive',
+    'Business Development Manager', 'Data Science intern', 'QA Engineer', 'Tech Lead',
+]
+EXCLUDES = ['junior', 'fresher', 'trainee', '0-2 years', 'intern', 'unpaid', 'sales', 'night shift']
+
+
+def _vocabulary():
+    return sorted({keyword for keywords in JOB_KEYWORDS.values() for keyword in keywords})
+
+
+def make_profiles(count, seed=7):
+    rng = random.Random(seed)
+    vocabulary = _vocabulary()
+    return [{
+        'personal_info': {'name': f"Candidate {i}"},
+        'skills': rng.sample(vocabulary, 25),
+        'preferences': {
+            'roles': rng.sample(ROLES, 4),
+            'required_keywords': rng.sample(vocabulary, 6),
+            'exclude_keywords': rng.sample(EXCLUDES, 3),
+        },
+    } for i in range(count)]
+
+
+def make_jobs(count, seed=11):
+    rng = random.Random(seed)
+    vocabulary = _vocabulary()
+    jobs = []
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        text = rng.choice(JOB_TEMPLATES).format(
+            company=company, domain=company.lower().replace(' ', '') + '.com', handle='recruiter')
+        keywords = rng.sample(vocabulary, rng.randint(3, 8))
+        text += ' Skills: ' + ', '.join(keywords)
+        jobs.append({'message_id': f"bench_{i}", 'message_text': text, 'keywords': ', '.join(keywords)})
+    return jobs
+
+
+def baseline(filters, jobs, min_match_score):
+    """Old path: every profile re-scans every job with its own keyword lists"""
+    results = []
+    for job_filter in filters:
+        matched = []
+        for job in jobs:
+            skill_match = job_filter.calculate_skill_match(job['keywords'])
+            role_match = job_filter.check_role_match(job['message_text'])
+            if job_filter.check_exclude_keywords(job['message_text']):
+                continue
+            if not job_filter.check_required_keywords(job['message_text']):
+                continue
+            if skill_match < min_match_score and not role_match:
+                continue
+            matched.append((job['message_id'], skill_match, role_match))
+        results.append(sorted(matched))
+    return results
+
+
+def run_benchmark(num_profiles=100, num_jobs=2000, min_match_score=30.0):
+    logging.getLogger('profile_matcher').setLevel(logging.WARNING)
+    profiles = make_profiles(num_profiles)
+    jobs = make_jobs(num_jobs)
+
+    workdir = tempfile.mkdtemp(prefix='matcher_bench_')
+    try:
+        filters = []
+        for i, profile in enumerate(profiles):
+            path = os.path.join(workdir, f"profile_{i}.json")
+            with open(path, 'w') as f:
+                json.dump(profile, f)
+            filters.append(JobFilter(path))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    started = time.perf_counter()
+    expected = baseline(filters, jobs, min_match_score)
+    linear_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = ProfileMatcher(profiles)
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matched = matcher.filter_jobs(jobs, min_match_score)
+    matcher_s = time.perf_counter() - started
+
+    actual = [sorted((job['message_id'], job['match_score'], job['role_match']) for job in profile_jobs)
+              for profile_jobs in matched]
+
+    return {
+        'profiles': num_profiles,
+        'jobs': num_jobs,
+        'phrases': len(matcher.automaton.patterns),
+        'matches': sum(len(m) for m in actual),
+        'identical': actual == expected,
+        'linear_s': linear_s,
+        'build_s': build_s,
+        'matcher_s': matcher_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-profile JobFilter vs ProfileMatcher')
+    parser.add_argument('--profiles', type=int, default=100)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--min-match-score', type=float, default=30.0)
+    args = parser.parse_args()
+
+    print("="*60)
+    print("PROFILE MATCHER BENCHMARK")
+    print("="*60)
+
+    r = run_benchmark(args.profiles, args.jobs, args.min_match_score)
+    print(f"Profiles x jobs:   {r['profiles']} x {r['jobs']} ({r['phrases']} distinct phrases)")
+    print(f"Matches:           {r['matches']}")
+    print()
+    print(f"{'':20s} {'total s':>9} {'us/job':>9}")
+    print(f"{'JobFilter loop':20s} {r['linear_s']:9.3f} {1e6 * r['linear_s'] / r['jobs']:9.1f}")
+    print(f"{'ProfileMatcher':20s} {r['matcher_s']:9.3f} {1e6 * r['matcher_s'] / r['jobs']:9.1f}"
+          f"   (+{1000 * r['build_s']:.1f}ms build)")
+    print()
+    if not r['identical']:
+        print("❌ Results differ from the per-profile JobFilter")
+        sys.exit(1)
+    print("✅ Identical results")
+    print(f"✅ Speedup: {r['linear_s'] / r['matcher_s']:.1f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
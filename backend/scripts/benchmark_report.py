@@ -0,0 +1,208 @@
+"""
+Report Benchmark
+Builds a database of synthetic job messages (1M by default) and times the
+old report - one query per section, keywords split in Python, groups joined
+to messages on group_link - against the report engine, checking that both
+produce the same numbers. Messages are inserted through the migrated schema,
+so the trigger-maintained message_counts table is filled as in production.
+
+Usage:
+  python3 scripts/benchmark_report.py
+  python3 scripts/benchmark_report.py --messages 200000 --keep /tmp/report_bench.db
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import JOB_KEYWORDS
+from src.storage.migrations import migrate
+from src.utils.report_engine import build_report, render_csv, render_json, render_text
+
+JOB_TYPES = ['tech', 'non_tech', 'freelance', 'fresher', 'tech,fresher', 'freelance,tech']
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def build_database(path, num_messages, num_groups=800, seed=5):
+    """Synthetic hot database: groups, messages, keyword index, account usage"""
+    rng = random.Random(seed)
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA synchronous=OFF')
+    vocabulary = sorted({kw.lower() for kws in JOB_KEYWORDS.values() for kw in kws})
+    conn.executemany('INSERT INTO keywords (keyword_id, keyword) VALUES (?, ?)',
+                     list(enumerate(vocabulary, 1)))
+
+    groups = [(f"Jobs Group {i}", f"https://t.me/jobs_group_{i}") for i in range(num_groups)]
+    conn.executemany('INSERT INTO groups (group_name, group_link, join_date) VALUES (?, ?, ?)',
+                     [(name, link, '2025-01-01T00:00:00') for name, link in groups])
+    conn.executemany('''
+        INSERT INTO account_usage (account_name, date, groups_joined, messages_fetched) VALUES (?, ?, ?, ?)
+    ''', [(f"account{a}", f"2025-12-{d:02d}", rng.randint(0, 5), rng.randint(0, 500))
+          for a in range(1, 4) for d in range(1, 31)])
+
+    # Skewed group sizes like real channels
+    weights = [1.0 / (i + 1) for i in range(num_groups)]
+    batch = 50000
+    for start in range(1, num_messages + 1, batch):
+        rows, keyword_rows = [], []
+        for rowid in range(start, min(start + batch, num_messages + 1)):
+            name, link = groups[rng.choices(range(num_groups), weights)[0]]
+            posted = NOW - timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+            keyword_ids = rng.sample(range(1, len(vocabulary) + 1), rng.randint(1, 6))
+            keywords = ','.join(vocabulary[k - 1] for k in keyword_ids)
+            body = f"Hiring! {keywords}. Apply at careers page, ref {rowid}. " * rng.randint(1, 3)
+            rows.append((rowid, f"{rowid}_{rowid}", name, link, posted.isoformat(), body,
+                         rng.choice(JOB_TYPES), keywords, posted.strftime('%Y-%m-%d %H:%M:%S')))
+            keyword_rows.extend((rowid, k) for k in keyword_ids)
+        conn.executemany('''
+            INSERT INTO messages (id, message_id, group_name, group_link, date, message_text,
+                                  job_type, keywords_found, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.executemany('INSERT INTO message_keywords (message_rowid, keyword_id) VALUES (?, ?)', keyword_rows)
+        conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+
+def legacy_report(conn, days, now):
+    """The per-section queries generate_report used to run"""
+    cursor = conn.cursor()
+    result = {}
+    cursor.execute("SELECT COUNT(*) FROM messages")
+    result['total_messages'] = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(DISTINCT group_name) FROM messages")
+    result['active_groups'] = cursor.fetchone()[0]
+    cursor.execute("SELECT job_type, COUNT(*) FROM messages GROUP BY job_type ORDER BY COUNT(*) DESC")
+    result['job_types'] = dict(cursor.fetchall())
+    cursor.execute("""
+        SELECT group_name, COUNT(*) as job_count FROM messages
+        GROUP BY group_name ORDER BY job_count DESC LIMIT 10
+    """)
+    result['top_groups'] = cursor.fetchall()
+    cutoff_date = (now - timedelta(days=days)).strftime('%Y-%m-%d')
+    cursor.execute("""
+        SELECT DATE(date) as day, COUNT(*) as count FROM messages
+        WHERE date >= ? GROUP BY day ORDER BY day DESC
+    """, (cutoff_date,))
+    result['daily_trend'] = cursor.fetchall()
+    cursor.execute("SELECT keywords_found FROM messages WHERE keywords_found != ''")
+    keyword_count = {}
+    for row in cursor.fetchall():
+        for kw in row[0].split(','):
+            kw = kw.strip()
+            keyword_count[kw] = keyword_count.get(kw, 0) + 1
+    result['top_keywords'] = sorted(keyword_count.items(), key=lambda x: x[1], reverse=True)[:20]
+    cutoff_time = (now - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute("SELECT COUNT(*) FROM messages WHERE created_at >= ?", (cutoff_time,))
+    result['recent_24h'] = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT g.group_name, g.group_link, COUNT(m.id) as job_count, MAX(m.date), g.join_date
+        FROM groups g LEFT JOIN messages m ON g.group_link = m.group_link
+        GROUP BY g.group_link ORDER BY job_count DESC
+    """)
+    result['groups'] = cursor.fetchall()
+    return result
+
+
+def _same(legacy, report):
+    """The numbers both reports have in common agree"""
+    summary = report['summary']
+    return (
+        legacy['total_messages'] == summary['total_messages']
+        and legacy['active_groups'] == summary['active_groups']
+        and legacy['job_types'] == {row['job_type']: row['count'] for row in report['job_types']}
+        and sorted(c for _, c in legacy['top_groups']) == sorted(r['job_count'] for r in report['top_groups'])
+        and legacy['daily_trend'] == [(r['day'], r['count']) for r in report['daily_trend']]
+        # Ties at the cut-off may pick different keywords; the counts must match
+        and [c for _, c in legacy['top_keywords']] == [r['count'] for r in report['top_keywords']]
+        and legacy['recent_24h'] == report['recent_24h']
+        and {g[1]: g[2] for g in legacy['groups']} == {g['group_link']: g['job_count'] for g in report['groups']}
+    )
+
+
+def run_benchmark(num_messages=1000000, days=30, keep=None):
+    path = keep or tempfile.mkstemp(suffix='.db')[1]
+    if not keep:
+        os.remove(path)
+    try:
+        started = time.perf_counter()
+        if not os.path.exists(path):
+            build_database(path, num_messages)
+        build_s = time.perf_counter() - started
+
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA cache_size=-64000')
+        num_messages = conn.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+        # Same view generate_report queries through (hot database only)
+        conn.execute('CREATE TEMP VIEW all_messages AS SELECT * FROM main.messages')
+        conn.execute('CREATE TEMP VIEW all_message_keywords AS '
+                     'SELECT message_rowid, keyword_id FROM main.message_keywords')
+        conn.execute('CREATE TEMP VIEW all_message_counts AS SELECT * FROM main.message_counts')
+
+        started = time.perf_counter()
+        legacy = legacy_report(conn, days, NOW)
+        legacy_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        report = build_report(conn, days, now=NOW)
+        engine_s = time.perf_counter() - started
+
+        render_s = {}
+        for name, render in (('text', render_text), ('csv', render_csv), ('json', render_json)):
+            started = time.perf_counter()
+            render(report)
+            render_s[name] = time.perf_counter() - started
+        conn.close()
+
+        return {
+            'messages': num_messages,
+            'db_mb': os.path.getsize(path) / 1e6,
+            'build_s': build_s,
+            'legacy_s': legacy_s,
+            'engine_s': engine_s,
+            'render_s': render_s,
+            'identical': _same(legacy, report),
+        }
+    finally:
+        if not keep:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the report engine against per-section queries')
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--keep', help='keep (or reuse) the synthetic database at this path')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("REPORT BENCHMARK")
+    print("="*60)
+
+    r = run_benchmark(args.messages, args.days, args.keep)
+    print(f"Messages:          {r['messages']} ({r['db_mb']:.0f}MB database, built in {r['build_s']:.1f}s)")
+    print()
+    print(f"{'per-section queries':22s} {r['legacy_s']:8.2f}s")
+    print(f"{'report engine':22s} {r['engine_s']:8.2f}s")
+    print(f"{'  render':22s} " + ', '.join(f"{name} {1000 * s:.1f}ms" for name, s in r['render_s'].items()))
+    print()
+    if not r['identical']:
+        print("❌ Report numbers differ from the per-section queries")
+        sys.exit(1)
+    print("✅ Identical numbers")
+    print(f"✅ Speedup: {r['legacy_s'] / r['engine_s']:.1f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
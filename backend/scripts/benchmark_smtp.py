@@ -0,0 +1,204 @@
+"""
+SMTP Send Benchmark
+Compares one-connection-per-email sending (old path) with the pooled session
+and cached resume attachment, against a local stand-in SMTP server.
+
+Usage:
+  python3 scripts/benchmark_smtp.py
+  python3 scripts/benchmark_smtp.py --emails 50 --handshake-ms 80 --resume-kb 300
+
+The stand-in server is aiosmtpd when installed, otherwise the stdlib smtpd
+module. Neither speaks STARTTLS/AUTH, so --handshake-ms adds a delay to every
+EHLO to stand in for the TLS + login round trips of a real provider
+(smtp.gmail.com is typically 100-300ms from India).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.auto_apply.email_sender import EmailApplicationSender
+from src.utils.metrics import metrics
+
+
+class _Received:
+    count = 0
+
+
+def _start_aiosmtpd(handshake_delay):
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import SMTP as AioSMTP
+    import asyncio
+
+    class Handler:
+        async def handle_DATA(self, server, session, envelope):
+            _Received.count += 1
+            return '250 OK'
+
+    class SlowSMTP(AioSMTP):
+        async def smtp_EHLO(self, hostname):
+            await asyncio.sleep(handshake_delay)
+            return await super().smtp_EHLO(hostname)
+
+    class SlowController(Controller):
+        def factory(self):
+            return SlowSMTP(self.handler)
+
+    controller = SlowController(Handler(), hostname='127.0.0.1', port=0)
+    controller.start()
+    port = controller.server.sockets[0].getsockname()[1]
+    return port, controller.stop
+
+
+def _start_smtpd(handshake_delay):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        import asyncore
+        import smtpd
+
+    class SlowChannel(smtpd.SMTPChannel):
+        def smtp_EHLO(self, arg):
+            time.sleep(handshake_delay)
+            super().smtp_EHLO(arg)
+
+    class Server(smtpd.SMTPServer):
+        channel_class = SlowChannel
+
+        def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+            _Received.count += 1
+
+    server = Server(('127.0.0.1', 0), None)
+    port = server.socket.getsockname()[1]
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            asyncore.loop(timeout=0.001, count=1)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+
+    def shutdown():
+        stop.set()
+        thread.join()
+        server.close()
+
+    return port, shutdown
+
+
+def start_server(handshake_delay):
+    try:
+        return _start_aiosmtpd(handshake_delay) + ('aiosmtpd',)
+    except ImportError:
+        return _start_smtpd(handshake_delay) + ('smtpd',)
+
+
+def _write_fixtures(workdir, port, resume_kb):
+    resume_path = os.path.join(workdir, 'resume.pdf')
+    with open(resume_path, 'wb') as f:
+        f.write(os.urandom(resume_kb * 1024))
+
+    profile_path = os.path.join(workdir, 'profile.json')
+    with open(profile_path, 'w') as f:
+        json.dump({
+            'personal_info': {'email': 'bench@example.com', 'phone': '+91 90000 00000',
+                              'linkedin': 'https://linkedin.com/in/bench'},
+            'professional_summary': {'experience_years': 5, 'current_role': 'DevOps Engineer',
+                                     'current_company': 'Bench Co'},
+            'application_settings': {'cc_emails': ['cc@example.com'], 'resume_path': resume_path}
+        }, f)
+
+    email_config_path = os.path.join(workdir, 'email.json')
+    with open(email_config_path, 'w') as f:
+        json.dump({'smtp_server': '127.0.0.1', 'smtp_port': port, 'use_tls': False, 'auth': False}, f)
+
+    return profile_path, email_config_path
+
+
+def _jobs(count):
+    return [
+        (f"hr{i}@example.com", {'message_text': f"Hiring DevOps Engineer #{i}\nKubernetes, Terraform, AWS"})
+        for i in range(count)
+    ]
+
+
+def run_benchmark(emails=30, handshake_ms=50, resume_kb=200):
+    # Per-email INFO logs would dominate the console
+    for name in ('email_sender', 'smtp_pool'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    port, stop_server, server_kind = start_server(handshake_ms / 1000.0)
+    workdir = tempfile.mkdtemp(prefix='smtp_bench_')
+    try:
+        profile_path, email_config_path = _write_fixtures(workdir, port, resume_kb)
+        sender = EmailApplicationSender(profile_path, email_config_path)
+        jobs = _jobs(emails)
+        opened = metrics.counter('smtp_sessions_opened_total')
+
+        # Old path: new session and freshly encoded resume for every email
+        sessions_before = opened.value
+        started = time.perf_counter()
+        for to_email, job in jobs:
+            sender._resume_cache = None
+            result = sender.send_application(to_email, job)
+            assert result['status'] == 'sent', result
+        unpooled = time.perf_counter() - started
+        unpooled_sessions = opened.value - sessions_before
+
+        # New path: one pooled session, resume encoded once
+        sessions_before = opened.value
+        started = time.perf_counter()
+        results = sender.send_batch(jobs)
+        pooled = time.perf_counter() - started
+        pooled_sessions = opened.value - sessions_before
+        assert all(r['status'] == 'sent' for r in results), results
+
+        return {
+            'server': server_kind,
+            'emails': emails,
+            'received': _Received.count,
+            'unpooled_s': unpooled,
+            'pooled_s': pooled,
+            'unpooled_sessions': unpooled_sessions,
+            'pooled_sessions': pooled_sessions,
+        }
+    finally:
+        stop_server()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pooled vs per-email SMTP sending')
+    parser.add_argument('--emails', type=int, default=30)
+    parser.add_argument('--handshake-ms', type=int, default=50,
+                        help='Simulated STARTTLS/AUTH cost per new session')
+    parser.add_argument('--resume-kb', type=int, default=200)
+    args = parser.parse_args()
+
+    print("="*60)
+    print("SMTP SEND BENCHMARK")
+    print("="*60)
+
+    r = run_benchmark(args.emails, args.handshake_ms, args.resume_kb)
+    print(f"Server:            local {r['server']} (+{args.handshake_ms}ms per handshake)")
+    print(f"Emails per run:    {r['emails']} (resume {args.resume_kb}KB, 1 CC)")
+    print(f"Delivered:         {r['received']}")
+    print()
+    print(f"{'':20s} {'total s':>9} {'ms/email':>9} {'sessions':>9}")
+    print(f"{'per-email connect':20s} {r['unpooled_s']:9.3f} {1000 * r['unpooled_s'] / r['emails']:9.1f} "
+          f"{r['unpooled_sessions']:9d}")
+    print(f"{'pooled + cached':20s} {r['pooled_s']:9.3f} {1000 * r['pooled_s'] / r['emails']:9.1f} "
+          f"{r['pooled_sessions']:9d}")
+    print()
+    print(f"✅ Speedup: {r['unpooled_s'] / r['pooled_s']:.1f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
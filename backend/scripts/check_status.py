@@ -116,7 +116,7 @@ def check_status():
     print("\n📝 Recent Logs:")
     logs_dir = PATHS['logs']
     if os.path.exists(logs_dir):
-        log_files = sorted([f for f in os.listdir(logs_dir) if f.endswith('.log')])
+        log_files = sorted([f for f in os.listdir(logs_dir) if f.endswith(('.log', '.jsonl'))])
         for f in log_files[-3:]:
             print(f"   • {f}")
     else:
@@ -1,9 +1,30 @@
 """
 Main entry point for Telegram Job Fetcher
+
+Flags:
+  --auth      Authorize accounts and exit
+  --offline   Use the fake Telegram client with a throwaway data directory
+              (no credentials or network needed)
+  --profile   Run a single fetch cycle under the sampling profiler and write
+              a collapsed-stack file + hotspot summary to data/profiles/
+  --writer    Serve the database and CSV files to sharded workers
+              (src/storage/writer_service.py); run exactly one
+  --worker    Fetch as a sharded worker through the writer, leasing shards
+              of data.json (see SHARDING in config/settings.py)
+  --accounts account1,account2   Accounts this worker logs in with (default: all)
+  --worker-id NAME               Lease owner name (default: host:pid)
+
+  python run.py --profile --offline    # CI-friendly profile of one cycle
+  python run.py --writer &             # one host
+  python run.py --worker --accounts account1 &
+  python run.py --worker --accounts account2 &
 """
 import asyncio
+import json
 import sys
 import os
+import socket
+import tempfile
 from datetime import datetime
 
 # Add project root to Python path
@@ -12,23 +33,86 @@ sys.path.insert(0, project_root)
 
 from src.core.telegram_client import TelegramJobFetcher
 from src.utils.logger import get_logger
-from config.settings import RUNTIME
+from config.settings import RUNTIME, PATHS, ACCOUNTS
 
 logger = get_logger('main')
 
+def _use_offline_data_dir():
+    """Point all data paths at a temp dir so offline runs never touch real data"""
+    offline_root = tempfile.mkdtemp(prefix='telegram_offline_')
+    for key in ('data', 'csv', 'json', 'database', 'sessions', 'metrics', 'backups', 'archive'):
+        PATHS[key] = os.path.join(offline_root, key, '')
+    PATHS['groups_json'] = os.path.join(offline_root, 'data.json')
+    return offline_root
+
+async def run_profiled_cycle(fetcher, groups_data):
+    """Run one fetch cycle under the sampling profiler"""
+    from src.utils.profiler import profile_session
+    
+    logger.info(f"Profiling one fetch cycle over {len(groups_data)} groups...")
+    with profile_session(PATHS['profiles']) as session:
+        await fetcher.run_cycle(groups_data)
+    
+    logger.info(f"🔥 Collapsed stacks: {session.collapsed_path}")
+    logger.info(f"📄 Hotspot summary:  {session.summary_path}")
+    print(session.summary_text())
+
+def _arg_value(flag, default=None):
+    """Value following flag on the command line"""
+    if flag in sys.argv:
+        index = sys.argv.index(flag)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def _create_worker_fetcher():
+    """TelegramJobFetcher writing through the writer service, limited to --accounts"""
+    from src.storage.writer_service import connect_writer
+    
+    names = _arg_value('--accounts')
+    accounts = ACCOUNTS
+    if names:
+        wanted = set(names.split(','))
+        accounts = [account for account in ACCOUNTS if account['name'] in wanted]
+        logger.info(f"Worker accounts: {', '.join(account['name'] for account in accounts) or 'none'}")
+    
+    manager = connect_writer()
+    return TelegramJobFetcher(db=manager.database(), csv_handler=manager.csv(), accounts=accounts)
+
 async def main():
     """Main execution function"""
+    offline = '--offline' in sys.argv
+    profile = '--profile' in sys.argv
+    worker = '--worker' in sys.argv
+    
+    if '--writer' in sys.argv:
+        from src.storage.writer_service import serve_writer
+        serve_writer()
+        return
+    
     try:
         logger.info("="*60)
         logger.info("Telegram Job Fetcher - Starting")
         logger.info("="*60)
         
+        if offline:
+            offline_root = _use_offline_data_dir()
+            logger.info(f"Offline mode: fake Telegram client, data in {offline_root}")
+        
         # Initialize fetcher
-        fetcher = TelegramJobFetcher()
+        fetcher = _create_worker_fetcher() if worker else TelegramJobFetcher()
         
         # Initialize clients
-        logger.info("Initializing Telegram clients...")
-        await fetcher.initialize_clients()
+        if offline:
+            from src.core.fake_client import FakeTelegramClient
+            fake_client = FakeTelegramClient()
+            fake_client.write_groups_json(PATHS['groups_json'])
+            fetcher.use_offline_client(fake_client)
+            fetcher.delay_scale = 0
+            fetcher.respect_working_hours = False
+        else:
+            logger.info("Initializing Telegram clients...")
+            await fetcher.initialize_clients()
         
         if not fetcher.clients:
             logger.error("No clients initialized. Exiting...")
@@ -40,11 +124,21 @@ async def main():
             logger.info("After authorization, restart without --auth flag")
             return
         
+        if profile:
+            with open(PATHS['groups_json'], 'r', encoding='utf-8') as f:
+                groups_data = json.load(f)
+            await run_profiled_cycle(fetcher, groups_data)
+            return
+        
         # Start continuous fetching
         duration_days = RUNTIME.get('total_days', 30)
         logger.info(f"Starting continuous fetching for {duration_days} days...")
         
-        await fetcher.run_continuous(duration_days)
+        if worker:
+            worker_id = _arg_value('--worker-id', f"{socket.gethostname()}:{os.getpid()}")
+            await fetcher.run_sharded(worker_id, duration_days)
+        else:
+            await fetcher.run_continuous(duration_days)
         
         logger.info("Fetching completed successfully!")
         
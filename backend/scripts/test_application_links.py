@@ -0,0 +1,186 @@
+"""
+Application Links Test
+Checks link extraction (LinkedIn / job boards / career pages before email),
+that the fetcher extracts links once per canonical job message and stores
+them in application_links with the message, and that get_applicable_jobs
+returns the applicable rows in the date window filtered on the current
+messages.job_type (after reclassification too), backfilling messages
+stored without links exactly once.
+
+Uses the fake Telegram client and a throwaway data directory.
+
+Usage:
+  python3 scripts/test_application_links.py
+  python3 -m pytest scripts/test_application_links.py
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.auto_apply.link_extractor import LinkExtractor
+from src.core.fake_client import FakeTelegramClient
+from src.storage.database import DatabaseHandler
+
+_offline_root = None
+
+
+def _database():
+    """A DatabaseHandler on its own temp file under the offline data dir"""
+    global _offline_root
+    if _offline_root is None:
+        from scripts.main import _use_offline_data_dir
+        _offline_root = _use_offline_data_dir()
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='links_', dir=_offline_root), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    return db
+
+
+def _extractor(db):
+    extractor = LinkExtractor(db=db)
+    extractor.db_path = db.db_path
+    return extractor
+
+
+def _message(extractor, message_id, text, job_type='tech', age_days=0, copy_of=None):
+    """message_data as the fetcher's persist stage builds it (copies get no links)"""
+    return {
+        'message_id': message_id,
+        'group_name': 'g',
+        'group_link': 'https://t.me/g',
+        'sender': 's',
+        'date': (datetime.now() - timedelta(days=age_days)).isoformat(),
+        'message_text': text,
+        'job_type': job_type,
+        'keywords_found': 'python',
+        'account_used': 'a',
+        'cluster_id': copy_of or message_id,
+        'is_duplicate': copy_of is not None,
+        'application_links': None if copy_of else extractor.extract_links_from_message(text),
+    }
+
+
+def test_extract_links():
+    extractor = LinkExtractor()
+    links = extractor.extract_links_from_message(
+        'Apply (https://www.linkedin.com/jobs/view/123). Questions: hr@acme.com')
+    assert links == {'urls': ['https://www.linkedin.com/jobs/view/123'], 'emails': ['hr@acme.com'],
+                     'application_type': 'linkedin',
+                     'application_link': 'https://www.linkedin.com/jobs/view/123'}, links
+
+    links = extractor.extract_links_from_message('About us: https://acme.com/about, CV to jobs@acme.com')
+    assert (links['application_type'], links['application_link']) == ('email', 'jobs@acme.com'), links
+    links = extractor.extract_links_from_message('Careers: https://acme.com/careers or https://naukri.com/x')
+    assert (links['application_type'], links['application_link']) == ('career_page', 'https://acme.com/careers')
+    assert extractor.extract_links_from_message('DM me')['application_type'] == 'unknown'
+
+
+def test_applicable_jobs_from_side_table():
+    db = _database()
+    extractor = _extractor(db)
+    assert db.insert_messages([
+        _message(extractor, 'm1', 'Python dev, apply https://www.linkedin.com/jobs/view/1'),
+        _message(extractor, 'm2', 'Backend role, CV to hr@acme.com'),
+        _message(extractor, 'm3', 'Logo design gig https://acme.com/apply', job_type='freelance'),
+        _message(extractor, 'm4', 'Python dev, DM me'),
+        _message(extractor, 'm5', 'Old post https://naukri.com/job/5', age_days=30),
+        _message(extractor, 'm6', 'Python dev, apply https://www.linkedin.com/jobs/view/1 (repost)', copy_of='m1'),
+    ])
+    conn = sqlite3.connect(db.db_path)
+    stored = dict(conn.execute('SELECT message_id, application_type FROM application_links'))
+    assert stored == {'m1': 'linkedin', 'm2': 'email', 'm3': 'career_page', 'm4': 'unknown', 'm5': 'naukri'}, stored
+
+    def applicable(job_type):
+        return [job['message_id'] for job in extractor.get_applicable_jobs(job_type, days=7)]
+
+    assert sorted(applicable('tech')) == ['m1', 'm2']
+    assert applicable('freelance') == ['m3']
+    job = extractor.get_applicable_jobs('freelance', days=7)[0]
+    assert (job['urls'], job['emails'], job['application_link']) == (
+        ['https://acme.com/apply'], [], 'https://acme.com/apply'), job
+
+    # Reclassified in messages only (fix_job_types.py): the filter follows it
+    conn.execute("UPDATE messages SET job_type = 'freelance' WHERE message_id = 'm2'")
+    conn.commit()
+    assert applicable('tech') == ['m1']
+    assert sorted(applicable('freelance')) == ['m2', 'm3']
+
+    # Stored without links (older rows, CSV imports): backfilled once
+    conn.execute("INSERT INTO messages (message_id, group_name, date, message_text, job_type) "
+                 "VALUES ('m7', 'g', ?, 'Apply at https://www.naukri.com/job/7', 'tech')",
+                 (datetime.now().isoformat(),))
+    conn.commit()
+    assert sorted(applicable('all')) == ['m1', 'm2', 'm3', 'm7']
+    assert extractor.backfill_links(7) == 0
+    assert conn.execute("SELECT application_type FROM application_links WHERE message_id = 'm7'").fetchone() == ('naukri',)
+    conn.close()
+
+
+def test_fetch_extracts_links_once():
+    from src.core.telegram_client import TelegramJobFetcher
+
+    db = _database()
+    fake = FakeTelegramClient(num_groups=2, messages_per_group=60, seed=3)
+    fetcher = TelegramJobFetcher(db=db)
+    fetcher.delay_scale = 0
+    fetcher.respect_working_hours = False
+    fetcher.use_offline_client(fake)
+    extracted = []
+    real_extract = fetcher.link_extractor.extract_links_from_message
+
+    def counting_extract(text):
+        extracted.append(text)
+        return real_extract(text)
+
+    fetcher.link_extractor.extract_links_from_message = counting_extract
+    try:
+        for group in fake.groups_data():
+            asyncio.run(fetcher.fetch_messages(group['link'], fetcher.clients[0]))
+    finally:
+        fetcher._ingest_pool.shutdown(wait=True)
+
+    conn = sqlite3.connect(db.db_path)
+    rows = conn.execute('''
+        SELECT m.message_id, m.message_text, m.cluster_id, al.application_type, al.application_link, al.urls, al.emails
+        FROM messages m LEFT JOIN application_links al ON al.message_id = m.message_id
+    ''').fetchall()
+    conn.close()
+    canonical = [row for row in rows if row[2] == row[0]]
+    copies = [row for row in rows if row[2] != row[0]]
+    assert canonical and copies, "the fake groups produced no cross-posts"
+    assert len(extracted) == len(canonical), f"extracted {len(extracted)} times for {len(canonical)} messages"
+    assert all(row[3] is None for row in copies), "a cross-posted copy got its own links row"
+    for message_id, body, _, application_type, application_link, urls, emails in canonical:
+        links = real_extract(db.decode_body(body))
+        assert (application_type, application_link, json.loads(urls), json.loads(emails)) == (
+            links['application_type'], links['application_link'], links['urls'], links['emails']), message_id
+
+
+def main():
+    print("="*60)
+    print("APPLICATION LINKS TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_extract_links, test_applicable_jobs_from_side_table, test_fetch_extracts_links_once):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
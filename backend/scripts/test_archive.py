@@ -0,0 +1,168 @@
+"""
+Message Archive Round-Trip Test
+Moves old messages of a temp database into monthly archive files and checks
+that nothing is lost on the way: all_messages, all_message_keywords and
+all_message_counts of messages_view() read the same rows as before the move,
+the hot tables keep only recent messages, a date range only attaches the
+months it needs, and a second run moves nothing.
+
+Usage:
+  python3 scripts/test_archive.py
+  python3 -m pytest scripts/test_archive.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import PATHS
+from src.storage.archive import archive_old_messages, archived_months, messages_view
+from src.storage.database import DatabaseHandler
+
+NOW = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+# (message_id, group, date, job_type, keywords); message_id is "<chat id>_<telegram id>"
+MESSAGES = [
+    ('100_1', 'alpha', '2024-01-10 09:00:00', 'tech', 'python,django'),
+    ('100_2', 'alpha', '2024-01-20 09:00:00', 'non_tech', 'sales'),
+    ('200_5', 'beta', '2024-01-31 23:59:59', 'tech', 'react'),
+    ('100_3', 'alpha', '2024-02-01 00:00:00', 'freelance', 'python'),
+    ('200_9', 'beta', '2024-02-15 12:00:00', 'tech', ''),
+    ('100_4', 'alpha', NOW, 'tech', 'python,react'),
+    ('200_10', 'beta', NOW, 'fresher', 'intern'),
+]
+
+
+def _database():
+    """A DatabaseHandler on its own temp file, holding MESSAGES"""
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='archive_'), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    assert db.insert_messages([{
+        'message_id': message_id, 'group_name': group, 'group_link': f"https://t.me/{group}",
+        'sender': 'hr', 'date': date, 'message_text': f"{job_type} job {message_id}",
+        'job_type': job_type, 'keywords_found': keywords, 'account_used': 'account1',
+        'application_links': {'application_type': 'email', 'application_link': f"hr{message_id}@acme.com",
+                              'urls': [], 'emails': [f"hr{message_id}@acme.com"]},
+    } for message_id, group, date, job_type, keywords in MESSAGES])
+    return db
+
+
+def _snapshot(conn, messages='messages', message_keywords='message_keywords', counts='message_counts'):
+    """Messages, (message_id, keyword) pairs and per-group counts readable through conn"""
+    rows = conn.execute(f'''
+        SELECT id, message_id, group_name, date, job_type, keywords_found, message_text
+        FROM {messages} ORDER BY id
+    ''').fetchall()
+    keywords = conn.execute(f'''
+        SELECT m.message_id, k.keyword FROM {messages} m
+        JOIN {message_keywords} mk ON mk.message_rowid = m.id
+        JOIN keywords k ON k.keyword_id = mk.keyword_id
+        ORDER BY 1, 2
+    ''').fetchall()
+    group_counts = conn.execute(f'''
+        SELECT group_link, job_type, SUM(count) FROM {counts} GROUP BY 1, 2 ORDER BY 1, 2
+    ''').fetchall()
+    return [tuple(row) for row in rows], [tuple(row) for row in keywords], [tuple(row) for row in group_counts]
+
+
+def _hot_ids(db, table):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return {row[0] for row in conn.execute(f'SELECT message_id FROM {table}')}
+    finally:
+        conn.close()
+
+
+def _archived(test):
+    """Run test(db) with PATHS['archive'] in a temp dir"""
+    saved = PATHS['archive']
+    PATHS['archive'] = tempfile.mkdtemp(prefix='archive_months_')
+    try:
+        test(_database())
+    finally:
+        PATHS['archive'] = saved
+
+
+def test_round_trip_through_all_messages():
+    def test(db):
+        conn = sqlite3.connect(db.db_path)
+        before = _snapshot(conn)
+        conn.close()
+        assert len(before[1]) == 8, before[1]
+
+        assert archive_old_messages(db.db_path, max_age_days=90) == {'2024-01': 3, '2024-02': 2}
+        assert archived_months() == ['2024-02', '2024-01']
+
+        # Hot tables keep only the recent messages, with their keywords and counts
+        recent = {'100_4', '200_10'}
+        for table in ('messages', 'tech_jobs', 'fresher_jobs', 'non_tech_jobs', 'freelance_jobs',
+                      'application_links'):
+            assert _hot_ids(db, table) <= recent, (table, _hot_ids(db, table))
+        conn = sqlite3.connect(db.db_path)
+        hot = _snapshot(conn)
+        orphans = conn.execute('''
+            SELECT COUNT(*) FROM message_keywords WHERE message_rowid NOT IN (SELECT id FROM messages)
+        ''').fetchone()[0]
+        conn.close()
+        assert [row[1] for row in hot[0]] == ['100_4', '200_10']
+        assert not orphans, f"{orphans} keyword rows left behind"
+        assert sum(row[2] for row in hot[2]) == 2, hot[2]
+        assert db.get_archive_watermarks() == {'100': 3, '200': 9}
+
+        with messages_view(db_path=db.db_path) as conn:
+            after = _snapshot(conn, 'all_messages', 'all_message_keywords', 'all_message_counts')
+        assert after == before, f"archive changed the data:\n{before}\n{after}"
+
+        # A range after the archived months attaches none of them
+        with messages_view(since=NOW[:10], db_path=db.db_path) as conn:
+            assert [row[1] for row in conn.execute('PRAGMA database_list')] == ['main', 'temp']
+            assert conn.execute('SELECT COUNT(*) FROM all_messages').fetchone()[0] == 2
+        with messages_view(since='2024-02-01', until='2024-02-29', db_path=db.db_path) as conn:
+            names = [row[1] for row in conn.execute('PRAGMA database_list')]
+            assert names.count('arc0') == 1 and 'arc1' not in names, names
+
+    _archived(test)
+
+
+def test_second_run_moves_nothing():
+    def test(db):
+        assert archive_old_messages(db.db_path, max_age_days=90)
+        with messages_view(db_path=db.db_path) as conn:
+            before = _snapshot(conn, 'all_messages', 'all_message_keywords', 'all_message_counts')
+        assert archive_old_messages(db.db_path, max_age_days=90) == {}
+        with messages_view(db_path=db.db_path) as conn:
+            after = _snapshot(conn, 'all_messages', 'all_message_keywords', 'all_message_counts')
+        assert after == before
+
+        # Without the archive only the hot rows are read
+        with messages_view(include_archive=False, db_path=db.db_path) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM all_messages').fetchone()[0] == 2
+
+    _archived(test)
+
+
+def main():
+    print("="*60)
+    print("MESSAGE ARCHIVE ROUND-TRIP TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_round_trip_through_all_messages, test_second_run_moves_nothing):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Category Table Sync Test
+Runs _sync_category_tables on a temp database with messages written
+straight into the messages table and checks that each lands in the category
+tables of its job type with a body that decodes to the original,
+cross-posted copies stay out, a second run copies nothing (watermark), new
+rows above the watermark are picked up and rows re-classified in place
+below it are synced when their ids are passed in.
+
+Usage:
+  python3 scripts/test_category_sync.py
+  python3 -m pytest scripts/test_category_sync.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.database import DatabaseHandler
+from src.utils.maintenance import CATEGORY_FILTERS, _sync_category_tables
+
+# (message_id, job_type, cluster_id)
+MESSAGES = [
+    ('m1', 'tech', None),
+    ('m2', 'non_tech', None),
+    ('m3', 'freelance', 'm3'),
+    ('m4', 'fresher', None),
+    ('m5', 'tech,freelance', None),
+    ('m6', 'tech', 'm1'),  # Cross-posted copy of m1
+    ('m7', '', None),
+]
+
+
+def _database():
+    """A DatabaseHandler on its own temp file (not the process-wide instance)"""
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='category_sync_'), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    return db
+
+
+def _add_messages(conn, messages):
+    conn.executemany('''
+        INSERT INTO messages (message_id, group_name, message_text, job_type, keywords_found, cluster_id)
+        VALUES (?, 'g', ?, ?, 'python', ?)
+    ''', [(message_id, f"Job post {message_id} " * 20, job_type, cluster_id)
+          for message_id, job_type, cluster_id in messages])
+
+
+def _category_rows(db, conn):
+    """{table: {message_id: decoded body}}"""
+    return {table: {message_id: db.decode_body(body)
+                    for message_id, body in conn.execute(f'SELECT message_id, message_text FROM {table}')}
+            for table in CATEGORY_FILTERS}
+
+
+def test_sync_routes_messages_by_job_type():
+    db = _database()
+    conn = sqlite3.connect(db.db_path)
+    _add_messages(conn, MESSAGES)
+    added = _sync_category_tables(conn)
+    conn.commit()
+
+    rows = _category_rows(db, conn)
+    assert {table: sorted(ids) for table, ids in rows.items()} == {
+        'tech_jobs': ['m1', 'm5'], 'non_tech_jobs': ['m2'], 'freelance_jobs': ['m3', 'm5'], 'fresher_jobs': ['m4'],
+    }, rows
+    assert added == {'tech_jobs': 2, 'non_tech_jobs': 1, 'freelance_jobs': 2, 'fresher_jobs': 1}, added
+    assert rows['tech_jobs']['m1'] == "Job post m1 " * 20
+    compressed = conn.execute("SELECT typeof(message_text) FROM tech_jobs WHERE message_id = 'm1'").fetchone()[0]
+    assert compressed == 'blob', "category bodies should be stored compressed"
+    conn.close()
+
+
+def test_watermark_and_reclassified_rows():
+    db = _database()
+    conn = sqlite3.connect(db.db_path)
+    _add_messages(conn, MESSAGES)
+    _sync_category_tables(conn)
+    assert set(_sync_category_tables(conn).values()) == {0}, "a second run copied rows again"
+
+    # New rows above the watermark
+    _add_messages(conn, [('m8', 'fresher', None)])
+    assert _sync_category_tables(conn)['fresher_jobs'] == 1
+
+    # m7 is re-classified in place, below the watermark: only synced when passed in
+    conn.execute("UPDATE messages SET job_type = 'non_tech' WHERE message_id = 'm7'")
+    assert _sync_category_tables(conn)['non_tech_jobs'] == 0
+    assert _sync_category_tables(conn, ['m7'])['non_tech_jobs'] == 1
+    conn.commit()
+    assert sorted(_category_rows(db, conn)['non_tech_jobs']) == ['m2', 'm7']
+    conn.close()
+
+
+def main():
+    print("="*60)
+    print("CATEGORY TABLE SYNC TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_sync_routes_messages_by_job_type, test_watermark_and_reclassified_rows):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
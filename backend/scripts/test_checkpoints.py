@@ -0,0 +1,205 @@
+"""
+Fetch Cycle Resume Test
+Interrupts a fetch cycle on the fake Telegram client, once between groups
+and once in the middle of a group, and checks that the next run resumes the
+same cycle with only the groups not done yet, ends up with exactly the
+messages of an uninterrupted run, and that the cycle after that only reads
+above each group's checkpoint. A cycle interrupted longer than
+resume_max_age_hours ago is started over.
+
+Uses the fake Telegram client and a throwaway data directory.
+
+Usage:
+  python3 scripts/test_checkpoints.py
+  python3 -m pytest scripts/test_checkpoints.py
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.fake_client import FakeTelegramClient
+from src.storage.database import DatabaseHandler
+
+NUM_GROUPS = 6
+MESSAGES_PER_GROUP = 60
+
+_offline_root = None
+
+
+def _database():
+    """A DatabaseHandler on its own temp file under the offline data dir"""
+    global _offline_root
+    if _offline_root is None:
+        from scripts.main import _use_offline_data_dir
+        _offline_root = _use_offline_data_dir()
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='checkpoints_', dir=_offline_root), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    return db
+
+
+def _fetcher(db, fake):
+    """A new TelegramJobFetcher (as after a restart) on the fake client"""
+    from src.core.telegram_client import TelegramJobFetcher
+
+    fetcher = TelegramJobFetcher(db=db)
+    fetcher.delay_scale = 0
+    fetcher.respect_working_hours = False
+    fetcher.use_offline_client(fake)
+    return fetcher
+
+
+def _run_cycle(fetcher, fake):
+    """Run one cycle; returns the links fetched and the min_id each scan started from"""
+    scans = []
+    real_iter = fake.iter_messages
+
+    def recording_iter(entity, limit=None, min_id=0):
+        scans.append((entity.username, min_id))
+        return real_iter(entity, limit=limit, min_id=min_id)
+
+    fake.iter_messages = recording_iter
+    try:
+        asyncio.run(fetcher.run_cycle(fake.groups_data()))
+    finally:
+        del fake.iter_messages
+    return scans
+
+
+def _query(db, sql):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def _stored(db):
+    return {row[0] for row in _query(db, 'SELECT message_id FROM messages UNION SELECT message_id FROM reposts')}
+
+
+def _uninterrupted_messages():
+    db = _database()
+    fake = FakeTelegramClient(num_groups=NUM_GROUPS, messages_per_group=MESSAGES_PER_GROUP)
+    _run_cycle(_fetcher(db, fake), fake)
+    return _stored(db)
+
+
+def _resume_after(interrupt):
+    """
+    Run a cycle interrupted by interrupt(fetcher, fake), then resume it
+
+    Returns: (db, fake, scans of the interrupted run, scans of the resumed run)
+    """
+    db = _database()
+    fake = FakeTelegramClient(num_groups=NUM_GROUPS, messages_per_group=MESSAGES_PER_GROUP)
+    fetcher = _fetcher(db, fake)
+    interrupt(fetcher, fake)
+    first = _run_cycle(fetcher, fake)
+    assert len(first) < NUM_GROUPS, f"the cycle was not interrupted: {first}"
+    assert _query(db, 'SELECT cycle_id, finished_at IS NULL FROM fetch_cycles') == [(1, 1)]
+
+    resumed = _run_cycle(_fetcher(db, fake), fake)
+    assert _query(db, 'SELECT cycle_id, finished_at IS NULL, groups_done FROM fetch_cycles') == \
+        [(1, 0, NUM_GROUPS)], "the resumed run did not finish the interrupted cycle"
+    return db, fake, first, resumed
+
+
+def test_resume_between_groups():
+    def stop_after_two_groups(fetcher, fake):
+        real_complete = fetcher._complete_group
+
+        async def complete_group(group_link, cycle_id):
+            await real_complete(group_link, cycle_id)
+            if len(fetcher.checkpoints) == 2:
+                fetcher.is_shutting_down = True
+
+        fetcher._complete_group = complete_group
+
+    db, fake, first, resumed = _resume_after(stop_after_two_groups)
+    assert len(first) == 2
+    # Only the four groups not done are fetched again, from scratch
+    links = [name for name, _ in resumed]
+    assert sorted(links) == sorted(group['link'].rsplit('/', 1)[1] for group in fake.groups_data()
+                                   if group['link'].rsplit('/', 1)[1] not in dict(first)), resumed
+    assert _stored(db) == _uninterrupted_messages()
+
+
+def test_resume_inside_a_group():
+    def stop_inside_third_group(fetcher, fake):
+        real_iter = fake.iter_messages
+        scans = []
+
+        async def stopping_iter(entity, limit=None, min_id=0):
+            scans.append(entity.username)
+            read = 0
+            async for message in real_iter(entity, limit=limit, min_id=min_id):
+                read += 1
+                if len(scans) == 3 and read == 20:
+                    fetcher.is_shutting_down = True
+                yield message
+
+        fake.iter_messages = stopping_iter
+
+    db, fake, first, resumed = _resume_after(stop_inside_third_group)
+    interrupted = first[-1][0]
+    assert len(first) == 3
+    # The interrupted group got no checkpoint, so it is read from the top again
+    assert (interrupted, 0) in resumed and len(resumed) == NUM_GROUPS - 2, resumed
+    assert _stored(db) == _uninterrupted_messages()
+
+    # Next cycle: every group is read above its checkpoint only, nothing new is stored
+    stored = _stored(db)
+    scans = _run_cycle(_fetcher(db, fake), fake)
+    assert len(scans) == NUM_GROUPS and all(min_id == MESSAGES_PER_GROUP for _, min_id in scans), scans
+    assert _stored(db) == stored
+    assert _query(db, 'SELECT cycle_id, finished_at IS NULL FROM fetch_cycles') == [(1, 0), (2, 0)]
+
+
+def test_stale_cycle_starts_over():
+    db = _database()
+    fake = FakeTelegramClient(num_groups=NUM_GROUPS, messages_per_group=MESSAGES_PER_GROUP)
+    fetcher = _fetcher(db, fake)
+    cycle_id = db.start_fetch_cycle(NUM_GROUPS)
+    link = fake.groups_data()[0]['link']
+    assert db.save_group_checkpoint(link, cycle_id=cycle_id)
+
+    fetcher.checkpoints = db.get_group_checkpoints()
+    assert fetcher._open_cycle(fake.groups_data()) == (cycle_id, {link})
+
+    conn = sqlite3.connect(db.db_path)
+    conn.execute('UPDATE fetch_cycles SET updated_at = ?', (time.time() - 25 * 3600,))
+    conn.commit()
+    conn.close()
+    new_cycle_id, done = fetcher._open_cycle(fake.groups_data())
+    assert new_cycle_id != cycle_id and done == set()
+    assert db.get_open_fetch_cycle()['cycle_id'] == new_cycle_id
+
+
+def main():
+    print("="*60)
+    print("FETCH CYCLE RESUME TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_resume_between_groups, test_resume_inside_a_group, test_stale_cycle_starts_over):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
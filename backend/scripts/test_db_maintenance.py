@@ -0,0 +1,174 @@
+"""
+Database Maintenance Test
+Runs the database maintenance tasks on temp databases: an online backup
+taken while another connection keeps writing (the copy must pass
+quick_check and hold one consistent snapshot) with old backups pruned to
+backup_keep, incremental vacuum returning freed pages, the one-off VACUUM
+into incremental mode of an older file, the WAL checkpoint falling back to
+PASSIVE while a reader holds a snapshot, and run_database_maintenance only
+running tasks once their interval has passed.
+
+Usage:
+  python3 scripts/test_db_maintenance.py
+  python3 -m pytest scripts/test_db_maintenance.py
+"""
+import glob
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DB_MAINTENANCE, PATHS
+from src.storage.migrations import migrate
+from src.utils.maintenance import backup_database, checkpoint_wal, compact_database, run_database_maintenance
+
+
+def _database(rows=2000):
+    """New database (as migrate() creates it) with `rows` messages"""
+    path = os.path.join(tempfile.mkdtemp(prefix='maintenance_'), 'telegram_jobs.db')
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO messages (message_id, group_name, message_text) VALUES (?, 'g', ?)",
+                     [(f"m{i}", f"job post {i} " * 40) for i in range(rows)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _with_settings(settings, test):
+    """Run test() with DB_MAINTENANCE / PATHS entries replaced"""
+    saved = {key: (target, target[key]) for target, values in settings for key in values}
+    for target, values in settings:
+        target.update(values)
+    try:
+        return test()
+    finally:
+        for key, (target, value) in saved.items():
+            target[key] = value
+
+
+def test_online_backup_while_writing():
+    path = _database()
+    backup_dir = tempfile.mkdtemp(prefix='backups_')
+    for day in range(1, 10):
+        open(os.path.join(backup_dir, f"telegram_jobs.202401{day:02d}_000000.db"), 'w').close()
+    stop = threading.Event()
+    written = []
+
+    def write():
+        conn = sqlite3.connect(path, timeout=30)
+        while not stop.is_set():
+            conn.execute("INSERT INTO messages (message_id, group_name) VALUES (?, 'g')", (f"w{len(written)}",))
+            conn.commit()
+            written.append(1)
+        conn.close()
+
+    def backup():
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            return backup_database(path, backup_dir)
+        finally:
+            stop.set()
+            writer.join()
+
+    backup_path = _with_settings([(DB_MAINTENANCE, {'backup_pages_per_step': 20, 'backup_step_sleep': 0.001,
+                                                    'backup_keep': 3})], backup)
+    assert backup_path and os.path.exists(backup_path), backup_path
+    assert written, "the writer never got the lock during the backup"
+    conn = sqlite3.connect(backup_path)
+    check = conn.execute('PRAGMA quick_check').fetchone()[0]
+    copied = conn.execute("SELECT COUNT(*) FROM messages WHERE message_id LIKE 'm%'").fetchone()[0]
+    conn.close()
+    assert check == 'ok' and copied == 2000, (check, copied)
+
+    backups = sorted(glob.glob(os.path.join(backup_dir, '*.db')))
+    assert len(backups) == 3 and backups[-1] == backup_path, backups
+    assert not glob.glob(os.path.join(backup_dir, '*.partial'))
+
+
+def test_incremental_vacuum_and_old_files():
+    path = _database()
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute('DELETE FROM messages')
+    free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2 and free > 0
+    assert compact_database(conn) == free
+    assert conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+    conn.close()
+
+    # A file from before incremental mode: only converted offline, above the free ratio
+    old_path = os.path.join(tempfile.mkdtemp(prefix='maintenance_'), 'old.db')
+    conn = sqlite3.connect(old_path, isolation_level=None)
+    conn.execute('CREATE TABLE t (body TEXT)')
+    conn.executemany('INSERT INTO t VALUES (?)', [('x' * 2000,)] * 500)
+    conn.execute('DELETE FROM t')
+    assert compact_database(conn) == 0
+    assert compact_database(conn, allow_full_vacuum=True) > 0
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    conn.close()
+
+
+def test_checkpoint_falls_back_under_reader():
+    path = _database(rows=10)
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute('PRAGMA busy_timeout = 100')
+    conn.execute("INSERT INTO messages (message_id, group_name) VALUES ('new', 'g')")
+
+    reader = sqlite3.connect(path, isolation_level=None)
+    reader.execute('BEGIN')
+    reader.execute('SELECT COUNT(*) FROM messages').fetchone()
+    conn.execute("INSERT INTO messages (message_id, group_name) VALUES ('newer', 'g')")
+    busy, _, _ = checkpoint_wal(conn)
+    assert busy == 0, "PASSIVE does not wait, so it is never busy"
+    assert os.path.getsize(f"{path}-wal") > 0, "the WAL was truncated under a reader"
+    reader.execute('COMMIT')
+    reader.close()
+
+    assert checkpoint_wal(conn)[0] == 0
+    assert os.path.getsize(f"{path}-wal") == 0
+    conn.close()
+
+
+def test_tasks_run_when_due():
+    path = _database(rows=10)
+    temp_paths = {key: tempfile.mkdtemp(prefix=f"{key}_") for key in ('backups', 'metrics', 'archive')}
+
+    def run():
+        first = run_database_maintenance(path)
+        second = run_database_maintenance(path)
+        forced = run_database_maintenance(path, force=True)
+        return first, second, forced
+
+    first, second, forced = _with_settings([(PATHS, temp_paths)], run)
+    tasks = {'archived', 'activity_pruned', 'backup', 'pages_freed', 'optimized', 'checkpoint', 'sizes'}
+    assert set(first) == tasks, first
+    assert set(second) == {'sizes'}, second
+    assert set(forced) == tasks, forced
+    assert len(glob.glob(os.path.join(temp_paths['backups'], '*.db'))) >= 1
+    with open(os.path.join(temp_paths['metrics'], 'db_size_history.jsonl')) as f:
+        assert len(f.readlines()) == 3
+
+
+def main():
+    print("="*60)
+    print("DATABASE MAINTENANCE TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_online_backup_while_writing, test_incremental_vacuum_and_old_files,
+                 test_checkpoint_falls_back_under_reader, test_tasks_run_when_due):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Application Dispatcher Test
+Runs ApplicationDispatcher against a stand-in sender (no SMTP) and checks
+the quota (failed sends don't use it up, in-flight sends count against it)
+and that on_result sees every send as it completes, so callers can record
+each one before the run ends.
+
+Usage:
+  python3 scripts/test_dispatcher.py
+  python3 -m pytest scripts/test_dispatcher.py
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.auto_apply.dispatcher import ApplicationDispatcher
+
+
+class _FakeSender:
+    """send_application() that fails for addresses starting with 'bad'"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.smtp_pool_size = 1
+        self.sent = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def smtp_session(self):
+        yield None
+
+    def send_application(self, to_email, job, dry_run=False):
+        time.sleep(self.delay)
+        if to_email.startswith('bad'):
+            return {'status': 'failed', 'to': to_email, 'error': '550 no such user'}
+        with self._lock:
+            self.sent.append(to_email)
+        return {'status': 'sent', 'to': to_email}
+
+
+def _jobs(addresses):
+    # One domain per job, so the per-domain rate limit never waits
+    return [{'message_id': str(i), 'application_link': f"{address}@company{i}.com"}
+            for i, address in enumerate(addresses)]
+
+
+def _dispatch(sender, jobs, quota=None, on_result=None, concurrency=4):
+    dispatcher = ApplicationDispatcher(sender, concurrency=concurrency, rate_per_minute=60000)
+    dispatcher.global_bucket.capacity = dispatcher.global_bucket.tokens = 1000
+    return asyncio.run(dispatcher.dispatch(jobs, quota=quota, on_result=on_result))
+
+
+def test_quota_skips_failed_sends():
+    sender = _FakeSender()
+    jobs = _jobs(['bad', 'hr', 'bad', 'hr', 'hr', 'hr', 'hr'])
+    results = _dispatch(sender, jobs, quota=3)
+    assert len(sender.sent) == 3, f"sent {len(sender.sent)} with quota 3"
+    assert sum(1 for _, r in results if r['status'] == 'failed') == 2
+
+
+def test_quota_with_concurrency_never_oversends():
+    for concurrency in (1, 3, 8):
+        sender = _FakeSender()
+        _dispatch(sender, _jobs(['hr'] * 20), quota=5, concurrency=concurrency)
+        assert len(sender.sent) == 5, f"{concurrency} workers sent {len(sender.sent)} with quota 5"
+
+
+def test_on_result_called_per_send():
+    sender = _FakeSender()
+    seen = []
+    results = _dispatch(sender, _jobs(['hr', 'bad', 'hr']), concurrency=1,
+                        on_result=lambda job, result: seen.append((job['message_id'], len(sender.sent))))
+    # Each send reported right after it completed, not at the end of the run
+    assert seen == [('0', 1), ('1', 1), ('2', 2)], seen
+    assert len(results) == 3
+
+
+def main():
+    print("="*60)
+    print("APPLICATION DISPATCHER TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_quota_skips_failed_sends, test_quota_with_concurrency_never_oversends,
+                 test_on_result_called_per_send):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
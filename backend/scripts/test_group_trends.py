@@ -0,0 +1,116 @@
+"""
+Group Activity Trends Test
+Folds synthetic hourly group_activity rows into daily series and checks the
+scores: a steady group is 'ok', a collapse or burst of jobs is a 'drop' /
+'spike', a burst of chatter is 'spam', a group without history is 'new' and
+one fetched for dead_after_days without a job is 'dead'. Also checks the
+hourly buckets on a temp database and that the scheduler moves dead groups
+last, fetching them only every dead_fetch_every_n_cycles-th cycle.
+
+Usage:
+  python3 scripts/test_group_trends.py
+  python3 -m pytest scripts/test_group_trends.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import GROUP_TRENDS
+from src.services.group_trends import current_hour, daily_series, dead_groups, ewma_stats, score_groups
+from src.storage.database import DatabaseHandler
+
+NOW_HOUR = 500_000
+STEADY = [10, 12, 9, 11, 10, 10, 12, 11, 9, 10, 11, 10, 12]  # 13 days before the last 24 hours
+
+
+def _rows(group_link, daily_jobs, non_jobs=0):
+    """One fetch per day, oldest day first; the last value is the last 24 hours"""
+    return [(group_link, NOW_HOUR - 24 * age - 3, 1, jobs, non_jobs, 0)
+            for age, jobs in enumerate(reversed(daily_jobs))]
+
+
+def test_daily_series():
+    rows = [('g', NOW_HOUR, 1, 2, 1, 0), ('g', NOW_HOUR - 23, 2, 3, 0, 1), ('g', NOW_HOUR - 24, 1, 5, 0, 0),
+            ('g', NOW_HOUR - 24 * 14, 1, 99, 0, 0), ('g', NOW_HOUR + 1, 1, 99, 0, 0)]
+    days = daily_series(rows, 14, NOW_HOUR)['g']
+    assert len(days) == 14
+    assert days[-1] == {'fetches': 3, 'jobs': 5, 'non_jobs': 1, 'duplicates': 1}, days[-1]
+    assert days[-2]['jobs'] == 5
+    assert sum(day['jobs'] for day in days) == 10, "rows outside the window were counted"
+    assert current_hour(3600 * 7 + 5) == 7
+
+
+def test_ewma_stats():
+    assert ewma_stats([], 0.3) == (None, None)
+    assert ewma_stats([4, 4, 4], 0.3) == (4.0, 0.0)
+    assert ewma_stats([0, 10], 0.5) == (5.0, 5.0)
+
+
+def test_scores():
+    rows = (_rows('steady', STEADY + [11]) + _rows('drop', STEADY + [0]) + _rows('spike', STEADY + [45])
+            + _rows('spam', STEADY + [10], non_jobs=1)[1:] + [('spam', NOW_HOUR - 3, 1, 10, 60, 0)]
+            + _rows('new', [3, 4]) + _rows('dead', [5] * 5 + [0] * 9))
+    scores = score_groups(rows, NOW_HOUR)
+    status = {link: score['status'] for link, score in scores.items()}
+    assert status == {'steady': 'ok', 'drop': 'drop', 'spike': 'spike', 'spam': 'spam', 'new': 'new',
+                      'dead': 'dead'}, status
+    assert scores['steady']['jobs_24h'] == 11 and abs(scores['steady']['z']) < GROUP_TRENDS['z_threshold']
+    assert scores['spike']['z'] >= GROUP_TRENDS['z_threshold']
+    assert scores['new']['z'] is None
+
+    # Watched for less than dead_after_days: not dead yet, however quiet
+    short = _rows('short', [0] * (GROUP_TRENDS['dead_after_days'] - 1))
+    assert score_groups(short, NOW_HOUR)['short']['status'] != 'dead'
+    assert dead_groups(rows + short, NOW_HOUR) == {'dead'}
+
+
+def test_hourly_buckets_and_schedule():
+    from src.core.telegram_client import TelegramJobFetcher
+
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='trends_'), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+
+    hour = current_hour()
+    assert db.record_group_activity('a', hour, jobs=2, last_message_id=40)
+    assert db.record_group_activity('a', hour, jobs=1, non_jobs=3, duplicates=1, last_message_id=30)
+    for day in range(GROUP_TRENDS['dead_after_days']):
+        assert db.record_group_activity('dead', hour - 24 * day, non_jobs=2, last_message_id=9)
+    assert db.record_group_activity('a', hour - 10_000, jobs=7)
+    assert sorted(db.get_group_activity(hour - 24 * 30)) == sorted(
+        [('a', hour, 2, 3, 3, 1)] + [('dead', hour - 24 * day, 1, 0, 2, 0)
+                                     for day in range(GROUP_TRENDS['dead_after_days'])])
+    assert db.get_group_activity_marks() == {'a': 40, 'dead': 9}
+
+    # _schedule_groups only needs the database and the cycle count
+    scheduler = type('Scheduler', (), {'db': db, 'cycle_count': 0})()
+    groups = [{'link': 'dead'}, {'link': 'a'}, {'link': 'b'}]
+    every = GROUP_TRENDS['dead_fetch_every_n_cycles']
+    assert TelegramJobFetcher._schedule_groups(scheduler, groups, cycle=1) == groups[1:]
+    assert TelegramJobFetcher._schedule_groups(scheduler, groups, cycle=every) == groups[1:] + groups[:1]
+
+
+def main():
+    print("="*60)
+    print("GROUP ACTIVITY TRENDS TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_daily_series, test_ewma_stats, test_scores, test_hourly_buckets_and_schedule):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Import-Time Budget Test
+Checks that the dashboard, report and status entry points start fast and
+never pull in Telethon.
+
+Usage:
+  python3 scripts/test_import_time.py
+  python3 -m pytest scripts/test_import_time.py
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+and its cumulative import time is compared against a budget.
+"""
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import-time budgets in milliseconds (generous for slow CI boxes).
+# dashboard.app includes Flask itself, which is ~150ms on a laptop.
+IMPORT_BUDGETS_MS = {
+    'dashboard.app': 600,
+    'scripts.check_status': 150,
+    'scripts.generate_report': 150,
+    'src.utils.maintenance': 200,
+}
+
+# Modules that must never be loaded by the read-only entry points
+FORBIDDEN_MODULES = {
+    'dashboard.app': ['telethon', 'src.services.job_scorer', 'src.utils.location_categorizer'],
+    'scripts.check_status': ['telethon'],
+    'scripts.generate_report': ['telethon'],
+    'src.utils.maintenance': ['telethon', 'src.services.classifier'],
+}
+
+_PROBE = (
+    "import json, sys; import {module}; "
+    "print(json.dumps(sorted(m for m in {forbidden!r} if m in sys.modules)))"
+)
+
+
+def measure_import(module):
+    """
+    Import `module` in a fresh interpreter
+
+    Returns:
+        tuple: (cumulative_ms, loaded_forbidden_modules)
+    """
+    forbidden = FORBIDDEN_MODULES.get(module, ['telethon'])
+    code = _PROBE.format(module=module, forbidden=forbidden)
+    cmd = [sys.executable, '-X', 'importtime', '-c', code]
+
+    # First run warms the bytecode cache so compile time is not measured
+    subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+
+    if cumulative_us is None:
+        raise RuntimeError(f"No importtime entry found for {module}")
+
+    loaded = proc.stdout.strip().splitlines()[-1]
+    return cumulative_us / 1000.0, [m.strip('" ') for m in loaded.strip('[]').split(',') if m.strip()]
+
+
+def _check(module):
+    elapsed_ms, loaded = measure_import(module)
+    budget_ms = IMPORT_BUDGETS_MS[module]
+    assert not loaded, f"{module} imported forbidden modules: {', '.join(loaded)}"
+    assert elapsed_ms <= budget_ms, f"{module} took {elapsed_ms:.1f}ms (budget {budget_ms}ms)"
+    return elapsed_ms
+
+
+def test_dashboard_import_time():
+    _check('dashboard.app')
+
+
+def test_check_status_import_time():
+    _check('scripts.check_status')
+
+
+def test_generate_report_import_time():
+    _check('scripts.generate_report')
+
+
+def test_maintenance_import_time():
+    _check('src.utils.maintenance')
+
+
+def main():
+    print("="*60)
+    print("IMPORT-TIME BUDGET CHECK")
+    print("="*60)
+    print()
+
+    failures = 0
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        try:
+            elapsed_ms = _check(module)
+            print(f"   ✅ {module:30s} {elapsed_ms:7.1f}ms (budget {budget_ms}ms)")
+        except (AssertionError, RuntimeError) as e:
+            failures += 1
+            print(f"   ❌ {e}")
+
+    print()
+    print("="*60)
+    print("✅ All import budgets met" if not failures else f"❌ {failures} budget check(s) failed")
+    print("="*60)
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
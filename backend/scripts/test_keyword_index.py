@@ -0,0 +1,113 @@
+"""
+Keyword Index Consistency Test
+Checks that message_keywords always matches messages.keywords_found on a
+temp database: after inserts (with duplicate and blank keywords), after a
+message is re-classified, after re-inserting an id that is already stored,
+and after messages are deleted, which must take their keyword rows along.
+
+Usage:
+  python3 scripts/test_keyword_index.py
+  python3 -m pytest scripts/test_keyword_index.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.database import DatabaseHandler
+from src.storage.keyword_index import index_message_keywords, split_keywords
+
+KEYWORDS = ['python,django', 'python, react ,python', '', 'sales', ' ,react,,']
+
+
+def _database():
+    """A DatabaseHandler on its own temp file (not the process-wide instance)"""
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='keywords_'), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    return db
+
+
+def _message(message_id, keywords):
+    return {'message_id': message_id, 'group_name': 'g', 'group_link': 'https://t.me/g', 'sender': 'hr',
+            'date': '2025-01-01 10:00:00', 'message_text': f"job {message_id}", 'job_type': 'tech',
+            'keywords_found': keywords, 'account_used': 'account1'}
+
+
+def _assert_consistent(db):
+    """message_keywords holds exactly the split keywords_found of each stored message"""
+    conn = sqlite3.connect(db.db_path)
+    try:
+        expected = {(row_id, keyword)
+                    for row_id, keywords in conn.execute('SELECT id, keywords_found FROM messages')
+                    for keyword in split_keywords(keywords)}
+        indexed = set(conn.execute('''
+            SELECT mk.message_rowid, k.keyword FROM message_keywords mk JOIN keywords k USING (keyword_id)
+        '''))
+    finally:
+        conn.close()
+    assert indexed == expected, f"missing {sorted(expected - indexed)}, extra {sorted(indexed - expected)}"
+    return indexed
+
+
+def test_insert_and_reinsert():
+    db = _database()
+    assert db.insert_messages([_message(f"m{i}", keywords) for i, keywords in enumerate(KEYWORDS)])
+    indexed = _assert_consistent(db)
+    assert len(indexed) == 6, sorted(indexed)
+
+    # Re-fetching a stored message neither duplicates nor changes its keywords
+    assert db.insert_messages([_message('m0', 'golang')])
+    assert _assert_consistent(db) == indexed
+
+
+def test_reclassified_message():
+    db = _database()
+    assert db.insert_messages([_message('m0', 'python,django')])
+    conn = sqlite3.connect(db.db_path)
+    cursor = conn.cursor()
+    cursor.execute("UPDATE messages SET keywords_found = 'react,sales' WHERE message_id = 'm0'")
+    index_message_keywords(cursor, 1, 'react,sales', replace=True)
+    conn.commit()
+    conn.close()
+    assert {keyword for _, keyword in _assert_consistent(db)} == {'react', 'sales'}
+
+
+def test_deleted_messages_take_their_keywords():
+    db = _database()
+    assert db.insert_messages([_message(f"m{i}", keywords) for i, keywords in enumerate(KEYWORDS)])
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("DELETE FROM messages WHERE message_id IN ('m0', 'm4')")
+    conn.commit()
+    conn.close()
+    assert {keyword for _, keyword in _assert_consistent(db)} == {'python', 'react', 'sales'}
+
+    # New messages never pick up keyword rows of deleted ones
+    assert db.insert_messages([_message('m5', '')])
+    _assert_consistent(db)
+
+
+def main():
+    print("="*60)
+    print("KEYWORD INDEX CONSISTENCY TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_insert_and_reinsert, test_reclassified_message, test_deleted_messages_take_their_keywords):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
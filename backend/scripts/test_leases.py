@@ -0,0 +1,106 @@
+"""
+Shard Lease Test
+Runs the group_leases calls sharded workers use against a temp database:
+claiming free shards, renewing, taking over an expired lease (the old
+owner's renewal then fails), the min_interval wait after a completed shard,
+and a locked database on renewal, which must raise rather than report the
+lease as lost.
+
+Usage:
+  python3 scripts/test_leases.py
+  python3 -m pytest scripts/test_leases.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.database import DatabaseHandler
+
+
+def _database():
+    """A DatabaseHandler on its own temp file (not the process-wide instance)"""
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='leases_'), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    db.ensure_shards(2)
+    return db
+
+
+def test_claim_renew_and_take_over_expired_lease():
+    db = _database()
+    first = db.claim_shard('w1', lease_seconds=100, min_interval=0)
+    second = db.claim_shard('w2', lease_seconds=100, min_interval=0)
+    assert (first['shard'], second['shard']) == (0, 1), (first, second)
+    assert not first['taken_over']
+    assert db.claim_shard('w3', lease_seconds=100, min_interval=0) is None, "both shards are leased"
+    assert db.renew_lease(0, 'w1', 100)
+
+    # w2 stops renewing: once its lease expires another worker takes the shard
+    assert db.renew_lease(1, 'w2', -1)
+    taken = db.claim_shard('w3', lease_seconds=100, min_interval=0)
+    assert taken['shard'] == 1 and taken['taken_over'], taken
+    assert db.renew_lease(1, 'w2', 100) is False, "w2 renewed a lease it lost"
+    assert db.release_shard(1, 'w2') is False
+
+
+def test_completed_shard_waits_min_interval():
+    db = _database()
+    db.claim_shard('w1', lease_seconds=100, min_interval=0)
+    assert db.release_shard(0, 'w1', completed=True)
+    claimed = db.claim_shard('w2', lease_seconds=100, min_interval=3600)
+    assert claimed['shard'] == 1, "shard 0 was fetched just now"
+    assert db.claim_shard('w3', lease_seconds=100, min_interval=3600) is None
+    assert db.claim_shard('w3', lease_seconds=100, min_interval=0)['shard'] == 0
+
+
+def test_locked_database_is_not_a_lost_lease():
+    db = _database()
+    db.claim_shard('w1', lease_seconds=100, min_interval=0)
+    real_connect = db.connect
+
+    def impatient_connect():
+        conn = real_connect()
+        conn.execute('PRAGMA busy_timeout = 0')
+        return conn
+
+    blocker = sqlite3.connect(db.db_path, isolation_level=None)
+    blocker.execute('BEGIN EXCLUSIVE')
+    db.connect = impatient_connect
+    try:
+        db.renew_lease(0, 'w1', 100)
+        assert False, "renew_lease() returned instead of raising"
+    except sqlite3.OperationalError as e:
+        assert 'locked' in str(e), e
+    finally:
+        blocker.execute('ROLLBACK')
+        blocker.close()
+        del db.connect
+    assert db.renew_lease(0, 'w1', 100)
+
+
+def main():
+    print("="*60)
+    print("SHARD LEASE TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_claim_renew_and_take_over_expired_lease, test_completed_shard_waits_min_interval,
+                 test_locked_database_is_not_a_lost_lease):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Logging Backend Test
+Logs through the queue backend into a temp logs directory and checks that
+JSON lines keep the traceback of logger.error(..., exc_info=True), and that
+records logged after shutdown_logging() (atexit handlers, a second run in the
+same process) are still written instead of sitting in an undrained queue.
+
+Usage:
+  python3 scripts/test_logger.py
+  python3 -m pytest scripts/test_logger.py
+"""
+import glob
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import LOGGING, PATHS
+from src.utils import logger as logger_module
+from src.utils.logger import get_logger, shutdown_logging
+
+
+def _logged(structured, write):
+    """Run write(logger) against a temp logs dir; returns the lines written"""
+    saved = PATHS['logs'], dict(LOGGING)
+    shutdown_logging()
+    PATHS['logs'] = tempfile.mkdtemp(prefix='logs_')
+    LOGGING.update(structured=structured, backend='queue', rotation=None)
+    try:
+        write(get_logger('test_logger'))
+        shutdown_logging()
+        lines = []
+        for path in glob.glob(os.path.join(PATHS['logs'], 'test_logger*')):
+            with open(path, encoding='utf-8') as f:
+                lines.extend(f.read().splitlines())
+        return lines
+    finally:
+        PATHS['logs'] = saved[0]
+        LOGGING.clear()
+        LOGGING.update(saved[1])
+        shutdown_logging()
+
+
+def test_json_lines_keep_traceback():
+    def write(logger):
+        try:
+            raise ValueError('bad row 42')
+        except ValueError:
+            logger.error("Insert failed", exc_info=True)
+
+    entries = [json.loads(line) for line in _logged(True, write)]
+    assert len(entries) == 1, entries
+    assert entries[0]['message'] == 'Insert failed'
+    assert 'ValueError: bad row 42' in entries[0].get('exception', ''), entries[0]
+
+
+def test_records_after_shutdown_are_written():
+    def write(logger):
+        logger.info("before shutdown")
+        shutdown_logging()
+        assert logger_module._router is None and logger_module._queue_handler is None
+        logger.info("after shutdown")
+        assert logger_module._listener is not None, "the queue backend was not set up again"
+
+    lines = _logged(False, write)
+    assert any('before shutdown' in line for line in lines), lines
+    assert any('after shutdown' in line for line in lines), lines
+
+
+def main():
+    print("="*60)
+    print("LOGGING BACKEND TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_json_lines_keep_traceback, test_records_after_shutdown_are_written):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Shared Scorer And Categorizer Test
+Checks the LRU behind the dashboard's memoized scorer and categorizer
+(eviction order, hit counts, None never cached), that the shared
+LocationCategorizer gives the same answers as the old per-keyword
+substring checks, from the cache on repeat calls and under threads, and
+that the shared JobQualityScorer hands out copies a route can change
+without touching the cached result.
+
+Usage:
+  python3 scripts/test_memo.py
+  python3 -m pytest scripts/test_memo.py
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.memo import LRUCache, text_key
+
+LOCATIONS = [
+    'Pan India', 'Multiple Locations', 'Remote', 'WFH / Bangalore', 'USA', 'Houston',
+    'Bengaluru', 'Indian subcontinent', 'Kathmandu ', 'London, UK', 'Goa', '  Berlin  ',
+]
+
+JOB_TEXT = """Company: Acme Labs
+Hiring Python Developer
+Location: Bangalore (Remote)
+Salary: 12 LPA
+Skills: Python, Django, SQL
+Apply: https://acme.example/jobs/42"""
+
+
+def _old_categorize(categorizer, location_text):
+    """categorize() as it was before the keyword lists were folded into one pattern each"""
+    location_lower = location_text.lower().strip()
+    if any(keyword in location_lower for keyword in categorizer.pan_india_keywords):
+        return 'Pan India'
+    if any(keyword in location_lower for keyword in categorizer.remote_keywords):
+        return 'Remote'
+    if any(keyword in location_lower for keyword in categorizer.international_keywords):
+        return 'International'
+    if 'india' in location_lower or any(city in location_lower for city in categorizer.indian_cities):
+        return 'Pan India'
+    return location_text.strip()
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('c') == 3 and len(cache) == 2
+    assert cache.put('d', None) is None and cache.get('d') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 2, 0.5), stats
+
+    assert text_key('a' * 100_000) == text_key('a' * 100_000) != text_key('a' * 99_999)
+    assert len(text_key('a' * 100_000)) == 16
+
+
+def test_categorizer_matches_keyword_checks():
+    from src.utils.location_categorizer import LocationCategorizer, categorizer
+
+    fresh = LocationCategorizer(cache_size=4)
+    for location in LOCATIONS:
+        expected = _old_categorize(fresh, location)
+        assert fresh.categorize(location) == categorizer.categorize(location) == expected, location
+    assert categorizer.categorize('Houston') == 'International', "'us' is a substring match, as before"
+    assert fresh.get_location_category('Kathmandu') == 'specific_city'
+
+    # Without a location only the message text is read, keyed by its hash
+    assert fresh.categorize('', 'Fully remote role, apply now') == 'Remote'
+    assert fresh.categorize(None, 'Office role in Pune') == ''
+    assert fresh.categorize(None) == ''
+    hits = fresh.cache.hits
+    assert fresh.categorize('', 'Fully remote role, apply now') == 'Remote'
+    assert fresh.cache.hits == hits + 1
+    assert len(fresh.cache) == 4
+
+
+def test_categorizer_under_threads():
+    from src.utils.location_categorizer import LocationCategorizer
+
+    shared = LocationCategorizer(cache_size=5)  # Smaller than the inputs: entries keep being evicted
+    expected = {location: _old_categorize(shared, location) for location in LOCATIONS}
+    wrong = []
+
+    def categorize():
+        for _ in range(200):
+            for location in LOCATIONS:
+                if shared.categorize(location) != expected[location]:
+                    wrong.append(location)
+
+    workers = [threading.Thread(target=categorize) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert not wrong, wrong[:5]
+    assert len(shared.cache) == 5
+
+
+def test_scorer_hands_out_copies():
+    from src.services.job_scorer import JobQualityScorer, scorer
+
+    first = scorer.score_job(JOB_TEXT)
+    assert first == JobQualityScorer(cache_size=1).score_job(JOB_TEXT)
+    assert first['has_salary'] and first['has_apply_link'] and first['has_remote'], first
+    assert scorer.is_best_job(first)
+
+    first['total_score'] = -1  # A route adding its own fields to a result
+    second = scorer.score_job(JOB_TEXT)
+    assert second is not first and second['total_score'] >= 60
+    assert scorer.score_job('') == scorer._empty_score()
+
+
+def main():
+    print("="*60)
+    print("SHARED SCORER AND CATEGORIZER TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_lru_cache, test_categorizer_matches_keyword_checks, test_categorizer_under_threads,
+                 test_scorer_hands_out_copies):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
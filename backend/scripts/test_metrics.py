@@ -0,0 +1,118 @@
+"""
+Metrics Rendering Test
+Checks the metrics registry (counters under threads, histogram count/sum
+and windowed percentiles), the Prometheus text rendering of one and of
+several labelled snapshots, and the dashboard's /metrics endpoint over the
+snapshot files of a single fetcher and of sharded workers.
+
+Usage:
+  python3 scripts/test_metrics.py
+  python3 -m pytest scripts/test_metrics.py
+"""
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import PATHS
+from src.utils.metrics import Histogram, MetricsRegistry, render_prometheus
+
+
+def _registry():
+    registry = MetricsRegistry()
+    registry.counter('jobs_total', 'Jobs stored').inc(3)
+    registry.gauge('queue_depth', 'Items waiting').set(2)
+    histogram = registry.histogram('fetch_seconds', 'Fetch latency')
+    for value in range(1, 101):
+        histogram.observe(value / 100)
+    return registry
+
+
+def test_counters_and_percentiles():
+    registry = MetricsRegistry()
+    counter = registry.counter('hits_total')
+    workers = [threading.Thread(target=lambda: [counter.inc() for _ in range(1000)]) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert counter.value == 8000
+    assert registry.counter('hits_total') is counter
+
+    snapshot = _registry().snapshot()['histograms']['fetch_seconds']
+    assert (snapshot['count'], snapshot['sum'], snapshot['min'], snapshot['max']) == (100, 50.5, 0.01, 1.0), snapshot
+    assert (snapshot['p50'], snapshot['p95'], snapshot['p99']) == (0.5, 0.95, 0.99), snapshot
+
+    # Percentiles come from the recent window; count and sum cover everything
+    histogram = Histogram('sizes', window=10)
+    for value in range(100):
+        histogram.observe(value)
+    sizes = histogram.snapshot()
+    assert (sizes['count'], sizes['min'], sizes['p50']) == (100, 0, 94), sizes
+
+
+def test_render_single_and_labelled_snapshots():
+    snapshot = _registry().snapshot()
+    lines = render_prometheus(snapshot).splitlines()
+    assert lines[:6] == ['# HELP jobs_total Jobs stored', '# TYPE jobs_total counter', 'jobs_total 3',
+                         '# HELP queue_depth Items waiting', '# TYPE queue_depth gauge', 'queue_depth 2'], lines
+    assert 'fetch_seconds{quantile="0.95"} 0.95' in lines
+    assert 'fetch_seconds_sum 50.5' in lines and 'fetch_seconds_count 100' in lines
+
+    text = render_prometheus(({'worker': 'w1'}, snapshot), ({'worker': 'a"b\\c'}, snapshot), snapshot)
+    assert text.count('# TYPE jobs_total counter') == 1, text
+    assert 'jobs_total{worker="w1"} 3' in text and 'jobs_total{worker="a\\"b\\\\c"} 3' in text
+    assert 'fetch_seconds{worker="w1",quantile="0.5"} 0.5' in text
+    assert '\njobs_total 3\n' in text
+
+
+def test_metrics_endpoint():
+    from dashboard.app import app
+
+    saved = PATHS['metrics']
+    PATHS['metrics'] = tempfile.mkdtemp(prefix='metrics_')
+    try:
+        snapshot_path = _registry().dump_json(os.path.join(PATHS['metrics'], 'fetcher_metrics.json'))
+        worker = MetricsRegistry()
+        worker.counter('jobs_total', 'Jobs stored').inc(5)
+        worker.dump_json(os.path.join(PATHS['metrics'], 'fetcher_metrics_w2.json'))
+        with open(os.path.join(PATHS['metrics'], 'fetcher_metrics_broken.json'), 'w') as f:
+            f.write('{"counters": ')  # A snapshot being written: skipped
+        assert not os.path.exists(f"{snapshot_path}.tmp")
+
+        client = app.test_client()
+        client.get('/metrics')  # So the dashboard's own request timer has a sample
+        response = client.get('/metrics')
+    finally:
+        PATHS['metrics'] = saved
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert text.count('# TYPE jobs_total counter') == 1, text
+    assert '\njobs_total 3\n' in text and 'jobs_total{worker="w2"} 5' in text
+    assert 'fetcher_metrics_age_seconds ' in text and 'fetcher_metrics_age_seconds{worker="w2"} ' in text
+    assert 'worker="broken"' not in text
+    assert 'dashboard_request_seconds_count ' in text
+
+
+def main():
+    print("="*60)
+    print("METRICS RENDERING TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_counters_and_percentiles, test_render_single_and_labelled_snapshots, test_metrics_endpoint):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
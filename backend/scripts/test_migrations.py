@@ -0,0 +1,175 @@
+"""
+Schema Migration Test
+Runs the migration chain on temp databases: a new database, a database from
+before versioning (user_version 0, tables already there) with duplicate
+texts and keywords to backfill in small batches, and a backfill interrupted half way,
+which must leave the version alone and finish on the next start.
+
+Usage:
+  python3 scripts/test_migrations.py
+  python3 -m pytest scripts/test_migrations.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import near_duplicate
+from src.storage import keyword_index, migrations
+from src.storage.migrations import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+
+TEXTS = ['Hiring python dev, mail hr@acme.com', 'Hiring  Python dev, mail hr@acme.com!',
+         'React intern wanted', 'DevOps lead, remote', 'react intern WANTED']
+EXPECTED_TABLES = ['messages', 'tech_jobs', 'reposts', 'application_links', 'message_keywords',
+                   'group_activity', 'group_leases', 'fetch_cycles', 'group_checkpoints']
+
+
+def _db_path():
+    return os.path.join(tempfile.mkdtemp(prefix='migrations_'), 'telegram_jobs.db')
+
+
+def _legacy_database(count=30):
+    """Tables of the pre-versioning schema at user_version 0, with messages"""
+    path = _db_path()
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    migrations._initial_schema(cursor)
+    migrations._messages_job_location(cursor)
+    cursor.executemany('''
+        INSERT INTO messages (message_id, group_name, message_text, keywords_found)
+        VALUES (?, 'g', ?, 'python, react')
+    ''', [(f"m{i}", TEXTS[i % len(TEXTS)]) for i in range(count)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _expected_hashes(path):
+    """id -> hash for the first copy of each normalized text"""
+    conn = sqlite3.connect(path)
+    rows = conn.execute('SELECT id, message_text FROM messages ORDER BY id').fetchall()
+    conn.close()
+    first = {}
+    for row_id, text in rows:
+        first.setdefault(near_duplicate.content_hash(text), row_id)
+    return {row_id: value for value, row_id in first.items()}
+
+
+def _stored_hashes(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute('SELECT id, content_hash FROM messages WHERE content_hash IS NOT NULL').fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def _version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return schema_version(conn)
+    finally:
+        conn.close()
+
+
+def test_new_database():
+    path = _db_path()
+    assert migrate(path) == 0
+    assert _version(path) == SCHEMA_VERSION
+    conn = sqlite3.connect(path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    missing = [table for table in EXPECTED_TABLES if table not in tables]
+    assert not missing, f"Missing tables: {missing}"
+
+
+def test_legacy_database_backfilled_in_batches():
+    path = _legacy_database()
+    expected = _expected_hashes(path)
+    keyword_batches = []
+    real_index_batch = keyword_index.index_keyword_batch
+
+    def recording_index_batch(cursor, rows, keyword_ids):
+        keyword_batches.append(len(rows))
+        return real_index_batch(cursor, rows, keyword_ids)
+
+    migrations.BACKFILL_BATCH_SIZE, batch_size = 4, migrations.BACKFILL_BATCH_SIZE
+    keyword_index.index_keyword_batch = recording_index_batch
+    try:
+        assert migrate(path) == 0
+    finally:
+        migrations.BACKFILL_BATCH_SIZE = batch_size
+        keyword_index.index_keyword_batch = real_index_batch
+    assert _version(path) == SCHEMA_VERSION
+    # Only the first copy of each text is hashed; later copies stay NULL
+    assert _stored_hashes(path) == expected, _stored_hashes(path)
+    assert len(expected) == 3
+
+    # Every message indexed under both its keywords, 4 messages per transaction
+    assert keyword_batches == [4] * 7 + [2], keyword_batches
+    conn = sqlite3.connect(path)
+    rows = conn.execute('''
+        SELECT k.keyword, COUNT(*) FROM message_keywords mk JOIN keywords k USING (keyword_id)
+        GROUP BY k.keyword ORDER BY k.keyword
+    ''').fetchall()
+    conn.close()
+    assert rows == [('python', 30), ('react', 30)], rows
+
+
+def test_interrupted_backfill_resumes():
+    path = _legacy_database()
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE messages SET message_text = 'BOOM' WHERE message_id = 'm20'")
+    conn.commit()
+    conn.close()
+    expected = _expected_hashes(path)
+
+    real_hash = near_duplicate.content_hash
+
+    def failing_hash(text):
+        if text == 'BOOM':
+            raise RuntimeError('killed mid-backfill')
+        return real_hash(text)
+
+    content_hash_version = MIGRATIONS.index(migrations._content_hash) + 1
+    migrations.BACKFILL_BATCH_SIZE, batch_size = 4, migrations.BACKFILL_BATCH_SIZE
+    near_duplicate.content_hash = failing_hash
+    try:
+        migrate(path)
+        assert False, "migrate() should have raised"
+    except RuntimeError:
+        pass
+    finally:
+        near_duplicate.content_hash = real_hash
+
+    # Batches before the failure are committed; the version is not bumped
+    assert _version(path) == content_hash_version - 1, _version(path)
+    partial = _stored_hashes(path)
+    assert partial and all(row_id <= 20 for row_id in partial), partial  # m20 is id 21
+
+    try:
+        migrate(path)
+    finally:
+        migrations.BACKFILL_BATCH_SIZE = batch_size
+    assert _version(path) == SCHEMA_VERSION
+    assert _stored_hashes(path) == expected
+
+
+def main():
+    print("="*60)
+    print("SCHEMA MIGRATION TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_new_database, test_legacy_database_backfilled_in_batches, test_interrupted_backfill_resumes):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
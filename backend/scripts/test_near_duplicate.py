@@ -0,0 +1,69 @@
+"""
+Near-Duplicate Index Test
+Checks that SimHashIndex drops clusters that fell out of the window (and
+keeps the ones that got a new member), and that NearDuplicateDetector
+forgets a new cluster when its message is not stored.
+
+Usage:
+  python3 scripts/test_near_duplicate.py
+  python3 -m pytest scripts/test_near_duplicate.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.near_duplicate import NearDuplicateDetector, SimHashIndex
+
+TEXT = 'Hiring senior python developer, remote, send your CV to hr@acme.com today'
+
+
+def test_index_prunes_clusters_past_window():
+    index = SimHashIndex(3, window_seconds=100)
+    now = time.time()
+    index.add('old', 0, seen=now - 200)
+    index.add('touched', 0xFFFF << 48, seen=now - 200)
+    index.touch('touched')
+    index.add('new', 0xFFFF, seen=now - 50)
+    index._next_prune = 0
+
+    index.add('latest', 0xFFFF << 32)
+    assert len(index) == 3, len(index)
+    assert index.find(0) is None  # 'old' was pruned
+    assert index.find(0xFFFF << 48) == 'touched'
+    assert index.find(0xFFFF << 32) == 'latest'
+
+
+def test_rollback_forgets_unsaved_clusters():
+    detector = NearDuplicateDetector()
+    assert not detector.assign('m1', TEXT)['is_duplicate']
+    # Not stored yet: the pending canonical already matches
+    assert detector.assign('m2', TEXT + '!')['cluster_id'] == 'm1'
+    detector.rollback(['m1', 'm2'])
+
+    result = detector.assign('m3', TEXT)
+    assert not result['is_duplicate'] and result['cluster_id'] == 'm3', result
+    detector.commit(['m3'])
+    detector.rollback(['m3'])  # Already stored: kept
+    assert detector.assign('m4', TEXT)['cluster_id'] == 'm3'
+
+
+def main():
+    print("="*60)
+    print("NEAR-DUPLICATE INDEX TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_index_prunes_clusters_past_window, test_rollback_forgets_unsaved_clusters):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
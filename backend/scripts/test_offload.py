@@ -0,0 +1,174 @@
+"""
+CPU Offload Test
+Checks that plain-function pipeline stages run in the thread pool while the
+event loop keeps serving other tasks, that a slow stage pauses the stages
+before it and the source (bounded queues) with the waits and queue depths
+in the metrics, and that the fetcher's classification, verification, link
+extraction and CSV writes run on its 'ingest' threads, never on the loop.
+
+Uses the fake Telegram client and a throwaway data directory.
+
+Usage:
+  python3 scripts/test_offload.py
+  python3 -m pytest scripts/test_offload.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.fake_client import FakeTelegramClient
+from src.core.pipeline import Pipeline, Stage
+from src.storage.database import DatabaseHandler
+from src.utils.metrics import metrics
+
+ITEMS = 100
+QUEUE_SIZE = 2
+
+_offline_root = None
+
+
+def _source(items, produced=None):
+    async def source():
+        for item in items:
+            if produced is not None:
+                produced.append(item)
+            yield item
+    return source()
+
+
+def _run_with_ticker(stage):
+    """Run 10 items through `stage`; returns (threads the stage ran on, loop thread, ticks meanwhile)"""
+    threads = set()
+    ticks = []
+
+    def work(batch):
+        threads.add(threading.get_ident())
+        time.sleep(0.01)  # Stands in for classifying a long post
+        return batch
+
+    async def run():
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                ticks.append(1)
+                await asyncio.sleep(0.001)
+
+        ticking = asyncio.ensure_future(ticker())
+        await Pipeline([Stage(stage, work, offload=stage == 'offloaded')]).run(_source(range(10)))
+        done.set()
+        await ticking
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    return threads, loop_thread, len(ticks)
+
+
+def test_sync_stages_run_off_the_loop():
+    threads, loop_thread, ticks = _run_with_ticker('offloaded')
+    assert loop_thread not in threads, "an offloaded stage ran on the event loop"
+    assert ticks >= 20, f"the loop only ticked {ticks} times during 100ms of stage work"
+
+    # offload=False (cheap stages) runs on the loop and blocks it meanwhile
+    threads, loop_thread, ticks = _run_with_ticker('inline')
+    assert threads == {loop_thread}
+    assert ticks <= 2, ticks
+
+
+def test_full_queue_pauses_the_source():
+    produced = []
+    lead = []
+
+    async def sink(batch):
+        lead.append(len(produced) - batch[0] - 1)  # Items read from the source ahead of this one
+        await asyncio.sleep(0.001)
+        return []
+
+    pipeline = Pipeline([Stage('offload_work', lambda batch: batch), Stage('offload_sink', sink)],
+                        queue_size=QUEUE_SIZE)
+    stats = asyncio.run(pipeline.run(_source(range(ITEMS), produced)))
+    assert stats['offload_sink']['items'] == ITEMS
+
+    # Ahead of the sink at most: two queues, one item in the work stage and
+    # one the source is waiting to put
+    assert max(lead) <= 2 * QUEUE_SIZE + 2, max(lead)
+    snapshot = metrics.snapshot()
+    for name in ('offload_work', 'offload_sink'):
+        assert snapshot['histograms'][f'pipeline_{name}_blocked_seconds']['count'] > 0, name
+        assert snapshot['gauges'][f'pipeline_{name}_queue_depth']['value'] == 0, name
+
+
+def test_fetcher_offloads_cpu_work():
+    global _offline_root
+    if _offline_root is None:
+        from scripts.main import _use_offline_data_dir
+        _offline_root = _use_offline_data_dir()
+    from src.core.telegram_client import TelegramJobFetcher
+
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='offload_', dir=_offline_root), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+
+    fake = FakeTelegramClient(num_groups=1, messages_per_group=60, seed=5)
+    fetcher = TelegramJobFetcher(db=db)
+    fetcher.delay_scale = 0
+    fetcher.respect_working_hours = False
+    fetcher.use_offline_client(fake)
+
+    threads = {}
+
+    def recording(name, func):
+        def call(*args):
+            threads.setdefault(name, set()).add(threading.current_thread().name)
+            return func(*args)
+        return call
+
+    fetcher.classifier.classify = recording('classify', fetcher.classifier.classify)
+    fetcher.job_verifier.verify_and_extract = recording('verify', fetcher.job_verifier.verify_and_extract)
+    fetcher.link_extractor.extract_links_from_message = recording(
+        'extract_links', fetcher.link_extractor.extract_links_from_message)
+    fetcher._write_csv = recording('csv', fetcher._write_csv)
+
+    async def fetch():
+        loop_thread = threading.current_thread().name
+        stored = await fetcher.fetch_messages(fake.groups_data()[0]['link'], fetcher.clients[0])
+        return loop_thread, stored
+
+    try:
+        loop_thread, stored = asyncio.run(fetch())
+    finally:
+        fetcher._ingest_pool.shutdown(wait=True)
+    assert stored, "the fake group produced no job messages"
+    assert set(threads) == {'classify', 'verify', 'extract_links', 'csv'}, threads
+    for name, names in threads.items():
+        assert loop_thread not in names and all(thread.startswith('ingest') for thread in names), (name, names)
+
+
+def main():
+    print("="*60)
+    print("CPU OFFLOAD TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_sync_stages_run_off_the_loop, test_full_queue_pauses_the_source,
+                 test_fetcher_offloads_cpu_work):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Shared Regex Registry Test
+Checks that identical patterns share one compiled entry (the email pattern
+of JobVerifier and LinkExtractor is one object), that each entry counts
+calls, hits and time for search / findall / sub, and that threads matching
+while the fetcher reads stats(reset=True) lose no counts.
+
+Usage:
+  python3 scripts/test_patterns.py
+  python3 -m pytest scripts/test_patterns.py
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.patterns import PatternRegistry, patterns
+
+THREADS = 8
+SEARCHES = 2000
+
+
+def test_identical_patterns_share_one_entry():
+    registry = PatternRegistry()
+    email = registry.register('email', r'\w+@\w+\.\w+')
+    assert registry.register('contact.1', r'\w+@\w+\.\w+') is email
+    assert registry.register('email.upper', r'\w+@\w+\.\w+', flags=2) is not email
+    assert len(registry) == 2 and email.names == ['email', 'contact.1']
+
+    # The verifier's contact email and the link extractor's email are one entry
+    from src.auto_apply.link_extractor import EMAIL_PATTERN
+    from src.services.job_verifier import JobVerifier
+    assert EMAIL_PATTERN is patterns['email'] is JobVerifier().contact_patterns[1]
+    assert len(patterns) < sum(len(row['names']) for row in patterns.stats())
+
+    # [A-Za-z] TLD: a '|' is not part of an address
+    assert patterns['email'].search('mail q@w.e|r') is None
+    assert patterns['email'].search('mail hr@acme.com').group(0) == 'hr@acme.com'
+
+
+def test_calls_hits_and_reset():
+    registry = PatternRegistry()
+    digits = registry.register('digits', r'\d+')
+    assert digits.search('abc 42').group(0) == '42'
+    assert digits.search('abc') is None
+    assert digits.findall('1 2 3') == ['1', '2', '3']
+    assert digits.sub('#', 'a1b2') == 'a#b#'
+    assert digits.sub('#', 'ab') == 'ab'
+
+    row, = registry.stats(reset=True)
+    assert (row['names'], row['calls'], row['hits'], row['hit_rate']) == (['digits'], 5, 3, 0.6), row
+    assert row['seconds'] > 0
+    row, = registry.stats()
+    assert (row['calls'], row['hits'], row['seconds'], row['hit_rate']) == (0, 0, 0.0, None), row
+
+
+def test_threaded_counts_survive_reset():
+    registry = PatternRegistry()
+    digits = registry.register('digits', r'\d+')
+    reported = []
+    done = threading.Event()
+
+    def search():
+        for i in range(SEARCHES):
+            digits.search('x' if i % 2 else 'x 1')
+
+    def report():
+        while not done.is_set():
+            reported.append(registry.stats(reset=True)[0])
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    reporter = threading.Thread(target=report)
+    reporter.start()
+    try:
+        workers = [threading.Thread(target=search) for _ in range(THREADS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        done.set()
+        reporter.join()
+        sys.setswitchinterval(switch_interval)
+    reported.append(registry.stats(reset=True)[0])
+
+    assert sum(row['calls'] for row in reported) == THREADS * SEARCHES
+    assert sum(row['hits'] for row in reported) == THREADS * SEARCHES // 2
+
+
+def main():
+    print("="*60)
+    print("SHARED REGEX REGISTRY TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_identical_patterns_share_one_entry, test_calls_hits_and_reset,
+                 test_threaded_counts_survive_reset):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Ingest Pipeline Failure Test
+Checks that a batch a stage fails on is reported (on_error and the 'failed'
+stats) while the other batches keep their order, and that a failed database
+write in the fetcher leaves the messages unprocessed and the group's
+checkpoint below them, so the next fetch stores them. Cross-posts must be
+found before verification and link extraction run.
+
+Uses the fake Telegram client and a throwaway data directory.
+
+Usage:
+  python3 scripts/test_pipeline.py
+  python3 -m pytest scripts/test_pipeline.py
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.fake_client import FakeTelegramClient
+from src.core.pipeline import Pipeline, Stage
+from src.storage.database import DatabaseHandler
+
+_offline_root = None
+
+
+def _database():
+    """A DatabaseHandler on its own temp file under the offline data dir"""
+    global _offline_root
+    if _offline_root is None:
+        from scripts.main import _use_offline_data_dir
+        _offline_root = _use_offline_data_dir()
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='pipeline_', dir=_offline_root), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    return db
+
+
+def _fetcher(db, fake):
+    """A new TelegramJobFetcher (as after a restart) on the fake client"""
+    from src.core.telegram_client import TelegramJobFetcher
+
+    fetcher = TelegramJobFetcher(db=db)
+    fetcher.delay_scale = 0
+    fetcher.respect_working_hours = False
+    fetcher.use_offline_client(fake)
+    return fetcher
+
+
+def _fetch(fetcher, group):
+    return asyncio.run(fetcher.fetch_messages(group['link'], fetcher.clients[0]))
+
+
+def _stored_ids(db):
+    """message_ids in messages or reposts"""
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return {row[0] for row in conn.execute('SELECT message_id FROM messages UNION SELECT message_id FROM reposts')}
+    finally:
+        conn.close()
+
+
+def test_failed_batch_reported_and_order_kept():
+    failed = []
+
+    def double(batch):
+        if 7 in batch:
+            raise ValueError('bad item')
+        return [item * 2 for item in batch]
+
+    collected = []
+
+    async def collect(batch):
+        collected.extend(batch)
+        return []
+
+    async def source():
+        for item in range(30):
+            yield item
+
+    pipeline = Pipeline([Stage('double', double, concurrency=3, batch_size=3),
+                         Stage('collect', collect)],
+                        queue_size=4, on_error=lambda name, batch: failed.append((name, batch)))
+    stats = asyncio.run(pipeline.run(source()))
+
+    assert len(failed) == 1 and failed[0][0] == 'double' and 7 in failed[0][1], failed
+    dropped = failed[0][1]
+    assert collected == [item * 2 for item in range(30) if item not in dropped], collected
+    assert stats['double']['items'] == 30
+    assert stats['double']['failed'] == len(dropped)
+    assert stats['collect']['failed'] == 0
+
+
+def test_failed_write_keeps_checkpoint_below_messages():
+    fake = FakeTelegramClient(num_groups=1, messages_per_group=80, seed=7)
+    group = fake.groups_data()[0]
+    db = _database()
+    fetcher = _fetcher(db, fake)
+    real_insert = db.insert_messages
+    calls = []
+
+    def flaky_insert(batch, reposts=()):
+        calls.append([row['message_id'] for row in batch] + [repost[0] for repost in reposts])
+        if len(calls) == 2:
+            raise sqlite3.OperationalError('disk I/O error')
+        return real_insert(batch, reposts)
+
+    db.insert_messages = flaky_insert
+    try:
+        _fetch(fetcher, group)
+    finally:
+        del db.insert_messages
+    assert len(calls) >= 3, f"expected several persist batches, got {calls}"
+    lost = set(calls[1])
+    assert lost, "the failed batch held no job messages"
+
+    # The failed batch was not marked processed and the checkpoint sits below it
+    stored = _stored_ids(db)
+    assert not lost & stored
+    assert fetcher.processed_messages == stored
+    checkpoint = db.get_group_checkpoints()[group['link']]['last_message_id']
+    lowest_lost = min(int(message_id.rsplit('_', 1)[1]) for message_id in lost)
+    assert checkpoint < lowest_lost, f"checkpoint {checkpoint} is past failed message {lowest_lost}"
+
+    # The next fetch reads from the checkpoint up and stores what was lost
+    # (as a message, or as a re-post of one stored after it)
+    fetcher = _fetcher(db, fake)
+    _fetch(fetcher, group)
+    assert _stored_ids(db) == stored | lost, sorted(_stored_ids(db) ^ (stored | lost))
+    assert db.get_group_checkpoints()[group['link']]['last_message_id'] == 80
+
+    # Nothing left to fetch
+    fetcher = _fetcher(db, fake)
+    assert _fetch(fetcher, group) == []
+    assert _stored_ids(db) == stored | lost
+
+
+def test_cross_posts_skip_verification():
+    fake = FakeTelegramClient(num_groups=2, messages_per_group=60, seed=11)
+    fetcher = _fetcher(_database(), fake)
+    verified = []
+    real_verify = fetcher.job_verifier.verify_and_extract
+
+    def counting_verify(text):
+        verified.append(text)
+        return real_verify(text)
+
+    fetcher.job_verifier.verify_and_extract = counting_verify
+    for group in fake.groups_data():
+        _fetch(fetcher, group)
+
+    conn = sqlite3.connect(fetcher.db.db_path)
+    try:
+        canonical, copies = conn.execute(
+            'SELECT SUM(cluster_id = message_id), SUM(cluster_id != message_id) FROM messages').fetchone()
+    finally:
+        conn.close()
+    assert copies, "the fake groups produced no cross-posts"
+    assert len(verified) == canonical, f"verified {len(verified)} messages for {canonical} canonical rows"
+
+
+def main():
+    print("="*60)
+    print("INGEST PIPELINE FAILURE TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_failed_batch_reported_and_order_kept, test_failed_write_keeps_checkpoint_below_messages,
+                 test_cross_posts_skip_verification):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Prefilter Stats Test
+Runs MessageClassifier.prefilter() from several threads at once, as the
+ingest filter stage may, and checks that prefilter_report() adds up: every
+text counted once, rejections by reason matching a single-threaded run, and
+the report reset between cycles.
+
+Usage:
+  python3 scripts/test_prefilter.py
+  python3 -m pytest scripts/test_prefilter.py
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.classifier import MessageClassifier
+
+TEXTS = [
+    '',
+    'ok thanks',
+    'anyone going to the meetup tonight? lots of people from the channel will be there, see you',
+    'Hiring Python developer, remote. Apply: hr@acme.com',
+    'We are looking for a senior React engineer to join our team in Berlin, '
+    'full time, good salary, send your CV to jobs@globex.com',
+] * 200
+
+
+def _run(classifier, threads):
+    chunks = [TEXTS[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=lambda chunk=chunk: [classifier.prefilter(t) for t in chunk])
+               for chunk in chunks]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def test_threaded_counts_add_up():
+    expected = MessageClassifier()
+    _run(expected, 1)
+    single = expected.prefilter_report()
+
+    classifier = MessageClassifier()
+    _run(classifier, 8)
+    report = classifier.prefilter_report()
+    assert report['checked'] == len(TEXTS), report
+    assert report['by_reason'] == single['by_reason'], (report['by_reason'], single['by_reason'])
+
+
+def test_report_resets():
+    classifier = MessageClassifier()
+    _run(classifier, 2)
+    assert classifier.prefilter_report(reset=False)['checked'] == len(TEXTS)
+    assert classifier.prefilter_report()['checked'] == len(TEXTS)
+    assert classifier.prefilter_report()['checked'] == 0
+
+
+def main():
+    print("="*60)
+    print("PREFILTER STATS TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_threaded_counts_add_up, test_report_resets):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
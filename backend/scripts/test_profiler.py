@@ -0,0 +1,75 @@
+"""
+Profiler Smoke Test
+Runs one offline fetch cycle (fake Telegram client, temp data dir) under the
+sampling profiler and checks the collapsed-stack file and summary.
+
+Usage:
+  python3 scripts/test_profiler.py
+  python3 -m pytest scripts/test_profiler.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import PATHS
+
+EXPECTED_STAGES = ['classify', 'verify', 'db_write', 'csv_append', 'iter_messages', 'get_entity']
+
+
+async def _profile_offline_cycle():
+    from scripts.main import _use_offline_data_dir, run_profiled_cycle
+    from src.core.fake_client import FakeTelegramClient
+
+    _use_offline_data_dir()
+    PATHS['profiles'] = tempfile.mkdtemp(prefix='profiles_')
+
+    from src.core.telegram_client import TelegramJobFetcher
+    fetcher = TelegramJobFetcher()
+    fake_client = FakeTelegramClient(num_groups=3, messages_per_group=50)
+    fetcher.use_offline_client(fake_client)
+    fetcher.delay_scale = 0
+    fetcher.respect_working_hours = False
+
+    await run_profiled_cycle(fetcher, fake_client.groups_data())
+    return PATHS['profiles']
+
+
+def test_offline_profile():
+    profiles_dir = asyncio.run(_profile_offline_cycle())
+    files = sorted(os.listdir(profiles_dir))
+    collapsed = [f for f in files if f.endswith('.collapsed')]
+    summaries = [f for f in files if f.endswith('_summary.txt')]
+    assert len(collapsed) == 1 and len(summaries) == 1, f"Unexpected profile files: {files}"
+
+    with open(os.path.join(profiles_dir, collapsed[0]), encoding='utf-8') as f:
+        lines = [line for line in f.read().splitlines() if line]
+    assert lines, "Collapsed stack file is empty"
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack and int(count) > 0, f"Malformed collapsed line: {line}"
+    assert any('fetch_messages' in line for line in lines), "fetch_messages never sampled"
+
+    with open(os.path.join(profiles_dir, summaries[0]), encoding='utf-8') as f:
+        summary = f.read()
+    for name in EXPECTED_STAGES:
+        assert f"\n{name} " in summary, f"Stage '{name}' missing from summary"
+
+
+def main():
+    print("="*60)
+    print("PROFILER SMOKE TEST")
+    print("="*60)
+    try:
+        test_offline_profile()
+        print("✅ Offline profile produced collapsed stacks and stage breakdown")
+        return True
+    except AssertionError as e:
+        print(f"❌ {e}")
+        return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,145 @@
+"""
+Report Engine Consistency Test
+Checks that the message_counts rows kept by triggers on messages match a
+GROUP BY over messages after inserts, deletes and updates that move a
+message to another group or job type (NULL columns included), and that
+build_report() totals agree with counting messages directly.
+
+Usage:
+  python3 scripts/test_report_engine.py
+  python3 -m pytest scripts/test_report_engine.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.archive import messages_view
+from src.storage.database import DatabaseHandler
+from src.utils.report_engine import build_report, render_csv, render_json, render_text
+
+GROUPS = ['alpha', 'beta', 'gamma']
+JOB_TYPES = ['tech', 'non_tech', 'freelance', 'fresher']
+
+
+def _database():
+    """A DatabaseHandler on its own temp file, holding 40 messages over GROUPS"""
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='report_'), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    now = datetime.now()
+    assert db.insert_messages([{
+        'message_id': f"m{i}", 'group_name': GROUPS[i % 3], 'group_link': f"https://t.me/{GROUPS[i % 3]}",
+        'sender': 'hr', 'date': now.replace(day=1 + i % 28).strftime('%Y-%m-%d %H:%M:%S'),
+        'message_text': f"job {i}", 'job_type': JOB_TYPES[i % 4],
+        'keywords_found': 'python,react' if i % 2 else 'sales', 'account_used': 'account1',
+    } for i in range(40)])
+    for group in GROUPS:
+        db.insert_group({'group_name': group, 'group_link': f"https://t.me/{group}", 'account_used': 'account1'})
+    return db
+
+
+def _assert_counts_match(db):
+    """message_counts == GROUP BY over messages; returns the counts"""
+    conn = sqlite3.connect(db.db_path)
+    try:
+        expected = conn.execute('''
+            SELECT IFNULL(group_link, ''), IFNULL(group_name, ''), IFNULL(job_type, ''), COUNT(*), MAX(date)
+            FROM messages GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ''').fetchall()
+        counts = conn.execute('''
+            SELECT group_link, group_name, job_type, count, last_date FROM message_counts ORDER BY 1, 2, 3
+        ''').fetchall()
+    finally:
+        conn.close()
+    assert counts == expected, f"message_counts drifted:\n{expected}\n{counts}"
+    return counts
+
+
+def _execute(db, sql, params=()):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_counts_follow_inserts_deletes_and_updates():
+    db = _database()
+    assert len(_assert_counts_match(db)) == 12
+
+    # Deleting every message of one (group, job type) removes its row
+    _execute(db, "DELETE FROM messages WHERE group_name = 'alpha' AND job_type = 'tech'")
+    _execute(db, "DELETE FROM messages WHERE message_id IN ('m1', 'm2')")
+    assert len(_assert_counts_match(db)) == 11
+
+    # Re-typed and moved messages, into and out of NULL columns
+    _execute(db, "UPDATE messages SET job_type = 'tech' WHERE job_type = 'fresher'")
+    _execute(db, "UPDATE messages SET group_name = 'beta', group_link = 'https://t.me/beta' WHERE message_id = 'm5'")
+    _execute(db, "UPDATE messages SET job_type = NULL, group_link = NULL WHERE message_id IN ('m6', 'm7')")
+    _assert_counts_match(db)
+    _execute(db, "UPDATE messages SET job_type = 'non_tech' WHERE job_type IS NULL")
+    _assert_counts_match(db)
+
+    # A re-fetched message (INSERT OR IGNORE) is not counted twice
+    assert db.insert_messages([{'message_id': 'm10', 'group_name': 'alpha', 'group_link': 'https://t.me/alpha',
+                                'sender': 'hr', 'date': '2025-01-01', 'message_text': 'job 10',
+                                'job_type': 'tech', 'keywords_found': '', 'account_used': 'account1'}])
+    _assert_counts_match(db)
+
+
+def test_report_matches_messages():
+    db = _database()
+    _execute(db, "DELETE FROM messages WHERE message_id IN ('m0', 'm3', 'm4')")
+    conn = sqlite3.connect(db.db_path)
+    try:
+        by_type = dict(conn.execute('SELECT job_type, COUNT(*) FROM messages GROUP BY job_type'))
+        by_link = dict(conn.execute('SELECT group_link, COUNT(*) FROM messages GROUP BY group_link'))
+        keywords = dict(conn.execute('''
+            SELECT k.keyword, COUNT(*) FROM message_keywords mk JOIN keywords k USING (keyword_id)
+            GROUP BY k.keyword
+        '''))
+    finally:
+        conn.close()
+
+    with messages_view(include_archive=False, db_path=db.db_path) as conn:
+        report = build_report(conn, days=60)
+    assert report['summary'] == {'total_messages': 37, 'active_groups': 3, 'total_groups': 3}, report['summary']
+    assert {row['job_type']: row['count'] for row in report['job_types']} == by_type
+    assert {row['group_link']: row['job_count'] for row in report['groups']} == by_link
+    assert {row['keyword']: row['count'] for row in report['top_keywords']} == keywords
+    assert sum(row['count'] for row in report['daily_trend']) == 37
+    assert report['recent_24h'] == 37
+
+    # Every renderer takes the same dict
+    assert 'Total Job Messages: 37' in render_text(report)
+    assert 'summary,total_messages,37' in render_csv(report)
+    assert '"total_messages": 37' in render_json(report)
+
+
+def main():
+    print("="*60)
+    print("REPORT ENGINE CONSISTENCY TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_counts_follow_inserts_deletes_and_updates, test_report_matches_messages):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Exact Re-post Test
+Checks the content hash re-post path: formatting-only differences hash the
+same, a copy written under another id (e.g. by a second fetcher process)
+becomes a reposts row instead of a second job, and a fetch over the fake
+client stores each text once - later copies, also those seen after a
+restart, are recorded as re-posts of the stored message.
+
+Uses the fake Telegram client and a throwaway data directory.
+
+Usage:
+  python3 scripts/test_reposts.py
+  python3 -m pytest scripts/test_reposts.py
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.fake_client import FakeTelegramClient
+from src.services.near_duplicate import content_hash
+from src.storage.database import DatabaseHandler
+
+TEXT = 'Hiring Python developer at Acme. Apply: https://acme.com/jobs?utm_source=group1'
+
+_offline_root = None
+
+
+def _database():
+    """A DatabaseHandler on its own temp file under the offline data dir"""
+    global _offline_root
+    if _offline_root is None:
+        from scripts.main import _use_offline_data_dir
+        _offline_root = _use_offline_data_dir()
+    db = object.__new__(DatabaseHandler)
+    db.db_path = os.path.join(tempfile.mkdtemp(prefix='reposts_', dir=_offline_root), 'telegram_jobs.db')
+    db.connection = None
+    db._last_connection_time = {}
+    db._connection_lock = None
+    db.create_tables()
+    db._load_body_codec()
+    return db
+
+
+def _fetcher(db, fake):
+    """A new TelegramJobFetcher (as after a restart) on the fake client"""
+    from src.core.telegram_client import TelegramJobFetcher
+
+    fetcher = TelegramJobFetcher(db=db)
+    fetcher.delay_scale = 0
+    fetcher.respect_working_hours = False
+    fetcher.use_offline_client(fake)
+    return fetcher
+
+
+def _fetch(fetcher, groups):
+    for group in groups:
+        asyncio.run(fetcher.fetch_messages(group['link'], fetcher.clients[0]))
+
+
+def _query(db, sql):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def _texts(fake):
+    """message_id -> text of every fake message"""
+    async def read():
+        texts = {}
+        for group in fake.groups_data():
+            entity = await fake.get_entity(group['link'])
+            async for message in fake.iter_messages(entity):
+                texts[f"{entity.id}_{message.id}"] = message.text
+        return texts
+    return asyncio.run(read())
+
+
+def test_hash_ignores_formatting():
+    variants = [TEXT, TEXT.upper(), '  ' + TEXT.replace(' ', '   ') + ' !!',
+                TEXT.replace('utm_source=group1', 'utm_source=group2&ref=x')]
+    assert len({content_hash(text) for text in variants}) == 1
+    assert content_hash(TEXT) != content_hash(TEXT.replace('Python', 'Java'))
+
+
+def test_copy_under_another_id_becomes_repost():
+    db = _database()
+    message = {'message_id': '1_1', 'group_name': 'alpha', 'group_link': 'https://t.me/alpha', 'sender': 'hr',
+               'date': '2025-01-01 10:00:00', 'message_text': TEXT, 'job_type': 'tech',
+               'keywords_found': 'python', 'account_used': 'account1', 'content_hash': content_hash(TEXT)}
+    assert db.insert_messages([message])
+    # Another process stored the same text first; this one only knew it as new
+    assert db.insert_messages([dict(message, message_id='2_7', group_name='beta', group_link='https://t.me/beta')])
+
+    assert _query(db, 'SELECT message_id FROM messages') == [('1_1',)]
+    assert _query(db, 'SELECT message_id FROM tech_jobs') == [('1_1',)]
+    assert _query(db, 'SELECT message_id, original_message_id, group_name FROM reposts') == [('2_7', '1_1', 'beta')]
+    assert _query(db, 'SELECT group_name, count FROM message_counts') == [('alpha', 1)]
+
+
+def test_fetch_stores_each_text_once():
+    db = _database()
+    fake = FakeTelegramClient(num_groups=3, messages_per_group=60, seed=5)
+    groups = fake.groups_data()
+    _fetch(_fetcher(db, fake), groups[:1])
+    # A restarted fetcher knows the stored hashes from the database
+    _fetch(_fetcher(db, fake), groups[1:])
+
+    texts = _texts(fake)
+    stored = dict(_query(db, 'SELECT message_id, content_hash FROM messages'))
+    reposts = _query(db, 'SELECT message_id, original_message_id FROM reposts')
+    assert reposts, "the fake groups produced no exact re-posts"
+    assert all(value == content_hash(texts[message_id]) for message_id, value in stored.items())
+    assert len(set(stored.values())) == len(stored), "a text was stored twice"
+    for message_id, original in reposts:
+        assert message_id not in stored and original in stored, (message_id, original)
+        assert content_hash(texts[message_id]) == stored[original], (message_id, original)
+    first_group = f"{asyncio.run(fake.get_entity(groups[0]['link'])).id}_"
+    assert any(original.startswith(first_group) and not message_id.startswith(first_group)
+               for message_id, original in reposts), "no re-post of a message stored before the restart"
+
+
+def main():
+    print("="*60)
+    print("EXACT RE-POST TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_hash_ignores_formatting, test_copy_under_another_id_becomes_repost,
+                 test_fetch_stores_each_text_once):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
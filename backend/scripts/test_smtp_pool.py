@@ -0,0 +1,113 @@
+"""
+SMTP Pool Retry Test
+Checks which send errors make SMTPConnectionPool reconnect and retry: a
+dropped session is replaced and the send retried once, while permanent SMTP
+errors (refused recipient, 5xx on DATA) are raised at once, without a second
+send, and leave the session in the pool. A timeout is raised without a retry
+too (the server may already have the message), but the session is dropped.
+
+Usage:
+  python3 scripts/test_smtp_pool.py
+  python3 -m pytest scripts/test_smtp_pool.py
+"""
+import os
+import smtplib
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.auto_apply.smtp_pool import SMTPConnectionPool, _PooledSession
+
+
+class _FakeSMTP:
+    """Stands in for a logged-in smtplib.SMTP; raises the queued errors on send"""
+
+    opened = 0
+    sends = 0
+    errors = []
+
+    def __init__(self):
+        _FakeSMTP.opened += 1
+
+    def noop(self):
+        return 250, b'ok'
+
+    def send_message(self, msg, from_addr=None, to_addrs=None):
+        _FakeSMTP.sends += 1
+        if _FakeSMTP.errors:
+            raise _FakeSMTP.errors.pop(0)
+        return {}
+
+    def quit(self):
+        pass
+
+
+class _FakePool(SMTPConnectionPool):
+    def _open(self):
+        return _PooledSession(_FakeSMTP())
+
+
+def _pool(errors):
+    _FakeSMTP.opened = _FakeSMTP.sends = 0
+    _FakeSMTP.errors = list(errors)
+    return _FakePool('localhost', 25)
+
+
+def _send(pool):
+    try:
+        pool.send_message(object())
+        return None
+    except Exception as e:
+        return e
+
+
+def test_dropped_session_is_retried_once():
+    pool = _pool([smtplib.SMTPServerDisconnected('gone')])
+    assert _send(pool) is None
+    assert (_FakeSMTP.sends, _FakeSMTP.opened) == (2, 2), (_FakeSMTP.sends, _FakeSMTP.opened)
+
+    pool = _pool([ConnectionResetError('reset'), ConnectionResetError('reset')])
+    assert isinstance(_send(pool), ConnectionResetError)
+    assert _FakeSMTP.sends == 2
+
+
+def test_timeout_is_not_retried():
+    pool = _pool([TimeoutError('timed out waiting for the reply to DATA')])
+    assert isinstance(_send(pool), TimeoutError)
+    assert _FakeSMTP.sends == 1, f"sent {_FakeSMTP.sends} times after a timeout"
+    # The session is in an unknown state: the next send opens a new one
+    assert _send(pool) is None
+    assert _FakeSMTP.opened == 2
+
+
+def test_permanent_errors_are_not_retried():
+    for error in (smtplib.SMTPRecipientsRefused({'hr@example.com': (550, b'no such user')}),
+                  smtplib.SMTPDataError(554, b'rejected'),
+                  smtplib.SMTPSenderRefused(553, b'bad sender', 'me@example.com')):
+        pool = _pool([error])
+        assert _send(pool) is error
+        assert _FakeSMTP.sends == 1, f"{type(error).__name__} sent {_FakeSMTP.sends} times"
+        # The session is still good: the next send reuses it
+        assert _send(pool) is None
+        assert _FakeSMTP.opened == 1, f"{type(error).__name__} discarded the session"
+
+
+def main():
+    print("="*60)
+    print("SMTP POOL RETRY TEST")
+    print("="*60)
+    failed = 0
+    for test in (test_dropped_session_is_retried_once, test_timeout_is_not_retried,
+                 test_permanent_errors_are_not_retried):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print("="*60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -165,18 +165,20 @@ def get_best_jobs(limit=10):
     
     cursor.execute(f"""
         SELECT 
-            company_name,
-            skills_required,
-            salary_range,
-            work_mode,
-            verification_score,
-            DATE(date) as date,
-            group_name,
-            message_text
-        FROM tech_jobs
-        WHERE is_verified = 1 
-        AND company_name != ''
-        ORDER BY verification_score DESC
+            t.company_name,
+            t.skills_required,
+            t.salary_range,
+            t.work_mode,
+            t.verification_score,
+            DATE(t.date) as date,
+            t.group_name,
+            m.message_text
+        FROM tech_jobs t
+        -- tech_jobs stores the body compressed; messages keeps it as text
+        LEFT JOIN messages m ON m.message_id = t.message_id
+        WHERE t.is_verified = 1 
+        AND t.company_name != ''
+        ORDER BY t.verification_score DESC
         LIMIT {limit}
     """)
     
@@ -197,7 +199,7 @@ def get_best_jobs(limit=10):
                 print(f"     🏠 Mode: {work_mode}")
             
             # Show first 150 chars of message
-            msg_preview = message[:150].replace('\n', ' ') + '...'
+            msg_preview = (message or '')[:150].replace('\n', ' ') + '...'
             print(f"     📝 {msg_preview}")
             print()
     else:
@@ -0,0 +1,128 @@
+"""
+Concurrent application dispatch
+
+A fixed number of asyncio workers pull email jobs from a shared list and send
+them through EmailApplicationSender on a thread pool (smtplib is blocking),
+all sharing one SMTP pool. Every send first takes a token from a global
+bucket and from the recipient domain's bucket, so bursts stay inside the
+configured rates no matter how many workers run.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import AUTO_APPLY
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger('dispatcher')
+
+
+class TokenBucket:
+    """Async token bucket: `rate_per_minute` sustained, up to `burst` at once"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def recipient_domain(address: str) -> str:
+    return address.rsplit('@', 1)[-1].strip().lower() if '@' in address else ''
+
+
+class ApplicationDispatcher:
+    """Send email applications with bounded concurrency and rate limits"""
+
+    def __init__(self, email_sender, concurrency: int = None, rate_per_minute: float = None,
+                 domain_rate_per_minute: float = None, dry_run: bool = False):
+        self.email_sender = email_sender
+        self.concurrency = concurrency or AUTO_APPLY['concurrency']
+        self.dry_run = dry_run
+        self.global_bucket = TokenBucket(rate_per_minute or AUTO_APPLY['rate_per_minute'],
+                                         AUTO_APPLY['burst'])
+        self.domain_rate = domain_rate_per_minute or AUTO_APPLY['domain_rate_per_minute']
+        self._domain_buckets = {}
+
+    def _domain_bucket(self, domain: str) -> TokenBucket:
+        bucket = self._domain_buckets.get(domain)
+        if bucket is None:
+            bucket = self._domain_buckets[domain] = TokenBucket(self.domain_rate, AUTO_APPLY['domain_burst'])
+        return bucket
+
+    async def _send(self, job: Dict) -> Dict:
+        to_email = job['application_link']
+        # Domain first: a worker waiting on a busy domain must not hold a global token
+        await self._domain_bucket(recipient_domain(to_email)).acquire()
+        await self.global_bucket.acquire()
+
+        loop = asyncio.get_running_loop()
+        with metrics.timer('auto_apply_send_seconds', 'Time to send one application email'):
+            return await loop.run_in_executor(
+                None, self.email_sender.send_application, to_email, job, self.dry_run)
+
+    async def dispatch(self, jobs: List[Dict], quota: Optional[int] = None,
+                       on_result: Callable[[Dict, Dict], None] = None) -> List[Tuple[Dict, Dict]]:
+        """
+        Send applications until `quota` succeed or the jobs run out
+
+        A failed send does not use up quota: the next job is taken instead.
+
+        Returns:
+            list: (job, result) for every attempted send, in completion order
+        """
+        pending = iter(jobs)
+        results = []
+        state = {'sent': 0, 'in_flight': 0}
+        state_lock = asyncio.Lock()
+
+        async def worker():
+            while True:
+                async with state_lock:
+                    if quota is not None and state['sent'] + state['in_flight'] >= quota:
+                        return
+                    job = next(pending, None)
+                    if job is None:
+                        return
+                    state['in_flight'] += 1
+
+                try:
+                    result = await self._send(job)
+                except Exception as e:
+                    result = {'status': 'failed', 'to': job.get('application_link'), 'error': str(e)}
+
+                async with state_lock:
+                    state['in_flight'] -= 1
+                    if result['status'] in ('sent', 'dry_run'):
+                        state['sent'] += 1
+                metrics.counter('auto_apply_sends_total', 'Application sends attempted').inc()
+                results.append((job, result))
+                if on_result:
+                    on_result(job, result)
+
+        # Each worker can hold one SMTP session
+        self.email_sender.smtp_pool_size = max(self.email_sender.smtp_pool_size, self.concurrency)
+        started = time.perf_counter()
+        with self.email_sender.smtp_session():
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        logger.info(f"Dispatched {len(results)} applications ({state['sent']} ok) with "
+                    f"{self.concurrency} workers in {time.perf_counter() - started:.1f}s")
+        return results
@@ -1,20 +1,21 @@
 """
 Email Application Sender with CC support
 """
-import smtplib
 import json
 import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Tuple
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.utils.logger import get_logger
+from src.auto_apply.smtp_pool import SMTPConnectionPool
 
 logger = get_logger('email_sender')
 
@@ -33,6 +34,9 @@ class EmailApplicationSender:
         # Email credentials (you'll need to set these)
         self.smtp_server = "smtp.gmail.com"
         self.smtp_port = 587
+        self.smtp_use_tls = True
+        self.smtp_auth = True
+        self.smtp_pool_size = 1
         self.email_password = None  # Will be loaded from environment or config
         
         # Load email config if provided
@@ -42,10 +46,73 @@ class EmailApplicationSender:
                 self.smtp_server = email_config.get('smtp_server', self.smtp_server)
                 self.smtp_port = email_config.get('smtp_port', self.smtp_port)
                 self.email_password = email_config.get('password')
+                self.smtp_use_tls = email_config.get('use_tls', self.smtp_use_tls)
+                self.smtp_auth = email_config.get('auth', self.smtp_auth)
+                self.smtp_pool_size = email_config.get('pool_size', self.smtp_pool_size)
         
         # Try to get password from environment
         if not self.email_password:
             self.email_password = os.environ.get('EMAIL_APP_PASSWORD')
+        
+        # Base64-encoded resume part, rebuilt only when the file changes
+        self._resume_cache = None  # (path, mtime, size, part)
+        
+        # Open SMTP pool while inside smtp_session()
+        self._pool = None
+    
+    def _create_pool(self) -> SMTPConnectionPool:
+        return SMTPConnectionPool(
+            self.smtp_server,
+            self.smtp_port,
+            username=self.from_email,
+            password=self.email_password if self.smtp_auth else None,
+            use_starttls=self.smtp_use_tls,
+            size=self.smtp_pool_size
+        )
+    
+    @contextmanager
+    def smtp_session(self):
+        """
+        Keep one authenticated SMTP session (pool) open for a batch of sends
+        
+        Usage:
+            with sender.smtp_session():
+                for job in jobs:
+                    sender.send_application(job['application_link'], job)
+        """
+        if self._pool is not None:
+            yield self._pool
+            return
+        
+        self._pool = self._create_pool()
+        try:
+            yield self._pool
+        finally:
+            self._pool.close()
+            self._pool = None
+    
+    def _get_resume_part(self):
+        """Resume attachment, re-read and re-encoded only when its mtime/size changes"""
+        if not self.resume_path or not os.path.exists(self.resume_path):
+            return None
+        
+        stat = os.stat(self.resume_path)
+        cache = self._resume_cache
+        if cache and cache[0] == self.resume_path and cache[1] == stat.st_mtime_ns and cache[2] == stat.st_size:
+            return cache[3]
+        
+        with open(self.resume_path, 'rb') as attachment:
+            part = MIMEBase('application', 'octet-stream')
+            part.set_payload(attachment.read())
+        
+        encoders.encode_base64(part)
+        
+        filename = os.path.basename(self.resume_path)
+        part.add_header('Content-Disposition', f'attachment; filename= {filename}')
+        
+        self._resume_cache = (self.resume_path, stat.st_mtime_ns, stat.st_size, part)
+        logger.debug(f"Encoded resume attachment: {filename}")
+        return part
     
     def generate_subject(self, job_info: Dict) -> str:
         """Generate email subject"""
@@ -108,20 +175,11 @@ LinkedIn: {self.profile['personal_info']['linkedin']}
             body = self.generate_body(job_info)
             msg.attach(MIMEText(body, 'plain'))
             
-            # Attach resume if exists
-            if self.resume_path and os.path.exists(self.resume_path):
-                with open(self.resume_path, 'rb') as attachment:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                
-                encoders.encode_base64(part)
-                
-                filename = os.path.basename(self.resume_path)
-                part.add_header('Content-Disposition', f'attachment; filename= {filename}')
-                
-                msg.attach(part)
-                
-                logger.info(f"Attached resume: {filename}")
+            # Attach resume if exists (cached part is shared, never modified)
+            resume_part = self._get_resume_part()
+            if resume_part is not None:
+                msg.attach(resume_part)
+                logger.info(f"Attached resume: {os.path.basename(self.resume_path)}")
             else:
                 logger.warning(f"Resume not found at {self.resume_path}")
             
@@ -141,7 +199,7 @@ LinkedIn: {self.profile['personal_info']['linkedin']}
                 }
             
             # Send email
-            if not self.email_password:
+            if self.smtp_auth and not self.email_password:
                 raise Exception("Email password not configured. Set EMAIL_APP_PASSWORD environment variable.")
             
             # Recipients include To + CC
@@ -149,10 +207,12 @@ LinkedIn: {self.profile['personal_info']['linkedin']}
             if self.cc_emails:
                 recipients.extend(self.cc_emails)
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.from_email, self.email_password)
-                server.send_message(msg, to_addrs=recipients)
+            if self._pool is not None:
+                self._pool.send_message(msg, to_addrs=recipients)
+            else:
+                # One-off send: session is opened and closed around this email
+                with self._create_pool() as pool:
+                    pool.send_message(msg, to_addrs=recipients)
             
             logger.info(f"Application sent successfully to {to_email}")
             if self.cc_emails:
@@ -174,4 +234,9 @@ LinkedIn: {self.profile['personal_info']['linkedin']}
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
-
+    
+    def send_batch(self, applications: List[Tuple[str, Dict]], dry_run: bool = False) -> List[Dict]:
+        """Send several applications over one pooled SMTP session"""
+        with self.smtp_session():
+            return [self.send_application(to_email, job_info, dry_run=dry_run)
+                    for to_email, job_info in applications]
@@ -9,6 +9,7 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.auto_apply.profile_matcher import ProfileMatcher, MIN_REQUIRED_MATCHES
 from src.utils.logger import get_logger
 
 logger = get_logger('job_filter')
@@ -23,6 +24,8 @@ class JobFilter:
         
         self.user_skills = set([skill.lower() for skill in self.profile['skills']])
         self.preferences = self.profile['preferences']
+        # Single-profile instance of the shared matcher: one text scan per job
+        self.matcher = ProfileMatcher([self.profile])
     
     def calculate_skill_match(self, job_keywords: str) -> float:
         """Calculate skill match percentage"""
@@ -63,7 +66,7 @@ class JobFilter:
         matches = sum(1 for keyword in self.preferences['required_keywords'] 
                      if keyword.lower() in message_lower)
         
-        return matches >= 2
+        return matches >= MIN_REQUIRED_MATCHES
     
     def check_exclude_keywords(self, message_text: str) -> bool:
         """Check if message contains excluded keywords"""
@@ -82,34 +85,25 @@ class JobFilter:
         filtered_jobs = []
         
         for job in jobs:
-            # Calculate skill match
-            skill_match = self.calculate_skill_match(job.get('keywords', ''))
-            
-            # Check role match
-            role_match = self.check_role_match(job['message_text'])
-            
-            # Check required keywords
-            has_required = self.check_required_keywords(job['message_text'])
-            
-            # Check exclude keywords
-            has_excluded = self.check_exclude_keywords(job['message_text'])
+            result = self.matcher.score(job)[0]
+            skill_match = result['match_score']
             
             # Decision
-            if has_excluded:
+            if result['excluded']:
                 logger.debug(f"Excluded job {job['message_id']} - contains excluded keywords")
                 continue
             
-            if not has_required:
+            if result['required_matches'] < MIN_REQUIRED_MATCHES:
                 logger.debug(f"Skipped job {job['message_id']} - missing required keywords")
                 continue
             
-            if skill_match < min_match_score and not role_match:
+            if skill_match < min_match_score and not result['role_match']:
                 logger.debug(f"Skipped job {job['message_id']} - low match score: {skill_match}%")
                 continue
             
             # Add match score to job
             job['match_score'] = skill_match
-            job['role_match'] = role_match
+            job['role_match'] = result['role_match']
             
             filtered_jobs.append(job)
         
@@ -1,7 +1,7 @@
 """
 Extract and categorize job application links from messages
 """
-import re
+import json
 import sqlite3
 from typing import List, Dict, Tuple
 import sys
@@ -11,16 +11,38 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from config.settings import PATHS, DATABASE
 from src.utils.logger import get_logger
+from src.utils.patterns import patterns
 
 logger = get_logger('link_extractor')
 
+URL_PATTERN = patterns['url']
+EMAIL_PATTERN = patterns['email']  # Shared with JobVerifier's contact extraction
+
+# Types that can be applied to (rows with 'unknown' are kept so backfill
+# knows the message was already scanned)
+APPLICABLE_TYPES = ('email', 'linkedin', 'naukri', 'indeed', 'instahyre', 'career_page')
+
 
 class LinkExtractor:
     """Extract and categorize application links from job messages"""
     
-    def __init__(self):
+    def __init__(self, db=None):
+        """
+        db: DatabaseHandler for backfill / queries, opened on first use. The
+        fetcher only extracts (its links reach the database with the
+        message), so sharded workers never open a local database here.
+        """
+        self._db = db
         self.db_path = os.path.join(PATHS['database'], DATABASE['name'])
     
+    @property
+    def db(self):
+        if self._db is None:
+            # Also makes sure the application_links side table exists
+            from src.storage.database import DatabaseHandler
+            self._db = DatabaseHandler()
+        return self._db
+    
     def extract_links_from_message(self, message_text: str) -> Dict[str, any]:
         """Extract all types of application info from message"""
         
@@ -32,13 +54,11 @@ class LinkExtractor:
         }
         
         # Extract URLs
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        urls = re.findall(url_pattern, message_text, re.IGNORECASE)
+        urls = URL_PATTERN.findall(message_text)
         result['urls'] = [url.rstrip('.,;:)>') for url in urls]
         
         # Extract emails
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, message_text)
+        emails = EMAIL_PATTERN.findall(message_text)
         result['emails'] = emails
         
         # Categorize application type
@@ -83,55 +103,95 @@ class LinkExtractor:
         
         return result
     
+    def backfill_links(self, days: int = None) -> int:
+        """
+        Extract links for messages stored without them (older rows, CSV
+        imports). Already-scanned messages are skipped by the anti-join, so
+        this is a single cheap query when nothing is missing.
+        """
+        db = self.db
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        query = """
+            SELECT m.message_id, m.message_text, m.job_type, m.date
+            FROM messages m
+            LEFT JOIN application_links al ON al.message_id = m.message_id
+            WHERE al.message_id IS NULL
+            AND (m.cluster_id IS NULL OR m.cluster_id = m.message_id)
+        """
+        params = []
+        if days is not None:
+            query += " AND m.date >= date('now', ?)"
+            params.append(f'-{days} days')
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        for row in rows:
+            message_data = {
+                'message_id': row['message_id'],
+                'job_type': row['job_type'],
+                'date': row['date'],
+                'application_links': self.extract_links_from_message(row['message_text'] or '')
+            }
+            db.insert_application_links(cursor, message_data)
+        
+        conn.commit()
+        conn.close()
+        
+        if rows:
+            logger.info(f"Backfilled application links for {len(rows)} messages")
+        return len(rows)
+    
     def get_applicable_jobs(self, job_type: str = 'tech', days: int = 7) -> List[Dict]:
-        """Get jobs that can be auto-applied to"""
+        """Get jobs that can be auto-applied to (cross-posted copies are skipped)"""
+        
+        self.backfill_links(days)
         
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Query based on job type
-        if job_type == 'all':
-            query = """
-                SELECT message_id, message_text, job_type, group_name, date, keywords_found
-                FROM messages
-                WHERE date >= date('now', '-{} days')
-                ORDER BY date DESC
-            """.format(days)
-        else:
-            query = """
-                SELECT message_id, message_text, job_type, group_name, date, keywords_found
-                FROM messages
-                WHERE job_type LIKE '%{}%' 
-                AND date >= date('now', '-{} days')
-                ORDER BY date DESC
-            """.format(job_type, days)
-        
-        cursor.execute(query)
+        # Uses idx_application_links_type_date: one range scan per type
+        placeholders = ', '.join('?' for _ in APPLICABLE_TYPES)
+        query = f"""
+            SELECT al.message_id, al.application_type, al.application_link, al.urls, al.emails,
+                   m.message_text, m.job_type, m.group_name, m.date, m.keywords_found
+            FROM application_links al
+            JOIN messages m ON m.message_id = al.message_id
+            WHERE al.application_type IN ({placeholders})
+            AND al.date >= date('now', ?)
+        """
+        params = list(APPLICABLE_TYPES) + [f'-{days} days']
+        
+        # Query based on job type (messages.job_type: reclassification
+        # by fix_empty_job_types / fix_job_types.py only updates messages)
+        if job_type != 'all':
+            query += " AND m.job_type LIKE ?"
+            params.append(f'%{job_type}%')
+        
+        query += " ORDER BY al.date DESC"
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         
-        applicable_jobs = []
-        
-        for row in rows:
-            link_info = self.extract_links_from_message(row['message_text'])
-            
-            if link_info['application_type'] != 'unknown':
-                applicable_jobs.append({
-                    'message_id': row['message_id'],
-                    'message_text': row['message_text'],
-                    'job_type': row['job_type'],
-                    'group_name': row['group_name'],
-                    'date': row['date'],
-                    'keywords': row['keywords_found'],
-                    'application_type': link_info['application_type'],
-                    'application_link': link_info['application_link'],
-                    'urls': link_info['urls'],
-                    'emails': link_info['emails']
-                })
+        applicable_jobs = [{
+            'message_id': row['message_id'],
+            'message_text': row['message_text'],
+            'job_type': row['job_type'],
+            'group_name': row['group_name'],
+            'date': row['date'],
+            'keywords': row['keywords_found'],
+            'application_type': row['application_type'],
+            'application_link': row['application_link'],
+            'urls': json.loads(row['urls'] or '[]'),
+            'emails': json.loads(row['emails'] or '[]')
+        } for row in rows]
         
         conn.close()
         
-        logger.info(f"Found {len(applicable_jobs)} applicable jobs out of {len(rows)} total jobs")
+        logger.info(f"Found {len(applicable_jobs)} applicable jobs")
         
         return applicable_jobs
     
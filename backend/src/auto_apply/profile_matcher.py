@@ -0,0 +1,187 @@
+"""
+Match jobs against many candidate profiles in one pass
+
+All profiles' role / required / exclude phrases are compiled into a single
+Aho-Corasick automaton, and their skills into an inverted index
+(skill -> profiles). Scoring a job walks its text once and looks up each of
+its keywords once, then reads the per-profile counters - cost grows with the
+job's length, not with profiles x keywords.
+
+Semantics are the same as the original per-profile checks in JobFilter:
+phrases match as case-insensitive substrings, at least 2 required keywords
+must appear, any exclude keyword rejects the job, and skill match is the
+percentage of the job's keywords that are in the profile's skills.
+"""
+import json
+from collections import deque
+from typing import Dict, List, Union
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.logger import get_logger
+
+logger = get_logger('profile_matcher')
+
+ROLE, REQUIRED, EXCLUDE = 0, 1, 2
+
+# At least this many required keywords must appear in a job
+MIN_REQUIRED_MATCHES = 2
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every (possibly overlapping) match"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(pattern_id)
+
+        # Breadth-first fail links; outputs are merged along them so a scan
+        # never has to follow fail chains just to report matches
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> set:
+        """Ids of all patterns occurring in `text` (already lowercased)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+class ProfileMatcher:
+    """Scores every job against every profile with one scan per job"""
+
+    def __init__(self, profiles: List[Union[str, Dict]]):
+        self.profiles = []
+        for profile in profiles:
+            if isinstance(profile, str):
+                with open(profile, 'r') as f:
+                    profile = json.load(f)
+            self.profiles.append(profile)
+
+        self.names = [
+            profile.get('personal_info', {}).get('name') or f"profile_{index}"
+            for index, profile in enumerate(self.profiles)
+        ]
+        self.skill_counts = [len({skill.lower() for skill in p['skills']}) for p in self.profiles]
+
+        # phrase -> pattern id; postings[pattern id] -> [(profile, kind), ...]
+        pattern_ids = {}
+        self._postings = []
+        # skill -> [profile, ...]
+        self._skill_index = {}
+
+        for index, profile in enumerate(self.profiles):
+            preferences = profile['preferences']
+            for kind, phrases in ((ROLE, preferences.get('roles', [])),
+                                  (REQUIRED, preferences.get('required_keywords', [])),
+                                  (EXCLUDE, preferences.get('exclude_keywords', []))):
+                for phrase in phrases:
+                    phrase = phrase.lower()
+                    if not phrase:
+                        continue
+                    pattern_id = pattern_ids.setdefault(phrase, len(pattern_ids))
+                    if pattern_id == len(self._postings):
+                        self._postings.append([])
+                    self._postings[pattern_id].append((index, kind))
+
+            for skill in {skill.lower() for skill in profile['skills']}:
+                self._skill_index.setdefault(skill, []).append(index)
+
+        self.automaton = KeywordAutomaton(list(pattern_ids))
+        logger.debug(f"Compiled {len(pattern_ids)} phrases and {len(self._skill_index)} skills "
+                     f"for {len(self.profiles)} profiles")
+
+    def score(self, job: Dict) -> List[Dict]:
+        """
+        Match one job against all profiles
+
+        Returns:
+            list: one dict per profile (same order as `profiles`) with
+                  match_score, role_match, required_matches, excluded
+        """
+        count = len(self.profiles)
+        role_match = [False] * count
+        required = [0] * count
+        excluded = [False] * count
+
+        for pattern_id in self.automaton.find_all(job['message_text'].lower()):
+            for index, kind in self._postings[pattern_id]:
+                if kind == ROLE:
+                    role_match[index] = True
+                elif kind == REQUIRED:
+                    required[index] += 1
+                else:
+                    excluded[index] = True
+
+        # Skill match: share of the job's keywords found in each profile
+        keywords = job.get('keywords') or ''
+        job_skills = {kw.strip().lower() for kw in keywords.split(',')} if keywords else set()
+        skill_hits = [0] * count
+        for skill in job_skills:
+            for index in self._skill_index.get(skill, ()):
+                skill_hits[index] += 1
+
+        total = len(job_skills)
+        return [{
+            'match_score': round(skill_hits[i] / total * 100, 2) if total else 0.0,
+            'role_match': role_match[i],
+            'required_matches': required[i],
+            'excluded': excluded[i],
+        } for i in range(count)]
+
+    @staticmethod
+    def passes(result: Dict, min_match_score: float) -> bool:
+        if result['excluded'] or result['required_matches'] < MIN_REQUIRED_MATCHES:
+            return False
+        return result['match_score'] >= min_match_score or result['role_match']
+
+    def filter_jobs(self, jobs: List[Dict], min_match_score: float = 30.0) -> List[List[Dict]]:
+        """
+        Per-profile filtered job lists, best match first
+
+        Jobs are copied per profile so each list carries its own
+        match_score / role_match.
+        """
+        matched = [[] for _ in self.profiles]
+        for job in jobs:
+            for index, result in enumerate(self.score(job)):
+                if self.passes(result, min_match_score):
+                    matched[index].append(dict(job, match_score=result['match_score'],
+                                               role_match=result['role_match']))
+
+        for jobs_for_profile in matched:
+            jobs_for_profile.sort(key=lambda x: x['match_score'], reverse=True)
+        return matched
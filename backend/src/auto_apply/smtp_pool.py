@@ -0,0 +1,168 @@
+"""
+Pooled, authenticated SMTP sessions
+
+Opening an SMTP session costs a TCP connect, EHLO, a STARTTLS handshake and
+AUTH - several round trips before the first byte of mail. The pool keeps
+logged-in sessions open and hands them out for consecutive sends; a session
+that went stale (server idle timeout, network drop) is replaced transparently.
+"""
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger('smtp_pool')
+
+# Errors after which a session is thrown away and the send retried once: the
+# ways a stale session fails on its first command. Not OSError: SMTPException
+# subclasses it, and a refused recipient, failed AUTH or 5xx data error is
+# permanent - retrying would send or fail twice. Not socket.timeout either: a
+# timeout waiting for the reply to DATA may come after the server accepted
+# the message, so a retry could mail the recruiter twice. The timed-out
+# session is still discarded (it is not an SMTPException).
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError)
+
+
+class _PooledSession:
+    """An open SMTP session plus bookkeeping"""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of logged-in SMTP sessions"""
+
+    def __init__(self, host, port, username=None, password=None, use_starttls=True,
+                 size=1, timeout=30, max_idle_seconds=120, max_messages_per_session=100):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_starttls = use_starttls
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages_per_session = max_messages_per_session
+
+        # LIFO: reuse the most recently used (least likely to be stale) session
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _open(self):
+        with metrics.timer('smtp_session_open_seconds', 'SMTP connect + STARTTLS + login'):
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                smtp.ehlo()
+                if self.use_starttls:
+                    smtp.starttls()
+                    smtp.ehlo()
+                if self.password:
+                    smtp.login(self.username, self.password)
+            except Exception:
+                self._quit(smtp)
+                raise
+        metrics.counter('smtp_sessions_opened_total', 'SMTP sessions opened').inc()
+        logger.debug(f"Opened SMTP session to {self.host}:{self.port}")
+        return _PooledSession(smtp)
+
+    @staticmethod
+    def _quit(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _is_usable(self, session):
+        if session.messages_sent >= self.max_messages_per_session:
+            return False
+        if time.monotonic() - session.last_used < self.max_idle_seconds:
+            return True
+        # Idle for a while: servers drop quiet sessions, so probe before reuse
+        try:
+            return session.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self):
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                if self._is_usable(session):
+                    return session
+                self._quit(session.smtp)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, session, broken=False):
+        try:
+            if broken or self._closed:
+                self._quit(session.smtp)
+            else:
+                session.last_used = time.monotonic()
+                self._idle.put(session)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """Borrow a logged-in smtplib.SMTP for the duration of the block"""
+        session = self._checkout()
+        broken = False
+        try:
+            yield session.smtp
+            session.messages_sent += 1
+        except Exception as e:
+            # SMTP replies (smtplib resets after a refusal) leave the session usable
+            broken = isinstance(e, RECONNECT_ERRORS) or not isinstance(e, smtplib.SMTPException)
+            raise
+        finally:
+            self._checkin(session, broken=broken)
+
+    def send_message(self, msg, from_addr=None, to_addrs=None):
+        """Send on a pooled session, reconnecting and retrying once if it dropped"""
+        for attempt in range(2):
+            try:
+                with self.session() as smtp:
+                    return smtp.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+            except RECONNECT_ERRORS as e:
+                if attempt == 1:
+                    raise
+                metrics.counter('smtp_reconnects_total', 'SMTP sends retried on a fresh session').inc()
+                logger.warning(f"SMTP session dropped ({type(e).__name__}: {e}), reconnecting...")
+
+    def close(self):
+        """Quit all idle sessions; sessions in use are closed when returned"""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(session.smtp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
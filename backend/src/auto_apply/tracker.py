@@ -5,7 +5,7 @@ import sqlite3
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
@@ -64,6 +64,42 @@ class ApplicationTracker:
         
         return result is not None
     
+    def get_applied_message_ids(self) -> Set[str]:
+        """All message_ids already applied to (one query instead of one per job)"""
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT message_id FROM applications')
+        applied = {row[0] for row in cursor.fetchall()}
+        
+        conn.close()
+        
+        return applied
+    
+    _INSERT_SQL = '''
+        INSERT OR REPLACE INTO applications 
+        (message_id, job_title, company_name, group_name, application_type, 
+         application_link, status, match_score, applied_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def _application_row(self, job_info: Dict, status: str) -> Tuple:
+        # Extract job title from first line
+        job_title = job_info['message_text'].split('\n')[0].strip('*#-_').strip()[:200]
+        
+        return (
+            job_info['message_id'],
+            job_title,
+            job_info.get('company_name', 'Unknown'),
+            job_info.get('group_name', ''),
+            job_info.get('application_type', ''),
+            job_info.get('application_link', ''),
+            status,
+            job_info.get('match_score', 0.0),
+            datetime.now()
+        )
+    
     def record_application(self, job_info: Dict, status: str = 'sent') -> bool:
         """Record application in database"""
         
@@ -71,25 +107,7 @@ class ApplicationTracker:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # Extract job title from first line
-            job_title = job_info['message_text'].split('\n')[0].strip('*#-_').strip()[:200]
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO applications 
-                (message_id, job_title, company_name, group_name, application_type, 
-                 application_link, status, match_score, applied_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_info['message_id'],
-                job_title,
-                job_info.get('company_name', 'Unknown'),
-                job_info.get('group_name', ''),
-                job_info.get('application_type', ''),
-                job_info.get('application_link', ''),
-                status,
-                job_info.get('match_score', 0.0),
-                datetime.now()
-            ))
+            cursor.execute(self._INSERT_SQL, self._application_row(job_info, status))
             
             conn.commit()
             conn.close()
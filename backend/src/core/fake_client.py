@@ -0,0 +1,135 @@
+"""
+Offline stand-in for the Telethon client
+
+Implements just the surface TelegramJobFetcher uses (get_entity,
+iter_messages, is_connected, disconnect) over deterministic synthetic
+groups, so a full fetch cycle can run without credentials or network -
+for profiling and CI.
+"""
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+
+from config.settings import MESSAGE_YEAR_FILTER
+
+# Message templates: mix of job posts for each category and plain chatter
+JOB_TEMPLATES = [
+    "Hiring Python Developer at {company}. 2+ years experience with Django, REST API and SQL. "
+    "Location: Bangalore. Salary: 8-12 LPA. Apply: careers@{domain}",
+    "{company} is hiring a Senior Backend Engineer (Node.js, AWS, Docker). Remote / WFH. "
+    "Send your resume to jobs@{domain} or apply at https://{domain}/careers",
+    "Freelance React Native developer needed for a 3 month contract project. Hourly pay, "
+    "flexible hours. Contact @{handle}",
+    "Fresher / Entry level trainee developer openings at {company}. 0-1 year, campus hiring 2025 batch. "
+    "Location: Pune. Apply: https://{domain}/jobs",
+    "Digital Marketing Executive required at {company}, Mumbai. SEO, social media, 1-3 years. "
+    "Email hr@{domain}",
+    "Internship opportunity: Data Science intern at {company}. Python, machine learning, SQL. "
+    "Stipend 20k. Apply before 30 Nov: https://{domain}/intern",
+    "Business Development Manager - {company}, Delhi NCR. Sales experience 3+ years. "
+    "Contact: +91 98765 43210",
+]
+
+CHATTER_TEMPLATES = [
+    "Good morning everyone!",
+    "Can someone share the notes from yesterday's session?",
+    "Thanks for the add {handle}",
+    "Which laptop is best for coding under 60k?",
+    "Happy Diwali to all members 🎉",
+]
+
+COMPANIES = ['Acme Labs', 'Nimbus Tech', 'Orbit Systems', 'Quantix', 'BluePeak Software', 'Zenith Analytics']
+
+
+class FakeEntity:
+    """Minimal channel entity (id + title)"""
+
+    def __init__(self, entity_id, title, username):
+        self.id = entity_id
+        self.title = title
+        self.username = username
+
+
+class FakeMessage:
+    """Minimal message object with the attributes the fetcher reads"""
+
+    def __init__(self, message_id, text, date, sender_id):
+        self.id = message_id
+        self.text = text
+        self.date = date
+        self.sender_id = sender_id
+
+
+class FakeTelegramClient:
+    """Deterministic offline client (same seed = same groups and messages)"""
+
+    def __init__(self, num_groups=10, messages_per_group=100, job_ratio=0.6, latency=0.0, seed=42):
+        self.num_groups = num_groups
+        self.messages_per_group = messages_per_group
+        self.job_ratio = job_ratio
+        self.latency = latency  # Simulated network delay per page of messages
+        self.seed = seed
+        self._connected = True
+        self._entities = {}
+
+        for index in range(num_groups):
+            username = f"fake_jobs_{index:03d}"
+            self._entities[username] = FakeEntity(1_000_000 + index, f"Fake Jobs Group {index}", username)
+
+    def groups_data(self):
+        """Group list in the same shape as data.json"""
+        return [
+            {'name': entity.title, 'link': f"https://t.me/{username}"}
+            for username, entity in self._entities.items()
+        ]
+
+    def write_groups_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.groups_data(), f, indent=2)
+        return path
+
+    def _message_text(self, rng):
+        company = rng.choice(COMPANIES)
+        values = {
+            'company': company,
+            'domain': company.lower().replace(' ', '') + '.com',
+            'handle': f"hr_{rng.randint(100, 999)}",
+        }
+        if rng.random() < self.job_ratio:
+            return rng.choice(JOB_TEMPLATES).format(**values)
+        return rng.choice(CHATTER_TEMPLATES).format(**values)
+
+    async def get_entity(self, name):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        username = name.rstrip('/').split('/')[-1]
+        entity = self._entities.get(username)
+        if entity is None:
+            raise ValueError(f'No user has "{username}" as username')
+        return entity
+
+    async def iter_messages(self, entity, limit=None, min_id=0):
+        """Yield newest-first messages (ids above min_id only), like Telethon"""
+        rng = random.Random(f"{self.seed}:{entity.id}")
+        count = self.messages_per_group if limit is None else min(limit, self.messages_per_group)
+        newest = datetime(MESSAGE_YEAR_FILTER, 12, 31, 12, 0, 0)
+
+        for offset in range(count):
+            # Telethon fetches in pages of 100
+            if self.latency and offset % 100 == 0:
+                await asyncio.sleep(self.latency)
+            message_id = self.messages_per_group - offset
+            if message_id <= min_id:
+                return
+            date = newest - timedelta(minutes=37 * offset)
+            yield FakeMessage(message_id, self._message_text(rng), date, rng.randint(10_000, 99_999))
+
+    def is_connected(self):
+        return self._connected
+
+    async def connect(self):
+        self._connected = True
+
+    async def disconnect(self):
+        self._connected = False
@@ -0,0 +1,180 @@
+"""
+Bounded-queue stage pipeline
+
+Ingest runs as a chain of stages joined by bounded asyncio queues:
+
+    source (async iterator) -> stage 1 -> stage 2 -> ... -> last stage
+
+Each stage runs `concurrency` workers. A worker takes up to `batch_size`
+queued items, waiting at most `linger` seconds for a batch to fill (0: take
+what is queued), and calls func(batch), which
+returns the items for the next stage. Plain functions run in the thread
+pool unless offload=False (for steps cheaper than the hand-off), coroutine
+functions run on the loop. Batches leave a stage in the order they entered
+it, so a stage can be scaled out without reordering messages. When a queue
+is full, the stage before it waits.
+
+A batch whose func raises is logged and dropped, so the stages behind it
+never stall; the caller learns about it through on_error(stage name, batch)
+and the 'failed' count in the stats run() returns.
+
+    pipeline = Pipeline([Stage('parse', parse_batch, concurrency=2, batch_size=20),
+                         Stage('store', store_batch)], queue_size=50, executor=pool)
+    stats = await pipeline.run(source())
+
+Metrics per stage: pipeline_<stage>_queue_depth (items waiting),
+pipeline_<stage>_blocked_seconds (upstream waits on a full queue),
+pipeline_<stage>_batch_seconds, pipeline_<stage>_items_total and
+pipeline_<stage>_failed_total.
+"""
+import asyncio
+import time
+
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger('pipeline')
+
+_END = object()  # End of input, passed down the chain
+
+
+class Stage:
+    """One pipeline step: func(batch) -> items for the next stage"""
+
+    def __init__(self, name, func, concurrency=1, batch_size=1, offload=True, linger=0.0):
+        self.name = name
+        self.func = func
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self.is_async = asyncio.iscoroutinefunction(func)
+        self.offload = offload and not self.is_async
+
+
+class Pipeline:
+    """Stages joined by bounded queues; run() feeds a source through them"""
+
+    def __init__(self, stages, queue_size=100, executor=None, on_error=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.executor = executor  # None: the loop's default executor
+        self.on_error = on_error  # on_error(stage name, batch) for each dropped batch
+
+    async def run(self, source):
+        """
+        Feed every item of source through the stages and wait for the last one
+
+        Returns: {stage name: {'items', 'batches', 'seconds', 'failed'}}, failed
+        counting the items of dropped batches
+        """
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        stats = {stage.name: {'items': 0, 'batches': 0, 'seconds': 0.0, 'failed': 0} for stage in self.stages}
+        tasks = [
+            asyncio.ensure_future(self._run_stage(
+                stage, queues[index],
+                queues[index + 1] if index + 1 < len(queues) else None,
+                self.stages[index + 1].name if index + 1 < len(queues) else None,
+                stats[stage.name]))
+            for index, stage in enumerate(self.stages)
+        ]
+
+        try:
+            async for item in source:
+                await self._put(queues[0], self.stages[0].name, item)
+            await self._put(queues[0], self.stages[0].name, _END)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return stats
+
+    async def _put(self, queue, name, item):
+        if queue.full():
+            with metrics.timer(f'pipeline_{name}_blocked_seconds',
+                               f'Wait for room in the {name} queue (backpressure)'):
+                await queue.put(item)
+        else:
+            queue.put_nowait(item)
+        metrics.gauge(f'pipeline_{name}_queue_depth', f'Items waiting for the {name} stage').set(queue.qsize())
+
+    async def _take(self, stage, inbox):
+        """Next batch (up to batch_size, lingering for more), or None at the end of input"""
+        batch = []
+        item = await inbox.get()
+        deadline = time.monotonic() + stage.linger
+        while item is not _END:
+            batch.append(item)
+            if len(batch) >= stage.batch_size:
+                break
+            if not inbox.empty():
+                item = inbox.get_nowait()
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(inbox.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+        if item is _END:
+            # Leave the marker for the stage's other workers (a slot was just freed)
+            inbox.put_nowait(_END)
+        metrics.gauge(f'pipeline_{stage.name}_queue_depth',
+                      f'Items waiting for the {stage.name} stage').set(inbox.qsize())
+        return batch or None
+
+    async def _run_stage(self, stage, inbox, outbox, next_name, stat):
+        order = {'taken': 0, 'emitted': 0}
+        turn = asyncio.Condition()
+        await asyncio.gather(*(
+            self._worker(stage, inbox, outbox, next_name, stat, order, turn)
+            for _ in range(stage.concurrency)
+        ))
+        inbox.get_nowait()  # The end marker the last worker left behind
+        metrics.gauge(f'pipeline_{stage.name}_queue_depth', f'Items waiting for the {stage.name} stage').set(0)
+        if outbox is not None:
+            await self._put(outbox, next_name, _END)
+
+    async def _worker(self, stage, inbox, outbox, next_name, stat, order, turn):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._take(stage, inbox)
+            if batch is None:
+                return
+            sequence = order['taken']
+            order['taken'] += 1
+
+            started = time.perf_counter()
+            try:
+                if stage.is_async:
+                    output = await stage.func(batch)
+                elif stage.offload:
+                    output = await loop.run_in_executor(self.executor, stage.func, batch)
+                else:
+                    output = stage.func(batch)
+            except Exception as e:
+                # A failing batch is dropped; the stage keeps going so upstream never stalls
+                logger.error(f"❌ Stage {stage.name} failed on a batch of {len(batch)}: {type(e).__name__}: {e}")
+                output = []
+                stat['failed'] += len(batch)
+                metrics.counter(f'pipeline_{stage.name}_failed_total',
+                                f'Items dropped with a failing {stage.name} batch').inc(len(batch))
+                if self.on_error is not None:
+                    self.on_error(stage.name, batch)
+            elapsed = time.perf_counter() - started
+            stat['items'] += len(batch)
+            stat['batches'] += 1
+            stat['seconds'] += elapsed
+            metrics.histogram(f'pipeline_{stage.name}_batch_seconds', f'{stage.name} stage time per batch').observe(elapsed)
+            metrics.counter(f'pipeline_{stage.name}_items_total', f'Items through the {stage.name} stage').inc(len(batch))
+
+            # Emit in the order batches were taken
+            async with turn:
+                await turn.wait_for(lambda: order['emitted'] == sequence)
+            if outbox is not None:
+                for item in output or []:
+                    await self._put(outbox, next_name, item)
+            async with turn:
+                order['emitted'] += 1
+                turn.notify_all()
@@ -5,10 +5,15 @@ import asyncio
 import random
 import json
 import os
+import re
 import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # IMPORTANT: Patch Telethon sessions before importing TelegramClient
+# (the fix module no longer patches on import, so this is the only call)
 from src.utils.telethon_session_fix import patch_telethon_sessions
 patch_telethon_sessions()
 
@@ -24,30 +29,61 @@ from telethon.tl.functions.messages import ImportChatInviteRequest
 import signal
 import sys
 
-from config.settings import ACCOUNTS, RATE_LIMITS, MESSAGE_YEAR_FILTER, PATHS
+from config.settings import (ACCOUNTS, RATE_LIMITS, MESSAGE_YEAR_FILTER, PATHS, GROUP_TRENDS, SHARDING, RUNTIME,
+                             INGEST_PIPELINE)
 from src.utils.logger import get_logger
 from src.storage.database import DatabaseHandler
 from src.services.classifier import MessageClassifier
 from src.storage.csv_handler import CSVHandler
 from src.services.job_verifier import JobVerifier
+from src.services.near_duplicate import NearDuplicateDetector, content_hash
+from src.services.group_trends import current_hour, dead_groups
+from src.auto_apply.link_extractor import LinkExtractor
+from src.utils.maintenance import run_database_maintenance
+from src.utils.metrics import metrics
+from src.utils.patterns import patterns
+from src.utils.profiler import stage, stage_aiter
+from src.core.pipeline import Pipeline, Stage
 
 logger = get_logger('telegram_client')
 
+def shard_of(group_link, num_shards):
+    """Shard of a group: stable across processes and hosts (unlike hash())"""
+    return zlib.crc32(group_link.encode('utf-8')) % num_shards
+
 class TelegramJobFetcher:
     """Main Telegram client with safety features"""
     
-    def __init__(self):
-        self.accounts = ACCOUNTS
+    def __init__(self, db=None, csv_handler=None, accounts=None):
+        """
+        db / csv_handler: writer service proxies for sharded workers
+        (default: local DatabaseHandler / CSVHandler)
+        accounts: subset of ACCOUNTS this process logs in with
+        """
+        self.accounts = ACCOUNTS if accounts is None else accounts
         self.clients = []
         self.current_account_index = 0
-        self.db = DatabaseHandler()
+        self.db = db if db is not None else DatabaseHandler()
         self.classifier = MessageClassifier()
-        self.csv_handler = CSVHandler()
+        self.csv_handler = csv_handler if csv_handler is not None else CSVHandler()
         self.job_verifier = JobVerifier()
+        self.near_duplicates = NearDuplicateDetector(self.db)
+        self.link_extractor = LinkExtractor()
         self.is_shutting_down = False
         self._running_tasks = []
         self._db_write_lock = asyncio.Lock()
         self._last_db_write = 0
+        # Filter / enrich stages and CSV writes run here, off the event loop
+        self._ingest_pool = ThreadPoolExecutor(max_workers=INGEST_PIPELINE['workers'], thread_name_prefix='ingest')
+        
+        # Offline/profiling runs set these to 0 / False to skip the
+        # human-like pauses and the working-hours gate
+        self.delay_scale = 1.0
+        self.respect_working_hours = True
+        
+        # Sharded workers write their own snapshot and stop a shard once its lease is lost
+        self.metrics_file = 'fetcher_metrics.json'
+        self._lease_lost = False
         
         # Create sessions directory
         os.makedirs(PATHS['sessions'], exist_ok=True)
@@ -59,7 +95,13 @@ class TelegramJobFetcher:
         
         # Load tracking data
         self.processed_messages = set()
+        self.archived_upto = {}
+        self.content_index = {}
+        self.activity_marks = {}
+        self.checkpoints = {}
         self.joined_groups = {}
+        self._entities = {}  # (account name, group_link) -> resolved entity
+        self.cycle_count = 0
         self._load_tracking_data()
     
     def _signal_handler(self, signum, frame):
@@ -71,6 +113,13 @@ class TelegramJobFetcher:
         """Load processed messages and joined groups"""
         # Load from database
         self.processed_messages = set(self.db.get_processed_message_ids())
+        self.archived_upto = self.db.get_archive_watermarks()
+        # content_hash -> message_id of the stored copy (the hot DB only holds recent messages)
+        self.content_index = dict(self.db.get_content_hashes())
+        # group_link -> newest message id already counted in group_activity
+        self.activity_marks = self.db.get_group_activity_marks()
+        # group_link -> newest message id of the last complete scan, cycle that completed it
+        self.checkpoints = self.db.get_group_checkpoints()
         
         joined = self.db.get_joined_groups()
         for group in joined:
@@ -244,9 +293,11 @@ class TelegramJobFetcher:
     
     async def _safe_delay(self, delay_range):
         """Add random delay for human-like behavior"""
-        delay = random.uniform(delay_range[0], delay_range[1])
+        delay = random.uniform(delay_range[0], delay_range[1]) * self.delay_scale
         logger.debug(f"Waiting {delay:.2f} seconds...")
-        await asyncio.sleep(delay)
+        metrics.histogram('fetcher_safe_delay_seconds', 'Time slept in _safe_delay').observe(delay)
+        with stage('safe_delay'):
+            await asyncio.sleep(delay)
     
     async def _safe_db_write(self, write_func, *args, **kwargs):
         """Safely write to database with locking to prevent concurrent access"""
@@ -254,16 +305,22 @@ class TelegramJobFetcher:
         retry_delay = 2
         
         for attempt in range(max_retries):
+            wait_started = time.perf_counter()
             async with self._db_write_lock:
                 try:
                     # Add small delay between writes to prevent lock contention
                     current_time = asyncio.get_event_loop().time()
                     time_since_last_write = current_time - self._last_db_write
-                    if time_since_last_write < 0.2:  # 200ms minimum between writes
-                        await asyncio.sleep(0.2 - time_since_last_write)
+                    min_interval = 0.2 * self.delay_scale  # 200ms minimum between writes
+                    if time_since_last_write < min_interval:
+                        await asyncio.sleep(min_interval - time_since_last_write)
                     
-                    # Perform the write
-                    result = write_func(*args, **kwargs)
+                    # Perform the write (wait = lock + throttle, execute = the write itself)
+                    metrics.histogram('fetcher_db_write_wait_seconds', '_safe_db_write lock/throttle wait').observe(
+                        time.perf_counter() - wait_started)
+                    with metrics.timer('fetcher_db_write_execute_seconds', '_safe_db_write execute time'), \
+                            stage('db_write'):
+                        result = write_func(*args, **kwargs)
                     self._last_db_write = asyncio.get_event_loop().time()
                     return result
                     
@@ -282,6 +339,9 @@ class TelegramJobFetcher:
     
     def _is_working_hours(self):
         """Check if current time is within working hours"""
+        if not self.respect_working_hours:
+            return True
+        
         current_hour = datetime.now().hour
         start_hour, end_hour = RATE_LIMITS.get('working_hours', (0, 24))
         
@@ -319,10 +379,11 @@ class TelegramJobFetcher:
             else:
                 # Public group
                 username = group_link.split('/')[-1]
-                entity = await asyncio.wait_for(
-                    client.get_entity(username),
-                    timeout=60
-                )
+                with metrics.timer('telegram_get_entity_seconds', 'client.get_entity latency'):
+                    entity = await asyncio.wait_for(
+                        client.get_entity(username),
+                        timeout=60
+                    )
                 # Join the channel/group
                 if isinstance(entity, Channel):
                     await asyncio.wait_for(
@@ -405,110 +466,65 @@ class TelegramJobFetcher:
                 
                 client = client_info['client']
                 account = client_info['account']
+                username = group_link.split('/')[-1]
                 
-                # Get entity with timeout
-                if 'joinchat' in group_link or '+' in group_link:
-                    entity = await asyncio.wait_for(
-                        client.get_entity(group_link),
-                        timeout=60
-                    )
-                else:
-                    username = group_link.split('/')[-1]
-                    entity = await asyncio.wait_for(
-                        client.get_entity(username),
-                        timeout=60
-                    )
+                # Get entity with timeout (resolved once per account and process)
+                entity_key = (account['name'], group_link)
+                entity = self._entities.get(entity_key)
+                if entity is None:
+                    with metrics.timer('telegram_get_entity_seconds', 'client.get_entity latency'), stage('get_entity'):
+                        if 'joinchat' in group_link or '+' in group_link:
+                            entity = await asyncio.wait_for(
+                                client.get_entity(group_link),
+                                timeout=60
+                            )
+                        else:
+                            entity = await asyncio.wait_for(
+                                client.get_entity(username),
+                                timeout=60
+                            )
+                    self._entities[entity_key] = entity
                 
                 group_name = entity.title if hasattr(entity, 'title') else username
                 
-                # Fetch messages
-                messages = []
-                new_messages_count = 0
-                messages_checked = 0
-                consecutive_old = 0  # Track consecutive old/processed messages
-                
-                async for message in client.iter_messages(entity, limit=limit):
-                    # Check shutdown flag
-                    if self.is_shutting_down:
-                        logger.info("Shutdown requested during message fetch")
-                        break
-                    
-                    messages_checked += 1
-                    
-                    # Add small delay between fetches (but only if we're still finding new messages)
-                    if messages_checked > 1:  # Skip delay for first message
-                        await self._safe_delay(RATE_LIMITS['message_fetch_delay'])
-                    
-                    # Skip if no text
-                    if not message.text:
-                        continue
-                    
-                    # Check if message is from current year
-                    if message.date.year != MESSAGE_YEAR_FILTER:
-                        continue
-                    
-                    # Create unique message ID
-                    message_id = f"{entity.id}_{message.id}"
-                    
-                    # Skip if already processed
-                    if message_id in self.processed_messages:
-                        consecutive_old += 1
-                        # If we've seen 10 consecutive old messages, likely all are old - skip rest
-                        if consecutive_old >= 10:
-                            logger.debug(f"Found 10 consecutive old messages, skipping rest for {group_name}")
-                            break
-                        continue
-                    
-                    # Reset counter when we find a new message
-                    consecutive_old = 0
-                    
-                    # Classify message
-                    job_type, keywords = self.classifier.classify(message.text)
-                    
-                    # Skip if not a job message
-                    if not job_type:
-                        continue
-                    
-                    # Verify job and extract company info
-                    verification_result = self.job_verifier.verify_and_extract(message.text)
-                    
-                    # Prepare message data with enhanced fields
-                    message_data = {
-                        'message_id': message_id,
-                        'group_name': group_name,
-                        'group_link': group_link,
-                        'sender': message.sender_id if message.sender_id else 'Unknown',
-                        'date': message.date.isoformat(),
-                        'message_text': message.text,
-                        'job_type': job_type,
-                        'keywords_found': ','.join(keywords),
-                        'account_used': account['name']
-                    }
-                    
-                    # Add verification and company info if available
-                    if verification_result:
-                        message_data.update(verification_result)
-                        logger.debug(f"Job verified: {verification_result['is_verified']}, "
-                                   f"Score: {verification_result['verification_score']:.2f}%, "
-                                   f"Company: {verification_result['company_name']}")
-                    
-                    # Save to database (will go to category-specific table too) with safe locking
-                    db_success = await self._safe_db_write(self.db.insert_message, message_data)
-                    if not db_success:
-                        logger.warning(f"⚠️  Database write failed for message {message_id} after retries, saving to CSV only")
-                    
-                    # Always save to CSV (even if DB write failed)
-                    try:
-                        self.csv_handler.write_message(message_data)
-                    except Exception as csv_error:
-                        logger.error(f"❌ CSV write error for message {message_id}: {csv_error}")
-                    
-                    # Update tracking and count even if DB write failed (CSV backup exists)
-                    self.processed_messages.add(message_id)
-                    messages.append(message_data)
-                    new_messages_count += 1
-                    
-                    logger.info(f"Fetched job message: {job_type} from {group_name}")
+                # Only ask Telegram for messages newer than the last complete scan.
+                # Channel message ids are the same for every account; in basic
+                # groups each account has its own, so only reuse its own checkpoint
+                checkpoint = self.checkpoints.get(group_link)
+                min_id = 0
+                if checkpoint and (isinstance(entity, Channel) or checkpoint['account_name'] == account['name']):
+                    min_id = checkpoint['last_message_id']
+                
+                # Ingest runs as fetch -> filter -> enrich -> persist stages
+                # (see _ingest_pipeline); the fetch stage reads this group
+                group = self._ingest_group(group_name, group_link, account['name'])
+                await self._ingest_pipeline().run(self._fetch_stage(client, entity, group, limit, min_id))
+                
+                messages = group['messages']
+                new_messages_count = group['new_messages']
+                cross_posts_count = group['cross_posts']
+                messages_checked = group['messages_checked']
+                newest_id = group['newest_id']
+                interrupted = group['interrupted']
+                activity = group['activity']
+                
+                # Newest-first scan: the checkpoint may only move once every
+                # message above the old one has been seen, and never past a
+                # message that was dropped before it was stored
+                checkpoint_id = newest_id
+                if group['lowest_failed_id'] is not None:
+                    checkpoint_id = group['lowest_failed_id'] - 1
+                if not interrupted and checkpoint_id is not None and checkpoint_id > min_id:
+                    if await self._safe_db_write(self.db.save_group_checkpoint, group_link,
+                                                 last_message_id=checkpoint_id, account_name=account['name']):
+                        self.checkpoints.setdefault(group_link, {'cycle_id': None}).update(
+                            last_message_id=checkpoint_id, account_name=account['name'])
+                
+                if GROUP_TRENDS['enabled']:
+                    await self._safe_db_write(self.db.record_group_activity, group_link, current_hour(),
+                                              last_message_id=newest_id, **activity)
+                    if newest_id is not None:
+                        self.activity_marks[group_link] = max(newest_id, self.activity_marks.get(group_link, 0))
                 
                 # Update account usage with safe locking (non-critical, continue even if it fails)
                 if new_messages_count > 0:
@@ -525,7 +541,8 @@ class TelegramJobFetcher:
                 
                 # Log with more detail
                 if new_messages_count > 0:
-                    logger.info(f"✅ Fetched {new_messages_count} new job messages from {group_name} (checked {messages_checked} total)")
+                    logger.info(f"✅ Fetched {new_messages_count} new job messages from {group_name} (checked {messages_checked} total, "
+                               f"{cross_posts_count} cross-posts)")
                 else:
                     logger.debug(f"⏭️  No new messages in {group_name} (checked {messages_checked})")
                 
@@ -587,6 +604,8 @@ class TelegramJobFetcher:
             
             except Exception as e:
                 logger.error(f"❌ Error fetching messages from {group_link}: {type(e).__name__}: {e}")
+                # e.g. the chat went private: resolve it again on the next try
+                self._entities.pop((client_info['account']['name'], group_link), None)
                 if retry < max_retries - 1 and not self.is_shutting_down:
                     await asyncio.sleep(10)
                     continue
@@ -594,8 +613,303 @@ class TelegramJobFetcher:
         
         return []
     
-    async def process_groups(self, groups_data):
-        """Process list of groups with optimized speed"""
+    def _ingest_group(self, group_name, group_link, account_name):
+        """Per-group state the ingest stages fill in"""
+        return {
+            'group_name': group_name,
+            'group_link': group_link,
+            'account_name': account_name,
+            'messages': [],
+            'new_messages': 0,
+            'cross_posts': 0,
+            'messages_checked': 0,
+            'newest_id': None,
+            'lowest_failed_id': None,  # Telegram id of the oldest message a stage dropped
+            'interrupted': False,
+            'activity': {'jobs': 0, 'non_jobs': 0, 'duplicates': 0},
+        }
+    
+    def _ingest_pipeline(self):
+        """filter -> enrich -> persist behind a group's fetch stage (INGEST_PIPELINE)"""
+        return Pipeline([
+            Stage('filter', self._filter_batch, **INGEST_PIPELINE['filter']),
+            Stage('enrich', self._enrich_batch, **INGEST_PIPELINE['enrich']),
+            Stage('persist', self._persist_batch, **INGEST_PIPELINE['persist']),
+        ], queue_size=INGEST_PIPELINE['queue_size'], executor=self._ingest_pool, on_error=self._ingest_failed)
+    
+    def _ingest_failed(self, stage_name, items):
+        """A stage dropped these messages: keep the group's checkpoint below them"""
+        self.near_duplicates.rollback([item['message_id'] for item in items])
+        for item in items:
+            group = item['group']
+            if group['lowest_failed_id'] is None or item['message'].id < group['lowest_failed_id']:
+                group['lowest_failed_id'] = item['message'].id
+        logger.warning(f"⚠️  {len(items)} message(s) not stored ({stage_name} failed), "
+                       f"they will be fetched again")
+    
+    async def _fetch_stage(self, client, entity, group, limit=None, min_id=0):
+        """Fetch stage: a group's new messages, newest first, past the cheap checks"""
+        group_name = group['group_name']
+        consecutive_old = 0  # Track consecutive old/processed messages
+        
+        # Activity counters for the group trends. Only messages above the
+        # group's mark are counted (non-jobs are never marked processed);
+        # the first fetch of a group just sets the mark, so its backlog
+        # does not count as one day's activity
+        count_above = self.activity_marks.get(group['group_link'], float('inf'))
+        
+        # Each wait is timed; page fetches show up in the p95/p99 tail
+        async for message in stage_aiter(metrics.timed_aiter(
+                client.iter_messages(entity, limit=limit, min_id=min_id),
+                'telegram_iter_messages_wait_seconds',
+                'Wait for next message from iter_messages'), 'iter_messages'):
+            # Check shutdown flag (what was already read still goes through the stages)
+            if self.is_shutting_down:
+                logger.info("Shutdown requested during message fetch")
+                group['interrupted'] = True
+                break
+            
+            group['messages_checked'] += 1
+            metrics.counter('fetcher_messages_checked_total', 'Messages read from Telegram').inc()
+            if group['newest_id'] is None or message.id > group['newest_id']:
+                group['newest_id'] = message.id
+            
+            # Add small delay between fetches (but only if we're still finding new messages)
+            if group['messages_checked'] > 1:  # Skip delay for first message
+                await self._safe_delay(RATE_LIMITS['message_fetch_delay'])
+            
+            # Skip if no text
+            if not message.text:
+                continue
+            
+            # Check if message is from current year
+            if message.date.year != MESSAGE_YEAR_FILTER:
+                continue
+            
+            # Create unique message ID
+            message_id = f"{entity.id}_{message.id}"
+            
+            # Newest-first: from here on everything is already in the archive
+            if message.id <= self.archived_upto.get(str(entity.id), 0):
+                logger.debug(f"Reached archived messages, skipping rest for {group_name}")
+                break
+            
+            # Skip if already processed
+            if message_id in self.processed_messages:
+                consecutive_old += 1
+                # If we've seen 10 consecutive old messages, likely all are old - skip rest.
+                # Not above a checkpoint: min_id already bounds the scan, and
+                # messages dropped last time may sit below stored ones
+                if consecutive_old >= 10 and not min_id:
+                    logger.debug(f"Found 10 consecutive old messages, skipping rest for {group_name}")
+                    break
+                continue
+            
+            # Reset counter when we find a new message
+            consecutive_old = 0
+            
+            yield {
+                'group': group,
+                'message': message,
+                'message_id': message_id,
+                'counted': message.id > count_above,
+            }
+    
+    def _filter_batch(self, items):
+        """
+        Filter stage (thread pool): prefilter and content hash
+        
+        Returns: the batch, rejects and re-posts marked in 'outcome' (counted by persist)
+        """
+        for item in items:
+            text = item['message'].text
+            
+            # Chatter that cannot be a job post stops here, before
+            # hashing, classification and verification
+            with stage('prefilter'):
+                candidate = self.classifier.prefilter(text)
+            if not candidate:
+                item['outcome'] = 'non_job'
+                continue
+            
+            with stage('content_hash'):
+                item['content_hash'] = content_hash(text)
+            if item['content_hash'] in self.content_index:
+                item['outcome'] = 'repost'
+        return items
+    
+    def _enrich_batch(self, items):
+        """
+        Enrich stage (thread pool): classify, near-duplicate lookup, then
+        verify and extract links of jobs that are not cross-posts
+        """
+        for item in items:
+            if 'outcome' in item:
+                continue
+            text = item['message'].text
+            
+            with stage('classify'):
+                job_type, keywords = self.classifier.classify(text)
+            if not job_type:
+                item['outcome'] = 'non_job'
+                continue
+            item['job_type'] = job_type
+            item['keywords'] = keywords
+            
+            # Same job already seen in another group? The copy is stored
+            # under its cluster and skips verification, CSV and auto-apply.
+            # A new cluster stays pending until persist stores its message
+            with stage('near_duplicate'):
+                item['cluster'] = self.near_duplicates.assign(item['message_id'], text)
+            if item['cluster']['is_duplicate']:
+                item['outcome'] = 'cross_post'
+                continue
+            
+            # Verify job and extract company info
+            with stage('verify'):
+                item['verification'] = self.job_verifier.verify_and_extract(text)
+            
+            # Application links are extracted once here and stored in
+            # application_links, so auto_apply.py never rescans bodies
+            with stage('extract_links'):
+                item['application_links'] = self.link_extractor.extract_links_from_message(text)
+        return items
+    
+    def _write_csv(self, rows):
+        with metrics.timer('fetcher_csv_append_seconds', 'CSVHandler.write_messages time per batch'), \
+                stage('csv_append'):
+            return self.csv_handler.write_messages(rows)
+    
+    async def _persist_batch(self, items):
+        """
+        Persist stage (on the loop, one worker): re-posts against the content
+        index, then one DB transaction and one CSV append for the whole
+        batch (cross-posts were found in the enrich stage)
+        
+        The indexes and group counts only change once the transaction has
+        committed; if it fails, the batch's messages are left unprocessed and
+        marked failed, so the checkpoint stays below them and the next fetch
+        reads them again.
+        """
+        rows = []
+        csv_rows = []
+        reposts = []
+        processed = []  # message ids, added to processed_messages once stored
+        jobs = []  # (group, message_data, counted) of new job messages
+        unclustered = []  # message ids whose new cluster will not be stored
+        copies = []  # (group, counted, kind) of re-posts and cross-posts
+        batch_hashes = {}  # content_hash -> message_id of this batch, not yet in content_index
+        
+        for item in items:
+            group = item['group']
+            activity = group['activity']
+            message = item['message']
+            message_id = item['message_id']
+            counted = item['counted']
+            
+            if item.get('outcome') == 'non_job':
+                metrics.counter('fetcher_non_job_skipped_total', 'Messages classified as non-job').inc()
+                activity['non_jobs'] += counted
+                continue
+            
+            # Exact re-post of a stored message (the index may have grown
+            # since the filter stage, or earlier in this batch): record it
+            # and skip the rest
+            original_id = batch_hashes.get(item['content_hash']) or self.content_index.get(item['content_hash'])
+            if original_id is not None:
+                reposts.append((message_id, original_id, group['group_name'], message.date.isoformat()))
+                processed.append(message_id)
+                copies.append((group, counted, 'repost'))
+                unclustered.append(message_id)
+                logger.debug(f"Re-post of {original_id} in {group['group_name']}, skipped")
+                continue
+            
+            # Skip if not a job message
+            if not item.get('job_type'):
+                metrics.counter('fetcher_non_job_skipped_total', 'Messages classified as non-job').inc()
+                activity['non_jobs'] += counted
+                continue
+            
+            message_data = {
+                'message_id': message_id,
+                'group_name': group['group_name'],
+                'group_link': group['group_link'],
+                'sender': message.sender_id if message.sender_id else 'Unknown',
+                'date': message.date.isoformat(),
+                'message_text': message.text,
+                'job_type': item['job_type'],
+                'keywords_found': ','.join(item['keywords']),
+                'account_used': group['account_name'],
+                'content_hash': item['content_hash'],
+                **item['cluster'],
+            }
+            batch_hashes[item['content_hash']] = message_id
+            
+            if item.get('outcome') == 'cross_post':
+                rows.append(message_data)
+                processed.append(message_id)
+                copies.append((group, counted, 'cross_post'))
+                logger.debug(f"Cross-post of {message_data['cluster_id']} in {group['group_name']}, skipped")
+                continue
+            
+            # Add verification and company info if available
+            verification_result = item['verification']
+            if verification_result:
+                # Empty verifier fields (e.g. job_type '') must not
+                # overwrite the classifier's values
+                message_data.update({
+                    key: value for key, value in verification_result.items()
+                    if value or key not in message_data
+                })
+                logger.debug(f"Job verified: {verification_result['is_verified']}, "
+                           f"Score: {verification_result['verification_score']:.2f}%, "
+                           f"Company: {verification_result['company_name']}")
+            message_data['application_links'] = item['application_links']
+            
+            rows.append(message_data)
+            csv_rows.append(message_data)
+            processed.append(message_id)
+            jobs.append((group, message_data, counted))
+        
+        # Save to database (will go to category-specific tables too) with safe locking
+        if (rows or reposts) and not await self._safe_db_write(self.db.insert_messages, rows, reposts):
+            logger.warning(f"⚠️  Database write failed for {len(rows)} message(s) after retries")
+            self._ingest_failed('persist', items)
+            return []
+        self.near_duplicates.rollback(unclustered)
+        self.near_duplicates.commit(processed)
+        
+        # Stored: only now are the messages processed
+        self.processed_messages.update(processed)
+        self.content_index.update(batch_hashes)
+        for group, message_data, counted in jobs:
+            group['messages'].append(message_data)
+            group['new_messages'] += 1
+            group['activity']['jobs'] += counted
+            metrics.counter('fetcher_job_messages_total', 'Job messages stored').inc()
+            logger.info(f"Fetched job message: {message_data['job_type']} from {group['group_name']}")
+        for group, counted, kind in copies:
+            group['activity']['duplicates'] += counted
+            if kind == 'repost':
+                metrics.counter('fetcher_reposts_total', 'Exact re-posts of stored messages skipped').inc()
+            else:
+                group['cross_posts'] += 1
+                metrics.counter('fetcher_near_duplicates_total', 'Cross-posted job copies skipped').inc()
+        
+        # CSV copy of what the database now holds
+        if csv_rows:
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._ingest_pool, self._write_csv, csv_rows)
+            except Exception as csv_error:
+                logger.error(f"❌ CSV write error for {len(csv_rows)} message(s): {csv_error}")
+        return []
+    
+    async def process_groups(self, groups_data, cycle_id=None):
+        """
+        Process list of groups with optimized speed
+        
+        cycle_id: fetch cycle to checkpoint each finished group under
+        """
         logger.info(f"Starting to process {len(groups_data)} groups...")
         
         start_time = datetime.now()
@@ -603,11 +917,15 @@ class TelegramJobFetcher:
         total_messages = 0
         
         for i, group in enumerate(groups_data):
+            if self.is_shutting_down or self._lease_lost:
+                logger.info(f"Stopping after {i}/{len(groups_data)} groups")
+                break
+            
             try:
                 # Check if within working hours
                 if not self._is_working_hours():
                     logger.info("Outside working hours. Pausing...")
-                    await asyncio.sleep(1800)  # Wait 30 minutes
+                    await self._sleep_unless_shutdown(1800)  # Wait 30 minutes
                     continue
                 
                 group_link = group.get('link')
@@ -620,7 +938,7 @@ class TelegramJobFetcher:
                 
                 if not client_info:
                     logger.warning("No available clients. Waiting before retry...")
-                    await asyncio.sleep(3600)  # Wait 1 hour
+                    await self._sleep_unless_shutdown(3600)  # Wait 1 hour
                     client_info = self._get_next_client()
                     if not client_info:
                         logger.error("Still no available clients. Stopping...")
@@ -631,10 +949,12 @@ class TelegramJobFetcher:
                     success = await self.join_group(group_link, client_info)
                     if not success:
                         logger.info(f"⏭️  Skipped joining {group.get('name', 'Unknown')} [{i+1}/{len(groups_data)}]")
+                        await self._complete_group(group_link, cycle_id)
                         continue
                 
                 # Fetch messages
                 messages = await self.fetch_messages(group_link, client_info)
+                await self._complete_group(group_link, cycle_id)
                 
                 if messages:
                     groups_with_messages += 1
@@ -663,6 +983,56 @@ class TelegramJobFetcher:
         total_time = (datetime.now() - start_time).total_seconds() / 60
         logger.info(f"✅ Completed! Processed {len(groups_data)} groups in {total_time:.1f} minutes. "
                    f"Found {total_messages} messages from {groups_with_messages} groups.")
+        self._log_prefilter_report()
+        self._log_pattern_report()
+    
+    def _log_prefilter_report(self):
+        """Log (and export) the prefilter reject rate and CPU saved since the last report"""
+        report = self.classifier.prefilter_report()
+        if not report['checked']:
+            return
+        
+        metrics.gauge('classifier_prefilter_reject_ratio', 'Share of texts rejected by the prefilter, last cycle').set(
+            round(report['reject_rate'], 4))
+        saved = 'not measured yet'
+        if report['saved_seconds'] is not None:
+            metrics.gauge('classifier_prefilter_saved_seconds', 'Estimated classification CPU saved, last cycle').set(
+                round(report['saved_seconds'], 4))
+            saved = f"~{1000 * report['saved_seconds']:.1f}ms CPU saved"
+        reasons = ', '.join(f"{reason} {count}" for reason, count in report['by_reason'].items() if count)
+        logger.info(f"🧹 Prefilter rejected {report['rejected']}/{report['checked']} texts "
+                    f"({100 * report['reject_rate']:.1f}%: {reasons or '-'}), {saved} "
+                    f"(prefilter {1000 * report['prefilter_seconds']:.1f}ms, "
+                    f"{report['false_rejects']}/{report['audited']} audited rejects were jobs)")
+    
+    def _log_pattern_report(self, top=3):
+        """Log (and export) regex match time since the last report, with the slowest patterns"""
+        stats = patterns.stats(reset=True)
+        total = sum(row['seconds'] for row in stats)
+        if not total:
+            return
+        
+        metrics.gauge('regex_match_seconds', 'Time in shared registry regexes, last cycle').set(round(total, 4))
+        slowest = ', '.join(
+            f"{row['names'][0]} {1000 * row['seconds']:.1f}ms ({row['calls']} calls, {100 * row['hit_rate']:.0f}% hit)"
+            for row in stats[:top] if row['calls'])
+        logger.info(f"🔎 Regex matching took {1000 * total:.1f}ms; slowest: {slowest}")
+    
+    async def _complete_group(self, group_link, cycle_id):
+        """Checkpoint a group as done for the cycle (not when the fetch was cut short by shutdown)"""
+        if cycle_id is None or self.is_shutting_down:
+            return
+        if await self._safe_db_write(self.db.save_group_checkpoint, group_link, cycle_id=cycle_id):
+            self.checkpoints.setdefault(group_link, {'last_message_id': 0, 'account_name': None})['cycle_id'] = cycle_id
+    
+    async def _sleep_unless_shutdown(self, seconds):
+        """asyncio.sleep that returns early once shutdown is requested"""
+        deadline = time.monotonic() + seconds
+        while not self.is_shutting_down:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, 1.0))
     
     async def run_continuous(self, duration_days=30):
         """Run the fetcher continuously for specified days"""
@@ -679,16 +1049,18 @@ class TelegramJobFetcher:
         
         check_interval = RATE_LIMITS.get('check_interval', 3600)
         
-        while datetime.now() < end_time:
+        while datetime.now() < end_time and not self.is_shutting_down:
             try:
-                logger.info("Starting new fetch cycle...")
+                await self.run_cycle(groups_data)
+                if self.is_shutting_down:
+                    break
                 
-                # Process all groups
-                await self.process_groups(groups_data)
+                # Backup / checkpoint / compaction when due (blocking sqlite work, off the loop)
+                await asyncio.get_running_loop().run_in_executor(None, run_database_maintenance)
                 
                 # Wait before next cycle
                 logger.info(f"Fetch cycle complete. Waiting {check_interval} seconds before next cycle...")
-                await asyncio.sleep(check_interval)
+                await self._sleep_unless_shutdown(check_interval)
                 
             except Exception as e:
                 logger.error(f"Error in continuous run: {e}")
@@ -696,6 +1068,182 @@ class TelegramJobFetcher:
         
         logger.info("Continuous run completed!")
     
+    async def run_cycle(self, groups_data):
+        """
+        Run a single fetch cycle over all groups and write its metrics
+        
+        Progress is checkpointed per group, so a cycle interrupted by a
+        crash or shutdown is resumed by the next call instead of starting
+        over at the first group.
+        """
+        cycle_id, done = self._open_cycle(groups_data)
+        
+        # Process all groups (not yet done in this cycle)
+        groups = [group for group in self._schedule_groups(groups_data) if group.get('link') not in done]
+        await self.process_groups(groups, cycle_id)
+        
+        if self.is_shutting_down:
+            finished = sum(1 for cp in self.checkpoints.values() if cp.get('cycle_id') == cycle_id)
+            logger.info(f"🛑 Shutdown: cycle {cycle_id} checkpointed with {finished}/{len(groups_data)} groups done")
+        elif cycle_id is not None:
+            await self._safe_db_write(self.db.finish_fetch_cycle, cycle_id)
+        self.dump_metrics()
+    
+    def _open_cycle(self, groups_data):
+        """
+        The fetch cycle to run: the interrupted one if it stopped less than
+        resume_max_age_hours ago, else a new one
+        
+        Returns: (cycle_id, links already done in it)
+        """
+        cycle = self.db.get_open_fetch_cycle()
+        if cycle is not None:
+            stopped_for = time.time() - cycle['updated_at']
+            if stopped_for <= RUNTIME.get('resume_max_age_hours', 24) * 3600:
+                done = {link for link, cp in self.checkpoints.items() if cp.get('cycle_id') == cycle['cycle_id']}
+                metrics.gauge('fetcher_resume_gap_seconds',
+                              'Time between the last checkpoint of an interrupted cycle and its resume').set(stopped_for)
+                logger.info(f"⏯️  Resuming fetch cycle {cycle['cycle_id']} at {len(done)}/{cycle['groups_total']} "
+                            f"groups (time to resume: {stopped_for:.1f}s since the last checkpoint)")
+                return cycle['cycle_id'], done
+            logger.info(f"Interrupted fetch cycle {cycle['cycle_id']} is {stopped_for / 3600:.1f}h old, starting over")
+        
+        logger.info("Starting new fetch cycle...")
+        return self.db.start_fetch_cycle(len(groups_data)), set()
+    
+    async def run_sharded(self, worker_id, duration_days=30):
+        """
+        Fetch as one of several workers sharing data.json through shard leases
+        
+        Groups are split into SHARDING['num_shards'] shards by a stable hash
+        of their link. The worker repeatedly leases the shard fetched longest
+        ago (and not within check_interval), fetches its groups and releases
+        it. A heartbeat keeps the lease alive; a worker that crashes simply
+        stops renewing, and once the lease expires another worker takes the
+        shard over. Maintenance is left to the writer process.
+        """
+        logger.info(f"Worker {worker_id} starting sharded run for {duration_days} days...")
+        
+        end_time = datetime.now() + timedelta(days=duration_days)
+        with open(PATHS['groups_json'], 'r', encoding='utf-8') as f:
+            groups_data = json.load(f)
+        
+        num_shards = SHARDING['num_shards']
+        check_interval = RATE_LIMITS.get('check_interval', 3600)
+        self.metrics_file = f"fetcher_metrics_{re.sub(r'[^A-Za-z0-9_.-]', '_', worker_id)}.json"
+        loop = asyncio.get_running_loop()
+        
+        while datetime.now() < end_time and not self.is_shutting_down:
+            try:
+                lease = await loop.run_in_executor(None, self.db.claim_shard, worker_id,
+                                                   SHARDING['lease_seconds'], check_interval)
+                if lease is None:
+                    logger.debug(f"No shard due, waiting {SHARDING['idle_poll_seconds']}s...")
+                    await asyncio.sleep(SHARDING['idle_poll_seconds'])
+                    continue
+                
+                shard = lease['shard']
+                shard_groups = [group for group in groups_data
+                                if shard_of(group.get('link') or '', num_shards) == shard]
+                logger.info(f"🔒 Worker {worker_id} leased shard {shard} ({len(shard_groups)} groups)")
+                
+                # Other workers stored messages since the last shard
+                self._load_tracking_data()
+                self.near_duplicates = NearDuplicateDetector(self.db)
+                
+                completed = await self._run_leased_shard(worker_id, shard, shard_groups, lease['runs'] + 1)
+                await loop.run_in_executor(None, self.db.release_shard, shard, worker_id, completed)
+                self.dump_metrics()
+                
+            except Exception as e:
+                logger.error(f"Error in sharded run: {e}")
+                await asyncio.sleep(SHARDING['idle_poll_seconds'])
+        
+        logger.info(f"Worker {worker_id} finished")
+    
+    async def _run_leased_shard(self, worker_id, shard, shard_groups, cycle):
+        """Fetch one leased shard while a heartbeat renews the lease; True if it completed"""
+        loop = asyncio.get_running_loop()
+        self._lease_lost = False
+        
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(SHARDING['heartbeat_seconds'])
+                try:
+                    renewed = await loop.run_in_executor(None, self.db.renew_lease, shard, worker_id,
+                                                         SHARDING['lease_seconds'])
+                except Exception as e:
+                    # Writer unreachable or database busy: keep going, the
+                    # next renewal decides once it is back
+                    logger.warning(f"Could not renew lease on shard {shard}: {e}")
+                    continue
+                if not renewed:
+                    logger.warning(f"⚠️  Lease on shard {shard} lost, stopping it")
+                    self._lease_lost = True
+                    return
+        
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            await self.process_groups(self._schedule_groups(shard_groups, cycle))
+        finally:
+            heartbeat_task.cancel()
+        return not (self._lease_lost or self.is_shutting_down)
+    
+    def _schedule_groups(self, groups_data, cycle=None):
+        """
+        Order the groups for this cycle
+        
+        Groups that have been fetched repeatedly without a single job
+        (group_trends 'dead') go last, and only every
+        dead_fetch_every_n_cycles-th cycle; the rest keep their order.
+        cycle: cycle number to use instead of this process's own count
+        """
+        self.cycle_count += 1
+        cycle = self.cycle_count if cycle is None else cycle
+        if not GROUP_TRENDS['enabled']:
+            return groups_data
+        
+        since_hour = current_hour() - GROUP_TRENDS['window_days'] * 24
+        dead = dead_groups(self.db.get_group_activity(since_hour))
+        metrics.gauge('fetcher_dead_groups', 'Groups scored dead by the activity trends').set(len(dead))
+        if not dead:
+            return groups_data
+        
+        active = [group for group in groups_data if group.get('link') not in dead]
+        if cycle % GROUP_TRENDS['dead_fetch_every_n_cycles'] == 0:
+            logger.info(f"Fetching {len(groups_data) - len(active)} dead groups last this cycle")
+            return active + [group for group in groups_data if group.get('link') in dead]
+        logger.info(f"Skipping {len(groups_data) - len(active)} dead groups this cycle")
+        return active
+    
+    def use_offline_client(self, fake_client):
+        """
+        Swap in a FakeTelegramClient instead of real accounts
+        
+        All of its groups are treated as already joined, so a cycle goes
+        straight to fetching and never hits the daily join limit.
+        """
+        account = {'name': 'offline', 'phone': '', 'session_name': 'offline'}
+        self.clients = [{
+            'client': fake_client,
+            'account': account,
+            'last_action': None,
+            'groups_joined_today': 0,
+            'messages_fetched_today': 0,
+            'reconnect_attempts': 0
+        }]
+        self.current_account_index = 0
+        for group in fake_client.groups_data():
+            self.joined_groups[group['link']] = {'name': group['name'], 'account': account['name']}
+    
+    def dump_metrics(self):
+        """Write the metrics snapshot for this cycle (read by the dashboard /metrics)"""
+        try:
+            path = metrics.dump_json(os.path.join(PATHS['metrics'], self.metrics_file))
+            logger.info(f"📈 Cycle metrics written to {path}")
+        except Exception as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+    
     async def close_clients(self):
         """Close all client connections gracefully"""
         logger.info("Closing all client connections...")
@@ -737,5 +1285,7 @@ class TelegramJobFetcher:
                 except (asyncio.CancelledError, asyncio.TimeoutError):
                     pass
         
+        self._ingest_pool.shutdown(wait=True)
+        
         logger.info("✅ All clients disconnected successfully")
 
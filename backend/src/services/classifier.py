@@ -1,18 +1,51 @@
 """
 Message classifier to categorize job types
+
+classify() only tags a message when it contains one of JOB_INDICATORS, so
+prefilter() runs that check first - one compiled alternation instead of a
+substring test per indicator - after the length and shape rules of
+is_job_message(): very short texts are dropped, and short ones must carry
+contact or apply details. fetch_messages sends only the texts it passes on
+to hashing, classification and verification.
+
+Every PREFILTER['audit_every']-th rejected text is hashed and classified
+anyway: that measures the time each rejection saves and counts rejections
+classify() would have tagged (possible only through the length / shape
+rules). prefilter_report() summarizes both per fetch cycle. The counts
+are kept under a lock: the ingest filter stage may call prefilter() from
+several pool threads.
 """
 import re
 import sys
 import os
+import threading
+import time
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from config.settings import JOB_KEYWORDS
+from config.settings import JOB_KEYWORDS, PREFILTER
+from src.services.near_duplicate import content_hash
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger('classifier')
 
+JOB_INDICATORS = [
+    'hiring', 'job', 'position', 'vacancy', 'opening', 
+    'opportunity', 'recruit', 'career', 'apply', 'join our team',
+    'developer', 'engineer', 'analyst', 'manager', 'designer',
+    'architect', 'consultant', 'specialist', 'lead', 'senior',
+    'junior', 'intern', 'trainee', 'looking for', 'we are looking',
+    'join us', 'join our', 'work with us', 'roles available'
+]
+
+# Plain substring semantics, like `indicator in text_lower`
+JOB_INDICATOR_RE = re.compile('|'.join(re.escape(indicator) for indicator in JOB_INDICATORS))
+
+# Contact details, as in is_job_message()
+CONTACT_RE = re.compile(r'(\+?\d{10,13}|email|apply|contact|@)')
+
 class MessageClassifier:
     """Classify messages into tech, non-tech, and freelance jobs"""
     
@@ -22,7 +55,107 @@ class MessageClassifier:
         self.freelance_keywords = [kw.lower() for kw in JOB_KEYWORDS['freelance']]
         # Optional category for entry-level roles
         self.fresher_keywords = [kw.lower() for kw in JOB_KEYWORDS.get('fresher', [])]
+        self._prefilter_passed = metrics.counter('classifier_prefilter_passed_total',
+                                                 'Texts passed on to classification')
+        self._prefilter_rejected = metrics.counter('classifier_prefilter_rejected_total',
+                                                   'Texts rejected before classification')
+        self._prefilter_lock = threading.Lock()
+        self._reset_prefilter_stats()
+    
+    def _reset_prefilter_stats(self):
+        self.prefilter_stats = {
+            'checked': 0,
+            'rejected': {'empty': 0, 'too_short': 0, 'no_contact': 0, 'no_indicator': 0},
+            'seconds': 0.0,  # Spent in prefilter()
+            'audited': 0,
+            'audit_seconds': 0.0,  # Hash + classify time of the audited rejections
+            'false_rejects': 0,
+        }
+    
+    def prefilter(self, message_text):
+        """
+        Cheap check whether a message can be a job post at all
+        
+        Returns: True for candidates (to be classified), False for rejected texts
+        """
+        if not PREFILTER['enabled']:
+            return True
+        
+        started = time.perf_counter()
+        reason = None
+        if not message_text or not isinstance(message_text, str):
+            reason = 'empty'
+        else:
+            # Split no further than needed to tell the length class
+            words = len(message_text.split(None, max(PREFILTER['min_words'], PREFILTER['short_words'])))
+            text_lower = message_text.lower()
+            if words < PREFILTER['min_words']:
+                reason = 'too_short'
+            elif words <= PREFILTER['short_words'] and not CONTACT_RE.search(text_lower):
+                reason = 'no_contact'
+            elif not JOB_INDICATOR_RE.search(text_lower):
+                reason = 'no_indicator'
+        
+        elapsed = time.perf_counter() - started
+        with self._prefilter_lock:
+            stats = self.prefilter_stats
+            stats['checked'] += 1
+            stats['seconds'] += elapsed
+            if reason is not None:
+                stats['rejected'][reason] += 1
+                rejected = sum(stats['rejected'].values())
+        if reason is None:
+            self._prefilter_passed.inc()
+            return True
+        
+        self._prefilter_rejected.inc()
+        
+        if reason != 'empty' and PREFILTER['audit_every'] and rejected % PREFILTER['audit_every'] == 0:
+            started = time.perf_counter()
+            content_hash(message_text)
+            job_type, _ = self._classify(message_text)
+            elapsed = time.perf_counter() - started
+            with self._prefilter_lock:
+                stats = self.prefilter_stats
+                stats['audit_seconds'] += elapsed
+                stats['audited'] += 1
+                if job_type:
+                    stats['false_rejects'] += 1
+            if job_type:
+                logger.debug(f"Prefilter rejected ({reason}) a {job_type} message")
+        return False
     
+    def prefilter_report(self, reset=True):
+        """
+        Prefilter totals since the last reset
+        
+        Returns: dict with checked, rejected, reject_rate, by_reason,
+        prefilter_seconds, saved_seconds (estimated from the audits, net of
+        the prefilter's own time), audited and false_rejects
+        """
+        with self._prefilter_lock:
+            stats = self.prefilter_stats
+            if reset:
+                self._reset_prefilter_stats()
+            else:
+                stats = dict(stats, rejected=dict(stats['rejected']))
+        rejected = sum(stats['rejected'].values())
+        saved = None
+        if stats['audited']:
+            saved = rejected * stats['audit_seconds'] / stats['audited'] - stats['seconds']
+        report = {
+            'checked': stats['checked'],
+            'rejected': rejected,
+            'reject_rate': rejected / stats['checked'] if stats['checked'] else 0.0,
+            'by_reason': dict(stats['rejected']),
+            'prefilter_seconds': stats['seconds'],
+            'saved_seconds': saved,
+            'audited': stats['audited'],
+            'false_rejects': stats['false_rejects'],
+        }
+        return report
+    
+    @metrics.timed('classifier_classify_seconds', 'MessageClassifier.classify latency')
     def classify(self, message_text):
         """
         Classify a message and return job type and found keywords
@@ -30,6 +163,9 @@ class MessageClassifier:
         Returns:
             tuple: (job_type, keywords_found)
         """
+        return self._classify(message_text)
+    
+    def _classify(self, message_text):
         if not message_text or not isinstance(message_text, str):
             return None, []
         
@@ -37,18 +173,7 @@ class MessageClassifier:
         text_lower = message_text.lower()
         
         # Check if it's a job posting
-        job_indicators = [
-            'hiring', 'job', 'position', 'vacancy', 'opening', 
-            'opportunity', 'recruit', 'career', 'apply', 'join our team',
-            'developer', 'engineer', 'analyst', 'manager', 'designer',
-            'architect', 'consultant', 'specialist', 'lead', 'senior',
-            'junior', 'intern', 'trainee', 'looking for', 'we are looking',
-            'join us', 'join our', 'work with us', 'roles available'
-        ]
-        
-        has_job_indicator = any(indicator in text_lower for indicator in job_indicators)
-        
-        if not has_job_indicator:
+        if not JOB_INDICATOR_RE.search(text_lower):
             return None, []
         
         # Find matching keywords
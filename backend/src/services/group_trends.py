@@ -0,0 +1,159 @@
+"""
+Per-group activity trends and anomaly scores
+
+The fetcher adds every fetch of a group to an hourly bucket in
+group_activity: fetches, new job posts, new non-job posts and duplicates
+(cross-posts and reposts). Here the buckets are folded into daily series -
+day 0 is the last 24 hours, day 1 the 24 hours before, ... - and each group
+is scored against its own history:
+
+    ewma, ewm_std   exponentially weighted mean / deviation of daily jobs
+                    over the days before day 0 (days without a fetch skipped)
+    z               (jobs on day 0 - ewma) / ewm_std
+    spam_z          the same for non-job posts + duplicates
+    status          'dead'   watched for at least dead_after_days days and fetched
+                             dead_min_fetches times over them without a job
+                    'drop' / 'spike'   z beyond -/+ z_threshold
+                    'spam'  spam_z beyond z_threshold
+                    'new'   fewer than two days of history
+                    'ok'
+
+The scheduler fetches dead groups less often (dead_groups()), the dashboard
+lists the scores at /api/group_anomalies.
+"""
+import math
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import GROUP_TRENDS
+
+# Deviation floor, so a group that always posts the same number of jobs does
+# not score a huge z on its first change by one
+MIN_STD = 1.0
+
+
+def current_hour(timestamp=None):
+    """Bucket key of a unix timestamp (default: now)"""
+    return int((time.time() if timestamp is None else timestamp) // 3600)
+
+
+def daily_series(rows, days, now_hour=None):
+    """
+    Fold hourly rows into daily counters
+
+    rows: (group_link, hour, fetches, jobs, non_jobs, duplicates) tuples
+
+    Returns: {group_link: [day dicts, oldest first]}, the last entry is the
+    last 24 hours
+    """
+    now_hour = current_hour() if now_hour is None else now_hour
+    series = {}
+    for group_link, hour, fetches, jobs, non_jobs, duplicates in rows:
+        age = (now_hour - hour) // 24
+        if age < 0 or age >= days:
+            continue
+        group_days = series.get(group_link)
+        if group_days is None:
+            group_days = series[group_link] = [{'fetches': 0, 'jobs': 0, 'non_jobs': 0, 'duplicates': 0}
+                                               for _ in range(days)]
+        day = group_days[days - 1 - age]
+        day['fetches'] += fetches
+        day['jobs'] += jobs
+        day['non_jobs'] += non_jobs
+        day['duplicates'] += duplicates
+    return series
+
+
+def ewma_stats(values, alpha):
+    """
+    Exponentially weighted mean and standard deviation
+
+    Returns: (mean, std), (None, None) for an empty list
+    """
+    if not values:
+        return None, None
+    mean = float(values[0])
+    var = 0.0
+    for value in values[1:]:
+        diff = value - mean
+        increment = alpha * diff
+        mean += increment
+        var = (1 - alpha) * (var + diff * increment)
+    return mean, math.sqrt(var)
+
+
+def _z(value, mean, std):
+    return round((value - mean) / max(std, MIN_STD), 2)
+
+
+def score_group(days, config=GROUP_TRENDS):
+    """
+    Score one group's daily series (see daily_series)
+
+    Returns: dict with status, z, spam_z, ewma, ewm_std and the counters of
+    the last 24 hours
+    """
+    today = days[-1]
+    history = [day for day in days[:-1] if day['fetches']]
+    recent = days[-config['dead_after_days']:]
+
+    result = {
+        'jobs_24h': today['jobs'],
+        'non_jobs_24h': today['non_jobs'],
+        'duplicates_24h': today['duplicates'],
+        'fetches_24h': today['fetches'],
+        'ewma': None,
+        'ewm_std': None,
+        'z': None,
+        'spam_z': None,
+        'daily_jobs': [day['jobs'] for day in days],
+        'status': 'ok',
+    }
+
+    # Dead only once the group has been watched for the whole dead window
+    watched_since = next(i for i, day in enumerate(days) if day['fetches'])
+    if (watched_since <= len(days) - config['dead_after_days']
+            and sum(day['fetches'] for day in recent) >= config['dead_min_fetches']
+            and not any(day['jobs'] for day in recent)):
+        result['status'] = 'dead'
+        return result
+
+    if len(history) < 2 or not today['fetches']:
+        result['status'] = 'new' if len(history) < 2 else 'ok'
+        return result
+
+    alpha = config['ewma_alpha']
+    mean, std = ewma_stats([day['jobs'] for day in history], alpha)
+    spam_mean, spam_std = ewma_stats([day['non_jobs'] + day['duplicates'] for day in history], alpha)
+    result['ewma'] = round(mean, 2)
+    result['ewm_std'] = round(std, 2)
+    result['z'] = _z(today['jobs'], mean, std)
+    result['spam_z'] = _z(today['non_jobs'] + today['duplicates'], spam_mean, spam_std)
+
+    threshold = config['z_threshold']
+    if result['z'] <= -threshold:
+        result['status'] = 'drop'
+    elif result['z'] >= threshold:
+        result['status'] = 'spike'
+    elif result['spam_z'] >= threshold:
+        result['status'] = 'spam'
+    return result
+
+
+def score_groups(rows, now_hour=None, config=GROUP_TRENDS):
+    """
+    Score every group with activity in the window
+
+    Returns: {group_link: score dict}
+    """
+    series = daily_series(rows, config['window_days'], now_hour)
+    return {group_link: score_group(days, config) for group_link, days in series.items()}
+
+
+def dead_groups(rows, now_hour=None, config=GROUP_TRENDS):
+    """Links of the groups scored 'dead'"""
+    return {link for link, score in score_groups(rows, now_hour, config).items() if score['status'] == 'dead'}
@@ -1,53 +1,27 @@
 """
 Job Quality Scorer - Scores jobs based on completeness and quality
+
+Use the shared instance (`from src.services.job_scorer import scorer`): its
+patterns are compiled once and score_job() is memoized per message text.
 """
 import re
 
+from src.utils.memo import LRUCache, text_key
+from src.utils.patterns import patterns
+
+CACHE_SIZE = 4096  # Memoized score_job() results
+
 class JobQualityScorer:
-    """Score jobs based on presence of important information"""
+    """Score jobs based on presence of important information (thread-safe)"""
     
-    def __init__(self):
-        # Common company patterns
-        self.company_patterns = [
-            r'\b(company|organization|firm|startup|corp|inc|ltd|pvt|limited)\b',
-            r'\b([A-Z][a-z]+\s+(?:Technologies|Solutions|Systems|Software|Labs|Studios|Digital|Group|Services))\b',
-            r'(?:^|\n)([A-Z][A-Z\s&]+(?:Technologies|Solutions|Systems|Software|Labs|Studios|Digital|Group|Services))',
-        ]
-        
-        # Salary patterns
-        self.salary_patterns = [
-            r'\b\d+[\s-]*(?:lpa|lakh|lakhs|k|thousand)\b',
-            r'(?:₹|rs\.?|inr)\s*\d+',
-            r'\$\s*\d+',
-            r'\b(?:salary|ctc|package|stipend)[\s:]*(?:₹|rs\.?|inr|\$)?\s*\d+',
-            r'\b\d+[\s-]*(?:to|-)[\s-]*\d+[\s-]*(?:lpa|lakh|lakhs|k)\b',
-        ]
-        
-        # Location patterns
-        self.location_patterns = [
-            r'\b(bangalore|bengaluru|mumbai|delhi|ncr|pune|hyderabad|chennai|kolkata|ahmedabad|gurgaon|gurugram|noida|jaipur|lucknow|chandigarh|kochi|thiruvananthapuram|indore|bhopal|nagpur|surat|vadodara|rajkot)\b',
-            r'\b(india|usa|uk|singapore|dubai|uae|canada|australia|germany|netherlands|europe)\b',
-            r'(?:location|based in|office in)[\s:]*([a-z\s,]+)',
-        ]
-        
-        # Remote/WFH patterns
-        self.remote_patterns = [
-            r'\b(remote|wfh|work from home|work-from-home|hybrid)\b',
-        ]
-        
-        # Skills patterns (technical and non-technical)
-        self.skill_patterns = [
-            r'\b(python|java|javascript|react|node|angular|vue|django|flask|spring|aws|azure|gcp|docker|kubernetes|sql|mongodb|postgresql|mysql|redis|kafka|spark|hadoop)\b',
-            r'\b(html|css|typescript|golang|rust|ruby|php|swift|kotlin|scala|c\+\+|\.net|laravel)\b',
-            r'\b(communication|leadership|management|sales|marketing|design|content|seo|digital marketing|social media|customer service|hr|finance|accounting|operations)\b',
-            r'(?:skills?|technologies?|experience in|proficiency in)[\s:]*([a-z,\s&/]+)',
-        ]
-        
-        # Apply link patterns (URLs only, not emails)
-        self.apply_link_patterns = [
-            r'(https?://\S+)',
-            r'(www\.\S+\.[a-z]{2,})',
-        ]
+    def __init__(self, cache_size=CACHE_SIZE):
+        # Compiled once in the shared registry (all case-insensitive)
+        self.company_patterns = patterns.group('scorer.company')
+        self.salary_patterns = patterns.group('scorer.salary')
+        self.location_patterns = patterns.group('scorer.location')
+        self.remote_patterns = patterns.group('scorer.remote')
+        self.skill_patterns = patterns.group('scorer.skills')
+        self.apply_link_patterns = patterns.group('scorer.apply_link')  # URLs only, not emails
         
         # Countries outside India
         self.international_locations = [
@@ -73,6 +47,10 @@ class JobQualityScorer:
             'turks and caicos', 'aruba', 'curacao', 'bonaire', 'sint maarten',
             'saba', 'sint eustatius', 'greenland', 'faroe islands'
         ]
+        
+        self._international_re = patterns.register(
+            'scorer.international', '|'.join(re.escape(loc) for loc in self.international_locations))
+        self.cache = LRUCache(cache_size)
     
     def score_job(self, message_text):
         """
@@ -98,6 +76,14 @@ class JobQualityScorer:
         if not message_text:
             return self._empty_score()
         
+        # Cached results are shared: hand out copies
+        key = text_key(message_text)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.cache.put(key, self._score_job(message_text))
+        return dict(result)
+    
+    def _score_job(self, message_text):
         text_lower = message_text.lower()
         
         score = 0
@@ -133,7 +119,7 @@ class JobQualityScorer:
         
         # Check for apply link - URL only, not email (20 points)
         apply_link = self._find_first_match(message_text, self.apply_link_patterns)
-        if apply_link and not re.search(r'@', apply_link):
+        if apply_link and '@' not in apply_link:
             result['has_apply_link'] = True
             result['apply_link'] = apply_link.strip()
             score += 20
@@ -146,9 +132,7 @@ class JobQualityScorer:
             score += 15
             
             # Check if international
-            result['is_international'] = any(
-                loc in text_lower for loc in self.international_locations
-            )
+            result['is_international'] = self._international_re.search(text_lower) is not None
         
         # Check for skills (15 points)
         skills_match = self._find_first_match(text_lower, self.skill_patterns)
@@ -174,7 +158,7 @@ class JobQualityScorer:
     def _find_first_match(self, text, patterns):
         """Find first matching pattern in text"""
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 # Return the matched group or full match
                 return match.group(1) if match.groups() else match.group(0)
@@ -202,3 +186,6 @@ class JobQualityScorer:
         """Check if job qualifies as 'best job' (score >= 60)"""
         return score_result['total_score'] >= 60
 
+
+# Shared instance for the dashboard routes
+scorer = JobQualityScorer()
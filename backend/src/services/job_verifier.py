@@ -1,7 +1,6 @@
 """
 Job verification and company information extraction
 """
-import re
 import sys
 import os
 
@@ -9,6 +8,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+from src.utils.patterns import patterns
 from config.settings import JOB_VERIFICATION, MIN_JOB_DESCRIPTION_LENGTH
 
 logger = get_logger('job_verifier')
@@ -17,45 +18,13 @@ class JobVerifier:
     """Verify job postings and extract company information"""
     
     def __init__(self):
-        # Company name patterns
-        self.company_patterns = [
-            r'(?:company|firm|organization|org)[\s:]+([A-Z][A-Za-z0-9\s&\.]+)',
-            r'([A-Z][A-Za-z0-9\s&\.]+)(?:\s+is\s+hiring|\s+hiring|\s+looking for)',
-            r'(?:join|at|@)\s+([A-Z][A-Za-z0-9\s&\.]+)',
-        ]
-        
-        # Website patterns
-        self.website_patterns = [
-            r'(https?://(?:www\.)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,})',
-            r'(?:website|site|web)[\s:]+([a-zA-Z0-9-]+\.[a-zA-Z]{2,})',
-        ]
-        
-        # LinkedIn patterns
-        self.linkedin_patterns = [
-            r'(https?://(?:www\.)?linkedin\.com/company/[a-zA-Z0-9-]+)',
-            r'linkedin[\s:]+([a-zA-Z0-9-]+)',
-        ]
-        
-        # Contact patterns
-        self.contact_patterns = [
-            r'(\+?\d{10,13})',  # Phone numbers
-            r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',  # Email
-            r'(?:contact|call|whatsapp)[\s:]+(\+?\d{10,13})',
-        ]
-        
-        # Salary patterns
-        self.salary_patterns = [
-            r'(?:salary|ctc|package)[\s:]*₹?\s*(\d+[\d,]*)\s*(?:to|-)\s*₹?\s*(\d+[\d,]*)',
-            r'₹\s*(\d+[\d,]*)\s*(?:to|-)\s*₹?\s*(\d+[\d,]*)',
-            r'(\d+)\s*(?:LPA|lpa|lakh|lakhs)',
-        ]
-        
-        # Experience patterns
-        self.experience_patterns = [
-            r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s+)?(?:experience|exp)',
-            r'(?:experience|exp)[\s:]*(\d+)\+?\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:to|-)\s*(\d+)\s*(?:years?|yrs?)',
-        ]
+        # Compiled once in the shared registry
+        self.company_patterns = patterns.group('verifier.company')
+        self.website_patterns = patterns.group('verifier.website')
+        self.linkedin_patterns = patterns.group('verifier.linkedin')
+        self.contact_patterns = patterns.group('verifier.contact')  # Phone, email, "call: <phone>"
+        self.salary_patterns = patterns.group('verifier.salary')
+        self.experience_patterns = patterns.group('verifier.experience')
         
         # Skills patterns (common tech skills)
         self.skill_keywords = [
@@ -73,11 +42,7 @@ class JobVerifier:
             'onsite': ['onsite', 'office', 'on-site', 'work from office']
         }
         
-        # Location patterns
-        self.location_patterns = [
-            r'(?:location|based in|office in|📍)[\s:]*([a-zA-Z\s,]+)',
-            r'📍\s*([a-zA-Z\s,]+)',
-        ]
+        self.location_patterns = patterns.group('verifier.location')
         
         # Indian cities
         self.indian_cities = [
@@ -102,6 +67,7 @@ class JobVerifier:
             'multiple locations', 'various locations', 'india wide'
         ]
     
+    @metrics.timed('verifier_verify_and_extract_seconds', 'JobVerifier.verify_and_extract latency')
     def verify_and_extract(self, message_text):
         """
         Verify job and extract all information
@@ -195,11 +161,11 @@ class JobVerifier:
     def _extract_company_name(self, text):
         """Extract company name from text"""
         for pattern in self.company_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 company = match.group(1).strip()
                 # Clean up
-                company = re.sub(r'\s+', ' ', company)
+                company = patterns['whitespace'].sub(' ', company)
                 # Take first 50 chars max
                 return company[:50] if len(company) > 50 else company
         return ''
@@ -207,7 +173,7 @@ class JobVerifier:
     def _extract_website(self, text):
         """Extract company website"""
         for pattern in self.website_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return ''
@@ -215,7 +181,7 @@ class JobVerifier:
     def _extract_linkedin(self, text):
         """Extract LinkedIn profile"""
         for pattern in self.linkedin_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return ''
@@ -224,7 +190,7 @@ class JobVerifier:
         """Extract contact information"""
         contacts = []
         for pattern in self.contact_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+            matches = pattern.findall(text)
             contacts.extend(matches)
         
         # Remove duplicates and join
@@ -245,7 +211,7 @@ class JobVerifier:
     def _extract_salary(self, text):
         """Extract salary range"""
         for pattern in self.salary_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 if len(match.groups()) >= 2:
                     return f"₹{match.group(1)}-{match.group(2)}"
@@ -256,7 +222,7 @@ class JobVerifier:
     def _extract_experience(self, text):
         """Extract experience requirements"""
         for pattern in self.experience_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 if len(match.groups()) >= 2:
                     return f"{match.group(1)}-{match.group(2)} years"
@@ -290,11 +256,11 @@ class JobVerifier:
         
         # Try to extract location using patterns
         for pattern in self.location_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 location = match.group(1).strip()
                 # Clean up location
-                location = re.sub(r'\s+', ' ', location)
+                location = patterns['whitespace'].sub(' ', location)
                 # Take first 100 chars max
                 location = location[:100] if len(location) > 100 else location
                 
@@ -0,0 +1,262 @@
+"""
+Near-duplicate detection for cross-posted job messages
+
+Each message is normalized, split into word shingles and reduced to a 64-bit
+SimHash. Messages whose hashes differ in at most `max_hamming_distance` bits
+belong to the same cluster.
+
+Lookups use LSH banding: the 64 bits are cut into (max_hamming_distance + 1)
+bands, and each band value maps to the clusters that have it. Two hashes
+within the distance limit must match exactly on at least one band
+(pigeonhole), so a lookup is a handful of dict probes plus a popcount on the
+few candidates - O(1) per message regardless of how many clusters exist.
+
+A cluster is identified by the message_id of its first (canonical) message,
+so assigning a cluster never needs a database round trip.
+"""
+import hashlib
+import re
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import NEAR_DUPLICATE
+from src.utils.logger import get_logger
+
+logger = get_logger('near_duplicate')
+
+HASH_BITS = 64
+_MASK_64 = (1 << HASH_BITS) - 1
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_TOKEN_RE = re.compile(r'[a-z0-9@.+]+')
+
+
+def normalize_text(text):
+    """Lowercase, reduce URLs to their host and keep only word-like tokens"""
+    text = (text or '').lower()
+    # Cross-posts often carry per-group tracking params; keep the host only
+    text = _URL_RE.sub(lambda m: ' ' + re.sub(r'^(https?://)?(www\.)?', '', m.group(0)).split('/')[0] + ' ', text)
+    return [token.strip('.') for token in _TOKEN_RE.findall(text) if token.strip('.')]
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text, shingle_size=3):
+    """64-bit SimHash of a message's word shingles"""
+    tokens = normalize_text(text)
+    if len(tokens) >= shingle_size:
+        features = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        features = tokens
+
+    if not features:
+        return 0
+
+    weights = [0] * HASH_BITS
+    for feature in features:
+        value = _feature_hash(feature)
+        for bit in range(HASH_BITS):
+            if value >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def content_hash(text):
+    """
+    Exact-repost key: 64-bit hash of the normalized text (signed, for SQLite)
+
+    Case, spacing, punctuation and URL tracking params do not change it, so
+    a forwarded or re-pasted post hashes the same as the original.
+    """
+    normalized = ' '.join(normalize_text(text))
+    return to_signed(int.from_bytes(hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest(), 'big'))
+
+
+def hamming_distance(a, b):
+    return bin((a ^ b) & _MASK_64).count('1')
+
+
+def to_signed(value):
+    """Unsigned 64-bit hash -> SQLite INTEGER range"""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value & _MASK_64
+
+
+class SimHashIndex:
+    """
+    In-memory LSH band index: band value -> cluster ids
+
+    With window_seconds set, clusters not seen within the window are dropped
+    (checked on add, at most every PRUNE_INTERVAL seconds), so a long-running
+    fetcher holds the same window that a fresh start would load.
+    """
+
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, max_distance=3, window_seconds=None):
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        self.band_bits = HASH_BITS // self.num_bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._bands = [{} for _ in range(self.num_bands)]
+        self._hashes = {}  # cluster_id -> simhash
+        self._last_seen = {}  # cluster_id -> unix time of the newest member
+        self.window_seconds = window_seconds
+        self._next_prune = 0.0
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _band_keys(self, value):
+        for band in range(self.num_bands):
+            shift = band * self.band_bits
+            # The last band takes any leftover bits
+            if band == self.num_bands - 1:
+                yield band, value >> shift
+            else:
+                yield band, (value >> shift) & self._band_mask
+
+    def add(self, cluster_id, value, seen=None):
+        now = time.time()
+        if self.window_seconds and now >= self._next_prune:
+            self.prune(now)
+        if cluster_id in self._hashes:
+            self.remove(cluster_id)
+        self._hashes[cluster_id] = value
+        self._last_seen[cluster_id] = now if seen is None else seen
+        for band, key in self._band_keys(value):
+            self._bands[band].setdefault(key, []).append(cluster_id)
+
+    def touch(self, cluster_id, seen=None):
+        """Record a new member, keeping the cluster inside the window"""
+        if cluster_id in self._last_seen:
+            self._last_seen[cluster_id] = time.time() if seen is None else seen
+
+    def remove(self, cluster_id):
+        value = self._hashes.pop(cluster_id, None)
+        if value is None:
+            return
+        del self._last_seen[cluster_id]
+        for band, key in self._band_keys(value):
+            bucket = self._bands[band].get(key)
+            if bucket and cluster_id in bucket:
+                bucket.remove(cluster_id)
+                if not bucket:
+                    del self._bands[band][key]
+
+    def prune(self, now=None):
+        """
+        Drop clusters not seen within window_seconds
+
+        Returns:
+            int: Number of clusters dropped
+        """
+        now = time.time() if now is None else now
+        self._next_prune = now + self.PRUNE_INTERVAL
+        if not self.window_seconds:
+            return 0
+        cutoff = now - self.window_seconds
+        expired = [cluster_id for cluster_id, seen in self._last_seen.items() if seen < cutoff]
+        for cluster_id in expired:
+            self.remove(cluster_id)
+        if expired:
+            logger.debug(f"Pruned {len(expired)} job clusters older than the near-duplicate window")
+        return len(expired)
+
+    def find(self, value):
+        """Closest cluster within max_distance, or None"""
+        best_id, best_distance = None, self.max_distance + 1
+        for band, key in self._band_keys(value):
+            for cluster_id in self._bands[band].get(key, ()):
+                distance = hamming_distance(value, self._hashes[cluster_id])
+                if distance < best_distance:
+                    best_id, best_distance = cluster_id, distance
+                    if distance == 0:
+                        return best_id
+        return best_id
+
+
+class NearDuplicateDetector:
+    """
+    Assigns cluster ids at ingest, backed by the job_clusters table
+
+    Thread-safe: the fetcher assigns from the enrich workers, before
+    verification, and commits or rolls back from the persist stage.
+    """
+
+    def __init__(self, db=None):
+        self.enabled = NEAR_DUPLICATE.get('enabled', True)
+        self.shingle_size = NEAR_DUPLICATE.get('shingle_size', 3)
+        self.window_days = NEAR_DUPLICATE.get('window_days', 30)
+        self.index = SimHashIndex(NEAR_DUPLICATE.get('max_hamming_distance', 3),
+                                  window_seconds=self.window_days * 86400)
+        self._pending = set()  # new clusters whose first message is not stored yet
+        self._lock = threading.Lock()
+        if db is not None and self.enabled:
+            self._load(db)
+
+    def _load(self, db):
+        since = datetime.now() - timedelta(days=self.window_days)
+        for cluster_id, value, last_seen in db.get_job_clusters(since=since):
+            try:
+                seen = datetime.fromisoformat(last_seen).timestamp()
+            except (TypeError, ValueError):
+                seen = None
+            self.index.add(cluster_id, to_unsigned(value), seen=seen)
+        logger.info(f"Loaded {len(self.index)} job clusters for near-duplicate detection")
+
+    def assign(self, message_id, message_text):
+        """
+        Find or create the cluster for a message
+
+        A new cluster stays pending until commit() (its message was stored)
+        or rollback() (it was not, so the cluster must not match later
+        messages).
+
+        Returns:
+            dict: cluster_id, simhash (signed, for SQLite) and is_duplicate
+        """
+        if not self.enabled:
+            return {'cluster_id': None, 'simhash': None, 'is_duplicate': False}
+
+        value = simhash(message_text, self.shingle_size)
+        with self._lock:
+            cluster_id = self.index.find(value)
+            if cluster_id is not None and cluster_id != message_id:
+                self.index.touch(cluster_id)
+                return {'cluster_id': cluster_id, 'simhash': to_signed(value), 'is_duplicate': True}
+
+            self.index.add(message_id, value)
+            self._pending.add(message_id)
+        return {'cluster_id': message_id, 'simhash': to_signed(value), 'is_duplicate': False}
+
+    def commit(self, message_ids):
+        """Keep the clusters these stored messages created"""
+        with self._lock:
+            self._pending.difference_update(message_ids)
+
+    def rollback(self, message_ids):
+        """Forget the clusters these messages created: they were not stored"""
+        with self._lock:
+            for message_id in message_ids:
+                if message_id in self._pending:
+                    self._pending.discard(message_id)
+                    self.index.remove(message_id)
@@ -0,0 +1,264 @@
+"""
+Monthly archive of old messages
+
+Messages older than ARCHIVE['max_age_days'] are moved out of the hot
+database into one SQLite file per month (data/archive/messages_YYYY_MM.db),
+together with their rows in the category tables, application_links and the
+keyword index. The
+hot database only ever holds recent messages, so dashboard scans stay fast
+however long the fetcher runs.
+
+Reading archived data goes through messages_view(): it attaches the archive
+months a query needs and exposes them together with the hot table as one
+temp view, `all_messages`.
+"""
+import glob
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import ARCHIVE, DATABASE, PATHS
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger('archive')
+
+# Tables moved to the archive; each has message_id and date columns
+ARCHIVED_TABLES = ('messages', 'tech_jobs', 'non_tech_jobs', 'freelance_jobs', 'fresher_jobs',
+                   'application_links', 'reposts')
+
+_MONTH_FILE_RE = re.compile(r'messages_(\d{4})_(\d{2})\.db$')
+
+# message_counts rows computed from a messages table
+_COUNTS_SELECT = '''
+    SELECT IFNULL(group_link, '') AS group_link, IFNULL(group_name, '') AS group_name,
+           IFNULL(job_type, '') AS job_type, COUNT(*) AS count, MAX(date) AS last_date
+    FROM {schema}.messages
+    GROUP BY 1, 2, 3
+'''
+
+
+def archive_path(month):
+    """'2025-03' -> data/archive/messages_2025_03.db"""
+    return os.path.join(PATHS['archive'], f"messages_{month.replace('-', '_')}.db")
+
+
+def archived_months():
+    """Months with an archive file, newest first"""
+    months = []
+    for path in glob.glob(os.path.join(PATHS['archive'], 'messages_*.db')):
+        match = _MONTH_FILE_RE.search(path)
+        if match:
+            months.append(f"{match.group(1)}-{match.group(2)}")
+    return sorted(months, reverse=True)
+
+
+def _next_month(month):
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def _columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info({table})').fetchall()]
+
+
+def _ensure_archive_table(conn, table):
+    """Create arc.<table> like main.<table>, adding columns the hot table gained since"""
+    archived = _columns(conn, 'arc', table)
+    if not archived:
+        sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                           (table,)).fetchone()[0]
+        sql = re.sub(r'^CREATE TABLE\s+"?\w+"?', f'CREATE TABLE IF NOT EXISTS arc.{table}', sql)
+        conn.execute(sql)
+        if 'date' not in _columns(conn, 'arc', table):
+            return _columns(conn, 'main', table)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS arc.idx_{table}_date ON {table}(date)')
+        if table == 'messages':
+            conn.execute('CREATE INDEX IF NOT EXISTS arc.idx_messages_group_date ON messages(group_name, date)')
+        return _columns(conn, 'main', table)
+
+    for column in _columns(conn, 'main', table):
+        if column not in archived:
+            conn.execute(f'ALTER TABLE arc.{table} ADD COLUMN {column}')
+    return _columns(conn, 'main', table)
+
+
+def archive_old_messages(db_path=None, max_age_days=None):
+    """
+    Move messages older than `max_age_days` into their monthly archive files
+
+    Each month is one transaction: rows are copied with INSERT OR IGNORE and
+    then deleted from the hot tables, so a run interrupted between the two
+    files is simply finished by the next run.
+
+    Returns: dict {month: messages archived}
+    """
+    if db_path is None:
+        db_path = os.path.join(PATHS['database'], DATABASE['name'])
+    if max_age_days is None:
+        max_age_days = ARCHIVE['max_age_days']
+
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y-%m-%d')
+    os.makedirs(PATHS['archive'], exist_ok=True)
+    archived = {}
+
+    conn = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+    try:
+        tables = [table for table in ARCHIVED_TABLES if _columns(conn, 'main', table)]
+        has_keyword_index = bool(_columns(conn, 'main', 'message_keywords'))
+        has_counts = bool(_columns(conn, 'main', 'message_counts'))
+        months = [row[0] for row in conn.execute('''
+            SELECT DISTINCT substr(date, 1, 7) FROM messages
+            WHERE date IS NOT NULL AND date < ?
+            ORDER BY 1
+        ''', (cutoff,)).fetchall()]
+
+        for month in months:
+            # Rows of this month that are past the cutoff (the cutoff month is split)
+            scope = 'date >= ? AND date < ? AND date < ?'
+            params = (month, _next_month(month), cutoff)
+
+            conn.execute('ATTACH DATABASE ? AS arc', (archive_path(month),))
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    for table in tables:
+                        columns = ', '.join(_ensure_archive_table(conn, table))
+                        conn.execute(f'''
+                            INSERT OR IGNORE INTO arc.{table} ({columns})
+                            SELECT {columns} FROM main.{table} WHERE {scope}
+                        ''', params)
+
+                    # message_id is "<chat id>_<telegram message id>"
+                    conn.execute(f'''
+                        INSERT INTO archive_watermarks (entity_id, max_message_id)
+                        SELECT entity_id, MAX(seq) FROM (
+                            SELECT substr(message_id, 1, instr(message_id, '_') - 1) AS entity_id,
+                                   CAST(substr(message_id, instr(message_id, '_') + 1) AS INTEGER) AS seq
+                            FROM main.messages WHERE {scope} AND instr(message_id, '_') > 0
+                        ) WHERE 1 GROUP BY entity_id
+                        ON CONFLICT(entity_id) DO UPDATE
+                        SET max_message_id = MAX(max_message_id, excluded.max_message_id)
+                    ''', params)
+
+                    # Keyword rows follow their messages (keyword ids stay in the hot keywords table)
+                    if has_keyword_index:
+                        _ensure_archive_table(conn, 'message_keywords')
+                        rowids = f'SELECT id FROM main.messages WHERE {scope}'
+                        conn.execute(f'''
+                            INSERT OR IGNORE INTO arc.message_keywords (message_rowid, keyword_id)
+                            SELECT message_rowid, keyword_id FROM main.message_keywords
+                            WHERE message_rowid IN ({rowids})
+                        ''', params)
+                        conn.execute(f'DELETE FROM main.message_keywords WHERE message_rowid IN ({rowids})',
+                                     params)
+                    
+                    # Per-group counts of the whole month file, for the report engine
+                    if has_counts:
+                        _ensure_archive_table(conn, 'message_counts')
+                        conn.execute('DELETE FROM arc.message_counts')
+                        conn.execute(f'''
+                            INSERT INTO arc.message_counts (group_link, group_name, job_type, count, last_date)
+                            {_COUNTS_SELECT.format(schema='arc')}
+                        ''')
+                    
+                    for table in tables:
+                        cursor = conn.execute(f'DELETE FROM main.{table} WHERE {scope}', params)
+                        if table == 'messages':
+                            archived[month] = cursor.rowcount
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+            finally:
+                conn.execute('DETACH DATABASE arc')
+
+            metrics.counter('archive_messages_moved_total', 'Messages moved to the monthly archive').inc(
+                archived[month])
+            logger.info(f"📦 Archived {archived[month]} messages from {month} to {archive_path(month)}")
+
+        return archived
+
+    except Exception as e:
+        logger.error(f"Error archiving messages: {e}")
+        return archived
+    finally:
+        conn.close()
+
+
+def _months_in_range(since=None, until=None):
+    """Archived months overlapping [since, until] (ISO date strings), newest first"""
+    months = archived_months()
+    if since:
+        months = [m for m in months if m >= since[:7]]
+    if until:
+        months = [m for m in months if m <= until[:7]]
+    return months
+
+
+def _counts_select(conn, schema):
+    if _columns(conn, schema, 'message_counts'):
+        return f"SELECT group_link, group_name, job_type, count, last_date FROM {schema}.message_counts"
+    return _COUNTS_SELECT.format(schema=schema)
+
+
+@contextmanager
+def messages_view(include_archive=True, since=None, until=None, db_path=None):
+    """
+    Connection with a temp view `all_messages` = hot messages + archived months
+
+    `all_message_keywords` does the same for message_keywords; join it to
+    all_messages on message_rowid = id and to the hot keywords table.
+    `all_message_counts` unions the per-group message_counts (computed on the
+    fly for files that predate them).
+    Only months overlapping `since` / `until` are attached, so a query over
+    recent dates never opens old files. Columns the archive files predate
+    read as NULL.
+
+        with messages_view(since='2025-01-01') as conn:
+            conn.execute('SELECT ... FROM all_messages WHERE group_name = ?', ...)
+    """
+    if db_path is None:
+        db_path = os.path.join(PATHS['database'], DATABASE['name'])
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        columns = _columns(conn, 'main', 'messages')
+        selects = [f"SELECT {', '.join(columns)} FROM main.messages"]
+        keyword_selects = ["SELECT message_rowid, keyword_id FROM main.message_keywords"] \
+            if _columns(conn, 'main', 'message_keywords') else []
+        count_selects = [_counts_select(conn, 'main')]
+
+        months = _months_in_range(since, until) if include_archive else []
+        max_attached = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(months) > max_attached:
+            logger.warning(f"Query spans {len(months)} archived months; only the newest "
+                           f"{max_attached} can be attached")
+            months = months[:max_attached]
+
+        for index, month in enumerate(months):
+            schema = f"arc{index}"
+            conn.execute(f'ATTACH DATABASE ? AS {schema}', (archive_path(month),))
+            archived = set(_columns(conn, schema, 'messages'))
+            if not archived:
+                continue
+            select_list = ', '.join(c if c in archived else f'NULL AS {c}' for c in columns)
+            selects.append(f"SELECT {select_list} FROM {schema}.messages")
+            if keyword_selects and _columns(conn, schema, 'message_keywords'):
+                keyword_selects.append(f"SELECT message_rowid, keyword_id FROM {schema}.message_keywords")
+            count_selects.append(_counts_select(conn, schema))
+
+        conn.execute(f"CREATE TEMP VIEW all_messages AS {' UNION ALL '.join(selects)}")
+        if keyword_selects:
+            conn.execute(f"CREATE TEMP VIEW all_message_keywords AS {' UNION ALL '.join(keyword_selects)}")
+        conn.execute(f"CREATE TEMP VIEW all_message_counts AS {' UNION ALL '.join(count_selects)}")
+        yield conn
+    finally:
+        conn.close()
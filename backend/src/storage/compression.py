@@ -0,0 +1,186 @@
+"""
+Per-row compression of stored message bodies
+
+Job posts are short and very repetitive (same templates, same phrases across
+groups), so each body is compressed on its own against a shared dictionary
+trained from the corpus. zlib is always available and uses the dictionary as
+a preset window; the optional `zstandard` package trains and uses a real
+zstd dictionary when installed.
+
+Stored values are self-describing, so rows written by any codec, dictionary
+or older version decode the same way:
+    str                       plain text (short bodies, rows from before compression)
+    b'\x01' + data            zlib
+    b'\x02' + id(2) + data    zlib with dictionary `id`
+    b'\x03' + data            zstd
+    b'\x04' + id(2) + data    zstd with dictionary `id`
+
+Dictionaries live in the compression_dicts table of the hot database and are
+never deleted (archived category rows decode with them too).
+"""
+import sqlite3
+import zlib
+from collections import Counter
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = get_logger('compression')
+
+ZLIB, ZLIB_DICT, ZSTD, ZSTD_DICT = 1, 2, 3, 4
+
+# Below this many bytes the header and zlib framing eat the gain
+MIN_COMPRESS_BYTES = 80
+DICT_SIZE = 16 * 1024  # zlib only looks back 32KB, and short posts want a small dict
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 6
+
+
+def zstd_available():
+    return zstandard is not None
+
+
+def train_dictionary(samples, size=DICT_SIZE, codec=None):
+    """
+    Build a dictionary from sample bodies
+
+    zstd: zstandard.train_dictionary. zlib: the most frequent word 4-grams,
+    most frequent last - zlib finds matches nearest the end of the preset
+    window cheapest.
+
+    Returns: (codec, dictionary bytes)
+    """
+    samples = [s.encode('utf-8') if isinstance(s, str) else s for s in samples if s]
+    if codec is None:
+        codec = ZSTD_DICT if zstandard is not None else ZLIB_DICT
+
+    if codec == ZSTD_DICT:
+        return codec, zstandard.train_dictionary(size, samples).as_bytes()
+
+    counts = Counter()
+    for sample in samples:
+        words = sample.split()
+        for i in range(len(words) - 3):
+            counts[b' '.join(words[i:i + 4])] += 1
+
+    phrases, used = [], 0
+    for phrase, count in counts.most_common():
+        if count < 2 or used + len(phrase) + 1 > size:
+            break
+        phrases.append(phrase)
+        used += len(phrase) + 1
+    return ZLIB_DICT, b' '.join(reversed(phrases))
+
+
+class BodyCodec:
+    """Compresses new bodies with the newest dictionary, decodes any stored value"""
+
+    def __init__(self, dictionaries=None):
+        # dict_id -> (codec, bytes); the highest id is used for new writes
+        self.dictionaries = dict(dictionaries or {})
+        # zlib objects primed with a dictionary; copy() is far cheaper than
+        # loading the dictionary again for every body
+        self._zlib_compressors = {}
+        self._zlib_decompressors = {}
+        self._zstd_compressors = {}
+        self._zstd_decompressors = {}
+        self.write_dict_id = max(self.dictionaries) if self.dictionaries else None
+        if self.write_dict_id is not None and self.dictionaries[self.write_dict_id][0] == ZSTD_DICT \
+                and zstandard is None:
+            # Trained with zstd elsewhere; keep writing plain zlib here
+            self.write_dict_id = None
+
+    @classmethod
+    def load(cls, conn):
+        """Codec with every dictionary stored in this database"""
+        try:
+            rows = conn.execute('SELECT dict_id, codec, data FROM compression_dicts').fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        return cls({row[0]: (row[1], row[2]) for row in rows})
+
+    @staticmethod
+    def store_dictionary(conn, codec, data):
+        """Save a trained dictionary; returns its id (new writes use it from the next load)"""
+        cursor = conn.execute('INSERT INTO compression_dicts (codec, data) VALUES (?, ?)',
+                              (codec, sqlite3.Binary(data)))
+        return cursor.lastrowid
+
+    def _zstd_compressor(self, dict_id):
+        compressor = self._zstd_compressors.get(dict_id)
+        if compressor is None:
+            kwargs = {'level': ZSTD_LEVEL}
+            if dict_id is not None:
+                kwargs['dict_data'] = zstandard.ZstdCompressionDict(self.dictionaries[dict_id][1])
+            compressor = self._zstd_compressors[dict_id] = zstandard.ZstdCompressor(**kwargs)
+        return compressor
+
+    def _zstd_decompressor(self, dict_id):
+        decompressor = self._zstd_decompressors.get(dict_id)
+        if decompressor is None:
+            kwargs = {}
+            if dict_id is not None:
+                kwargs['dict_data'] = zstandard.ZstdCompressionDict(self.dictionaries[dict_id][1])
+            decompressor = self._zstd_decompressors[dict_id] = zstandard.ZstdDecompressor(**kwargs)
+        return decompressor
+
+    def compress(self, text):
+        """Value to store for a body: compressed bytes, or the text itself if that is smaller"""
+        if text is None or isinstance(text, bytes):
+            return text
+        raw = text.encode('utf-8')
+        if len(raw) < MIN_COMPRESS_BYTES:
+            return text
+
+        dict_id = self.write_dict_id
+        if dict_id is not None:
+            codec, data = self.dictionaries[dict_id]
+            prefix = bytes([codec]) + dict_id.to_bytes(2, 'big')
+            if codec == ZSTD_DICT:
+                packed = prefix + self._zstd_compressor(dict_id).compress(raw)
+            else:
+                primed = self._zlib_compressors.get(dict_id)
+                if primed is None:
+                    primed = self._zlib_compressors[dict_id] = zlib.compressobj(
+                        ZLIB_LEVEL, zlib.DEFLATED, -15, zdict=data)
+                compressor = primed.copy()
+                packed = prefix + compressor.compress(raw) + compressor.flush()
+        elif zstandard is not None:
+            packed = bytes([ZSTD]) + self._zstd_compressor(None).compress(raw)
+        else:
+            packed = bytes([ZLIB]) + zlib.compress(raw, ZLIB_LEVEL)
+
+        return packed if len(packed) < len(raw) else text
+
+    def decompress(self, value):
+        """Text of a stored body, whatever codec wrote it"""
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        codec = value[0]
+        if codec == ZLIB:
+            return zlib.decompress(value[1:]).decode('utf-8')
+        if codec == ZSTD:
+            return self._zstd_decompressor(None).decompress(value[1:]).decode('utf-8')
+
+        dict_id = int.from_bytes(value[1:3], 'big')
+        if codec == ZLIB_DICT:
+            primed = self._zlib_decompressors.get(dict_id)
+            if primed is None:
+                primed = self._zlib_decompressors[dict_id] = zlib.decompressobj(
+                    -15, zdict=self.dictionaries[dict_id][1])
+            decompressor = primed.copy()
+            return (decompressor.decompress(value[3:]) + decompressor.flush()).decode('utf-8')
+        if codec == ZSTD_DICT:
+            if zstandard is None:
+                raise RuntimeError("Body was compressed with zstd; install the zstandard package")
+            return self._zstd_decompressor(dict_id).decompress(value[3:]).decode('utf-8')
+        raise ValueError(f"Unknown body codec {codec}")
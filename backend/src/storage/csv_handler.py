@@ -53,23 +53,9 @@ class CSVHandler:
     def write_message(self, message_data):
         """Write message to appropriate CSV files"""
         try:
-            # Write to all messages file
-            self._append_to_csv(self.messages_file, message_data, CSV_COLUMNS['messages'])
-            
-            # Write to category-specific file
-            job_type = message_data.get('job_type', '').lower()
-            
-            if 'tech' in job_type:
-                self._append_to_csv(self.tech_jobs_file, message_data, CSV_COLUMNS['messages'])
-            
-            if 'non_tech' in job_type or (job_type == 'non_tech'):
-                self._append_to_csv(self.non_tech_jobs_file, message_data, CSV_COLUMNS['messages'])
-            
-            if 'freelance' in job_type:
-                self._append_to_csv(self.freelance_jobs_file, message_data, CSV_COLUMNS['messages'])
-            
-            if 'fresher' in job_type:
-                self._append_to_csv(self.fresher_jobs_file, message_data, CSV_COLUMNS['messages'])
+            # All messages file plus the category-specific files
+            for file_path in self._message_files(message_data):
+                self._append_to_csv(file_path, message_data, CSV_COLUMNS['messages'])
             
             logger.debug(f"Message written to CSV: {message_data['message_id']}")
             return True
@@ -77,6 +63,35 @@ class CSVHandler:
             logger.error(f"Error writing message to CSV: {e}")
             return False
     
+    def write_messages(self, batch):
+        """Write a batch of messages, opening each CSV file once"""
+        try:
+            rows = {}
+            for message_data in batch:
+                for file_path in self._message_files(message_data):
+                    rows.setdefault(file_path, []).append(message_data)
+            for file_path, file_rows in rows.items():
+                self._append_rows_to_csv(file_path, file_rows, CSV_COLUMNS['messages'])
+            logger.debug(f"{len(batch)} message(s) written to CSV")
+            return True
+        except Exception as e:
+            logger.error(f"Error writing messages to CSV: {e}")
+            return False
+    
+    def _message_files(self, message_data):
+        """All messages file plus the category files for the message's job type"""
+        job_type = message_data.get('job_type', '').lower()
+        files = [self.messages_file]
+        if 'tech' in job_type:
+            files.append(self.tech_jobs_file)
+        if 'non_tech' in job_type:
+            files.append(self.non_tech_jobs_file)
+        if 'freelance' in job_type:
+            files.append(self.freelance_jobs_file)
+        if 'fresher' in job_type:
+            files.append(self.fresher_jobs_file)
+        return files
+    
     def write_group(self, group_data):
         """Write group information to CSV"""
         try:
@@ -102,6 +117,12 @@ class CSVHandler:
             
             writer.writerow(filtered_data)
     
+    def _append_rows_to_csv(self, file_path, rows, columns):
+        """Append several rows with one open"""
+        with open(file_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval='', extrasaction='ignore')
+            writer.writerows(rows)
+    
     def export_daily_summary(self, date, stats):
         """Export daily summary to CSV"""
         try:
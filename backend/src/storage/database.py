@@ -2,6 +2,7 @@
 Database handler for storing messages and group data
 """
 import sqlite3
+import json
 import os
 import sys
 import time
@@ -12,7 +13,11 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.settings import DATABASE, PATHS
+from src.storage.compression import BodyCodec, train_dictionary
+from src.storage.keyword_index import index_message_keywords
+from src.storage.migrations import SCHEMA_VERSION, migrate
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger('database')
 
@@ -42,6 +47,7 @@ class DatabaseHandler:
         self._last_connection_time = {}
         self._connection_lock = None
         self.create_tables()
+        self._load_body_codec()
         self._initialized = True
     
     def connect(self):
@@ -92,139 +98,87 @@ class DatabaseHandler:
             raise
     
     def create_tables(self):
-        """Create necessary tables"""
+        """Create or upgrade the schema (see src/storage/migrations.py)"""
+        start = migrate(self.db_path)
+        if start < SCHEMA_VERSION:
+            logger.info(f"Database schema upgraded from v{start} to v{SCHEMA_VERSION}")
+    
+    def _load_body_codec(self):
+        """(Re)load compression dictionaries for category table bodies"""
         conn = self.connect()
-        cursor = conn.cursor()
-        
-        # Base fields for all job tables
-        job_table_schema = '''(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            message_id TEXT UNIQUE NOT NULL,
-            group_name TEXT NOT NULL,
-            group_link TEXT,
-            sender TEXT,
-            date TIMESTAMP,
-            message_text TEXT,
-            keywords_found TEXT,
-            account_used TEXT,
-            
-            -- Enhanced Company Information
-            company_name TEXT,
-            company_website TEXT,
-            company_linkedin TEXT,
-            
-            -- Job Details
-            skills_required TEXT,
-            salary_range TEXT,
-            job_location TEXT,
-            work_mode TEXT,
-            experience_required TEXT,
-            job_type TEXT,
-            application_deadline TEXT,
-            contact_info TEXT,
-            
-            -- Verification
-            is_verified BOOLEAN DEFAULT 0,
-            verification_score REAL DEFAULT 0.0,
-            
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )'''
-        
-        # Tech Jobs Table
-        cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS tech_jobs {job_table_schema}
-        ''')
-        
-        # Non-Tech Jobs Table
-        cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS non_tech_jobs {job_table_schema}
-        ''')
-        
-        # Freelance Jobs Table
-        cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS freelance_jobs {job_table_schema}
-        ''')
+        try:
+            self.body_codec = BodyCodec.load(conn)
+        finally:
+            conn.close()
+    
+    def decode_body(self, value):
+        """Text of a stored message body (category tables store it compressed)"""
+        return self.body_codec.decompress(value)
+    
+    def get_category_jobs(self, table_name, limit=100, offset=0, decode=True):
+        """
+        Newest rows of a category table
         
-        # Fresher Jobs Table
-        cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS fresher_jobs {job_table_schema}
-        ''')
+        Bodies are decompressed only with decode=True; pass False when the
+        text is not going to be shown and call decode_body() per row later.
+        """
+        if table_name not in ('tech_jobs', 'non_tech_jobs', 'freelance_jobs', 'fresher_jobs'):
+            raise ValueError(f"Unknown category table: {table_name}")
         
-        # All Messages table (for backup/reference)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                message_id TEXT UNIQUE NOT NULL,
-                group_name TEXT NOT NULL,
-                group_link TEXT,
-                sender TEXT,
-                date TIMESTAMP,
-                message_text TEXT,
-                job_type TEXT,
-                keywords_found TEXT,
-                account_used TEXT,
-                job_location TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        conn = self.connect()
+        cursor = conn.cursor()
         
-        # Add job_location column if it doesn't exist (for existing databases)
         try:
-            cursor.execute('ALTER TABLE messages ADD COLUMN job_location TEXT')
-        except sqlite3.OperationalError:
-            # Column already exists, ignore
-            pass
-        
-        # Groups table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS groups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                group_name TEXT NOT NULL,
-                group_link TEXT UNIQUE NOT NULL,
-                join_date TIMESTAMP,
-                account_used TEXT,
-                messages_fetched INTEGER DEFAULT 0,
-                last_message_date TIMESTAMP,
-                last_checked TIMESTAMP,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            cursor.execute(f'SELECT * FROM {table_name} ORDER BY date DESC LIMIT ? OFFSET ?', (limit, offset))
+            jobs = [dict(row) for row in cursor.fetchall()]
+            if decode:
+                for job in jobs:
+                    job['message_text'] = self.decode_body(job['message_text'])
+            return jobs
+        except Exception as e:
+            logger.error(f"Error fetching {table_name}: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    def train_body_dictionary(self, sample_size=2000):
+        """
+        Train a compression dictionary from recent message bodies
         
-        # Daily stats table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date DATE UNIQUE NOT NULL,
-                groups_joined INTEGER DEFAULT 0,
-                messages_fetched INTEGER DEFAULT 0,
-                tech_jobs INTEGER DEFAULT 0,
-                non_tech_jobs INTEGER DEFAULT 0,
-                freelance_jobs INTEGER DEFAULT 0,
-                accounts_used TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        New category rows use it from now on; rows written with older
+        dictionaries keep decoding with theirs.
         
-        # Account usage tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS account_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_name TEXT NOT NULL,
-                date DATE NOT NULL,
-                groups_joined INTEGER DEFAULT 0,
-                messages_fetched INTEGER DEFAULT 0,
-                last_action TIMESTAMP,
-                UNIQUE(account_name, date)
-            )
-        ''')
+        Returns: new dictionary id, or None if there are too few messages
+        """
+        conn = self.connect()
+        try:
+            samples = [row[0] for row in conn.execute(
+                'SELECT message_text FROM messages WHERE message_text IS NOT NULL ORDER BY id DESC LIMIT ?',
+                (sample_size,)).fetchall()]
+            if len(samples) < 100:
+                return None
+            codec, data = train_dictionary(samples)
+            dict_id = BodyCodec.store_dictionary(conn, codec, data)
+            logger.info(f"Trained body compression dictionary {dict_id} "
+                        f"({len(data)} bytes from {len(samples)} messages)")
+        finally:
+            conn.close()
         
-        conn.commit()
-        conn.close()
-        logger.info("Database tables created successfully")
+        self._load_body_codec()
+        return dict_id
     
+    @metrics.timed('db_insert_message_seconds', 'DatabaseHandler.insert_message latency incl. lock retries')
     def insert_message(self, message_data):
         """Insert a new message into appropriate table(s)"""
+        return self.insert_messages([message_data])
+    
+    def insert_messages(self, batch, reposts=()):
+        """
+        Insert messages into their table(s), one transaction per batch
+        
+        reposts: (message_id, original_message_id, group_name, date) of exact
+        re-posts, recorded in the same transaction
+        """
         max_retries = 5
         retry_delay = 2
         
@@ -239,34 +193,20 @@ class DatabaseHandler:
                 cursor.execute("PRAGMA busy_timeout=60000")  # 60 seconds
                 cursor.execute("PRAGMA synchronous=NORMAL")
                 
-                # Insert into main messages table
-                cursor.execute('''
-                    INSERT OR IGNORE INTO messages 
-                    (message_id, group_name, group_link, sender, date, message_text, 
-                     job_type, keywords_found, account_used, job_location)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    message_data['message_id'],
-                    message_data['group_name'],
-                    message_data['group_link'],
-                    message_data['sender'],
-                    message_data['date'],
-                    message_data['message_text'],
-                    message_data['job_type'],
-                    message_data['keywords_found'],
-                    message_data['account_used'],
-                    message_data.get('job_location', '')
-                ))
-                
-                # Insert into category-specific table with enhanced fields
-                self._insert_into_category_table(cursor, message_data)
-                
-                conn.commit()
-                logger.debug(f"Message {message_data['message_id']} inserted successfully")
+                cursor.execute('BEGIN IMMEDIATE')
+                for message_data in batch:
+                    self._write_message(cursor, message_data)
+                for repost in reposts:
+                    self._insert_repost(cursor, *repost)
+                cursor.execute('COMMIT')
+                logger.debug(f"{len(batch)} message(s), {len(reposts)} repost(s) inserted successfully")
                 return True
                 
             except sqlite3.OperationalError as e:
+                if conn and conn.in_transaction:
+                    conn.rollback()
                 if 'database is locked' in str(e) and attempt < max_retries - 1:
+                    metrics.counter('db_lock_retries_total', 'insert_message retries caused by database locks').inc()
                     logger.warning(f"Database locked, retry {attempt + 1}/{max_retries} in {retry_delay}s...")
                     if conn:
                         try:
@@ -288,6 +228,8 @@ class DatabaseHandler:
                 logger.error(f"Error inserting message: {e}")
                 if conn:
                     try:
+                        if conn.in_transaction:
+                            conn.rollback()
                         conn.close()
                     except:
                         pass
@@ -301,6 +243,144 @@ class DatabaseHandler:
         
         return False
     
+    def _write_message(self, cursor, message_data):
+        # Insert into main messages table
+        cursor.execute('''
+            INSERT OR IGNORE INTO messages 
+            (message_id, group_name, group_link, sender, date, message_text, 
+             job_type, keywords_found, account_used, job_location, cluster_id, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            message_data['message_id'],
+            message_data['group_name'],
+            message_data['group_link'],
+            message_data['sender'],
+            message_data['date'],
+            message_data['message_text'],
+            message_data['job_type'],
+            message_data['keywords_found'],
+            message_data['account_used'],
+            message_data.get('job_location', ''),
+            message_data.get('cluster_id'),
+            message_data.get('content_hash')
+        ))
+        inserted = cursor.rowcount == 1
+        message_rowid = cursor.lastrowid
+        
+        # Same text stored under another id meanwhile (e.g. another
+        # fetcher process): keep it as a repost, not a second job
+        if not inserted and message_data.get('content_hash') is not None:
+            cursor.execute('SELECT message_id FROM messages WHERE content_hash = ?',
+                           (message_data['content_hash'],))
+            original = cursor.fetchone()
+            if original and original[0] != message_data['message_id']:
+                self._insert_repost(cursor, message_data['message_id'], original[0],
+                                    message_data['group_name'], message_data['date'])
+                return
+        
+        if inserted and message_data.get('cluster_id'):
+            self._record_cluster_member(cursor, message_data)
+        
+        if inserted and message_data.get('keywords_found'):
+            index_message_keywords(cursor, message_rowid, message_data['keywords_found'])
+        
+        if inserted and message_data.get('application_links'):
+            self.insert_application_links(cursor, message_data)
+        
+        # Cross-posted copies stay out of the category tables (the
+        # canonical copy is already there)
+        if not message_data.get('is_duplicate'):
+            self._insert_into_category_table(cursor, message_data)
+    
+    def _insert_repost(self, cursor, message_id, original_message_id, group_name, date):
+        cursor.execute('''
+            INSERT OR IGNORE INTO reposts (message_id, original_message_id, group_name, date)
+            VALUES (?, ?, ?, ?)
+        ''', (message_id, original_message_id, group_name, date))
+    
+    def record_repost(self, message_id, original_message_id, group_name, date):
+        """Record an exact repost of an already stored message"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        try:
+            self._insert_repost(cursor, message_id, original_message_id, group_name, date)
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error recording repost {message_id}: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def get_content_hashes(self):
+        """(content_hash, message_id) of every stored message"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT content_hash, message_id FROM messages WHERE content_hash IS NOT NULL')
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error loading content hashes: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    def _record_cluster_member(self, cursor, message_data):
+        """Create the cluster row on first sight, then bump its member count"""
+        now = datetime.now().isoformat()
+        cursor.execute('''
+            INSERT OR IGNORE INTO job_clusters (cluster_id, simhash, job_type, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            message_data['cluster_id'],
+            message_data.get('simhash') or 0,
+            message_data.get('job_type', ''),
+            now,
+            now
+        ))
+        cursor.execute('''
+            UPDATE job_clusters
+            SET member_count = member_count + 1, last_seen = ?
+            WHERE cluster_id = ?
+        ''', (now, message_data['cluster_id']))
+    
+    def insert_application_links(self, cursor, message_data):
+        """Store the extracted application links for one message"""
+        links = message_data['application_links']
+        cursor.execute('''
+            INSERT OR REPLACE INTO application_links
+            (message_id, application_type, application_link, urls, emails, job_type, date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            message_data['message_id'],
+            links['application_type'],
+            links['application_link'],
+            json.dumps(links['urls']),
+            json.dumps(links['emails']),
+            message_data.get('job_type', ''),  # As classified at ingest; queries filter on messages.job_type
+            message_data['date']
+        ))
+    
+    def get_job_clusters(self, since=None):
+        """(cluster_id, simhash, last_seen) for clusters seen since `since`"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        try:
+            if since is not None:
+                cursor.execute('SELECT cluster_id, simhash, last_seen FROM job_clusters WHERE last_seen >= ?',
+                               (since.isoformat(),))
+            else:
+                cursor.execute('SELECT cluster_id, simhash, last_seen FROM job_clusters')
+            return [(row['cluster_id'], row['simhash'], row['last_seen']) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error loading job clusters: {e}")
+            return []
+        finally:
+            conn.close()
+    
     def _insert_into_category_table(self, cursor, message_data):
         """Insert message into appropriate category table"""
         job_type = message_data.get('job_type', '').lower()
@@ -334,7 +414,7 @@ class DatabaseHandler:
             message_data['group_link'],
             message_data['sender'],
             message_data['date'],
-            message_data['message_text'],
+            self.body_codec.compress(message_data['message_text']),
             message_data['keywords_found'],
             message_data['account_used'],
             message_data.get('company_name', ''),
@@ -425,7 +505,8 @@ class DatabaseHandler:
         cursor = conn.cursor()
         
         try:
-            cursor.execute('SELECT message_id FROM messages')
+            # Reposts are processed too, they just were not stored as jobs
+            cursor.execute('SELECT message_id FROM messages UNION ALL SELECT message_id FROM reposts')
             return [row[0] for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error fetching processed messages: {e}")
@@ -433,6 +514,291 @@ class DatabaseHandler:
         finally:
             conn.close()
     
+    def get_archive_watermarks(self):
+        """{chat entity id: newest archived Telegram message id}"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT entity_id, max_message_id FROM archive_watermarks')
+            return {row[0]: row[1] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error loading archive watermarks: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    def get_group_activity_marks(self):
+        """{group_link: newest Telegram message id already counted in group_activity}"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('SELECT group_link, last_message_id FROM group_activity_marks')
+            return {row[0]: row[1] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error loading group activity marks: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def record_group_activity(self, group_link, hour, jobs=0, non_jobs=0, duplicates=0, last_message_id=None):
+        """Add one fetch of a group to its hourly activity bucket"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                INSERT INTO group_activity (group_link, hour, fetches, jobs, non_jobs, duplicates)
+                VALUES (?, ?, 1, ?, ?, ?)
+                ON CONFLICT(group_link, hour) DO UPDATE SET
+                    fetches = fetches + 1,
+                    jobs = jobs + excluded.jobs,
+                    non_jobs = non_jobs + excluded.non_jobs,
+                    duplicates = duplicates + excluded.duplicates
+            ''', (group_link, hour, jobs, non_jobs, duplicates))
+            if last_message_id is not None:
+                cursor.execute('''
+                    INSERT INTO group_activity_marks (group_link, last_message_id) VALUES (?, ?)
+                    ON CONFLICT(group_link) DO UPDATE SET
+                        last_message_id = MAX(last_message_id, excluded.last_message_id)
+                ''', (group_link, last_message_id))
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error recording group activity: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def get_group_activity(self, since_hour):
+        """Hourly activity rows (group_link, hour, fetches, jobs, non_jobs, duplicates) since since_hour"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT group_link, hour, fetches, jobs, non_jobs, duplicates
+                FROM group_activity WHERE hour >= ?
+            ''', (since_hour,))
+            return [tuple(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error loading group activity: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def get_open_fetch_cycle(self):
+        """Newest fetch cycle that never finished, as a dict, or None"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT cycle_id, started_at, updated_at, groups_total, groups_done
+                FROM fetch_cycles WHERE finished_at IS NULL
+                ORDER BY cycle_id DESC LIMIT 1
+            ''')
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error loading open fetch cycle: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def start_fetch_cycle(self, groups_total):
+        """
+        Open a new fetch cycle (closing any left open)
+
+        Returns: cycle_id, or None on error
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            now = time.time()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('UPDATE fetch_cycles SET finished_at = ? WHERE finished_at IS NULL', (now,))
+            cursor.execute('INSERT INTO fetch_cycles (started_at, updated_at, groups_total) VALUES (?, ?, ?)',
+                           (now, now, groups_total))
+            cycle_id = cursor.lastrowid
+            cursor.execute('COMMIT')
+            return cycle_id
+        except Exception as e:
+            logger.error(f"Error starting fetch cycle: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    def finish_fetch_cycle(self, cycle_id):
+        """Mark a fetch cycle as completed"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            now = time.time()
+            cursor.execute('UPDATE fetch_cycles SET finished_at = ?, updated_at = ? WHERE cycle_id = ?',
+                           (now, now, cycle_id))
+            return True
+        except Exception as e:
+            logger.error(f"Error finishing fetch cycle: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def get_group_checkpoints(self):
+        """{group_link: {'last_message_id', 'account_name', 'cycle_id'}}"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('SELECT group_link, last_message_id, account_name, cycle_id FROM group_checkpoints')
+            return {row['group_link']: {'last_message_id': row['last_message_id'],
+                                        'account_name': row['account_name'],
+                                        'cycle_id': row['cycle_id']}
+                    for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error loading group checkpoints: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def save_group_checkpoint(self, group_link, last_message_id=None, account_name=None, cycle_id=None):
+        """
+        Persist a group's progress
+
+        last_message_id / account_name: newest message of a complete scan
+        cycle_id: the group is done for this cycle (also advances the cycle)
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            now = time.time()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('INSERT OR IGNORE INTO group_checkpoints (group_link) VALUES (?)', (group_link,))
+            if last_message_id is not None:
+                cursor.execute('''
+                    UPDATE group_checkpoints SET last_message_id = ?, account_name = ?, updated_at = ?
+                    WHERE group_link = ?
+                ''', (last_message_id, account_name, now, group_link))
+            if cycle_id is not None:
+                cursor.execute('''
+                    UPDATE group_checkpoints SET cycle_id = ?, updated_at = ?
+                    WHERE group_link = ? AND cycle_id IS NOT ?
+                ''', (cycle_id, now, group_link, cycle_id))
+                if cursor.rowcount:
+                    cursor.execute('''
+                        UPDATE fetch_cycles SET groups_done = groups_done + 1, updated_at = ?
+                        WHERE cycle_id = ?
+                    ''', (now, cycle_id))
+            cursor.execute('COMMIT')
+            return True
+        except Exception as e:
+            logger.error(f"Error saving group checkpoint: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def ensure_shards(self, num_shards):
+        """Create the lease rows for shards 0..num_shards-1 (and drop any beyond)"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.executemany('INSERT OR IGNORE INTO group_leases (shard) VALUES (?)',
+                               [(shard,) for shard in range(num_shards)])
+            cursor.execute('DELETE FROM group_leases WHERE shard >= ?', (num_shards,))
+            cursor.execute('COMMIT')
+            return True
+        except Exception as e:
+            logger.error(f"Error creating shard leases: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def claim_shard(self, owner, lease_seconds, min_interval):
+        """
+        Lease the shard fetched longest ago, if it is free (or its lease
+        expired) and was not completed within the last min_interval seconds
+
+        Returns: {'shard', 'runs', 'taken_over'} or None
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        now = time.time()
+
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT shard, runs, owner FROM group_leases
+                WHERE (owner IS NULL OR expires_at < ?)
+                  AND (done_at IS NULL OR done_at <= ?)
+                ORDER BY COALESCE(done_at, 0), shard
+                LIMIT 1
+            ''', (now, now - min_interval))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute('COMMIT')
+                return None
+            cursor.execute('UPDATE group_leases SET owner = ?, expires_at = ? WHERE shard = ?',
+                           (owner, now + lease_seconds, row['shard']))
+            cursor.execute('COMMIT')
+            if row['owner'] is not None:
+                logger.warning(f"Shard {row['shard']} lease of {row['owner']} expired, taken over by {owner}")
+            return {'shard': row['shard'], 'runs': row['runs'], 'taken_over': row['owner'] is not None}
+        except Exception as e:
+            logger.error(f"Error claiming shard: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    def renew_lease(self, shard, owner, lease_seconds):
+        """
+        Extend a lease; False if owner no longer holds it
+
+        Database errors (e.g. 'database is locked') are raised, not reported
+        as a lost lease: the heartbeat retries them while the lease runs.
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('UPDATE group_leases SET expires_at = ? WHERE shard = ? AND owner = ?',
+                           (time.time() + lease_seconds, shard, owner))
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def release_shard(self, shard, owner, completed=True):
+        """Give a lease back; completed marks the shard as fetched now"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            if completed:
+                cursor.execute('''
+                    UPDATE group_leases SET owner = NULL, expires_at = NULL, done_at = ?, runs = runs + 1
+                    WHERE shard = ? AND owner = ?
+                ''', (time.time(), shard, owner))
+            else:
+                cursor.execute('''
+                    UPDATE group_leases SET owner = NULL, expires_at = NULL
+                    WHERE shard = ? AND owner = ?
+                ''', (shard, owner))
+            return cursor.rowcount == 1
+        except Exception as e:
+            logger.error(f"Error releasing shard lease: {e}")
+            return False
+        finally:
+            conn.close()
+
     def get_joined_groups(self):
         """Get all joined groups"""
         conn = self.connect()
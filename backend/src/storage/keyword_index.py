@@ -0,0 +1,64 @@
+"""
+Normalized keyword index
+
+messages.keywords_found keeps the classifier's keywords as one comma
+separated string. For analytics they are also stored normalized:
+
+    keywords(keyword_id, keyword)               one row per distinct keyword
+    message_keywords(message_rowid, keyword_id) one row per keyword of a message
+
+message_rowid is messages.id; a trigger deletes a message's rows with it
+(migration 14). The primary key (message_rowid, keyword_id) serves
+per-message and per-group lookups, idx_message_keywords_keyword
+(keyword_id, message_rowid) serves keyword counts; both cover the table, so
+keyword GROUP BY queries never read message bodies.
+"""
+
+
+def split_keywords(keywords):
+    """Keyword list from a keywords_found string (or an already split list)"""
+    if not keywords:
+        return []
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    return list(dict.fromkeys(kw.strip() for kw in keywords if kw and kw.strip()))
+
+
+def index_message_keywords(cursor, message_rowid, keywords, replace=False):
+    """
+    Store the keywords of one message
+
+    replace: drop the message's previous keywords first (re-classified rows)
+    """
+    if replace:
+        cursor.execute('DELETE FROM message_keywords WHERE message_rowid = ?', (message_rowid,))
+    for keyword in split_keywords(keywords):
+        cursor.execute('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)', (keyword,))
+        cursor.execute('''
+            INSERT OR IGNORE INTO message_keywords (message_rowid, keyword_id)
+            SELECT ?, keyword_id FROM keywords WHERE keyword = ?
+        ''', (message_rowid, keyword))
+
+
+def index_keyword_batch(cursor, rows, keyword_ids):
+    """
+    Store the keywords of many messages at once (backfills)
+
+    rows: (message_rowid, keywords_found); keyword_ids: keyword -> keyword_id
+    cache, filled in as new keywords are inserted
+
+    Returns: number of (message, keyword) rows added
+    """
+    pairs = []
+    for message_rowid, keywords_found in rows:
+        for keyword in split_keywords(keywords_found):
+            keyword_id = keyword_ids.get(keyword)
+            if keyword_id is None:
+                cursor.execute('INSERT OR IGNORE INTO keywords (keyword) VALUES (?)', (keyword,))
+                keyword_id = keyword_ids[keyword] = cursor.execute(
+                    'SELECT keyword_id FROM keywords WHERE keyword = ?', (keyword,)).fetchone()[0]
+            pairs.append((message_rowid, keyword_id))
+
+    before = cursor.connection.total_changes
+    cursor.executemany('INSERT OR IGNORE INTO message_keywords (message_rowid, keyword_id) VALUES (?, ?)', pairs)
+    return cursor.connection.total_changes - before
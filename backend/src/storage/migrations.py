@@ -0,0 +1,544 @@
+"""
+Versioned schema migrations
+
+The schema version lives in the database header (PRAGMA user_version) and
+migrate() brings a database up to date once per process, before anything
+else touches it. Each migration runs in its own transaction together with
+its version bump, so an interrupted upgrade is simply retried on the next
+start and two processes starting together cannot apply one twice.
+Backfills of existing rows (BACKFILLS) run after their migration in
+batches of short transactions, and bump the version when done.
+
+Databases created before versioning report version 0 while already having
+most of the tables, so migrations are written to be safe on any earlier
+state: CREATE ... IF NOT EXISTS, and columns go through _add_column.
+
+To change the schema, append a function to MIGRATIONS. Never edit or
+reorder one that has shipped.
+"""
+import os
+import sqlite3
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.logger import get_logger
+
+logger = get_logger('migrations')
+
+# Databases already migrated by this process
+_migrated = set()
+
+
+def _columns(cursor, table):
+    return [row[1] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()]
+
+
+def _add_column(cursor, table, column, declaration):
+    """ALTER TABLE ... ADD COLUMN unless it exists; returns True if added"""
+    if column in _columns(cursor, table):
+        return False
+    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+    return True
+
+
+def _initial_schema(cursor):
+    """Category tables, messages, groups, daily stats and account usage"""
+    # Base fields for all job tables
+    job_table_schema = '''(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        message_id TEXT UNIQUE NOT NULL,
+        group_name TEXT NOT NULL,
+        group_link TEXT,
+        sender TEXT,
+        date TIMESTAMP,
+        message_text TEXT,
+        keywords_found TEXT,
+        account_used TEXT,
+
+        -- Enhanced Company Information
+        company_name TEXT,
+        company_website TEXT,
+        company_linkedin TEXT,
+
+        -- Job Details
+        skills_required TEXT,
+        salary_range TEXT,
+        job_location TEXT,
+        work_mode TEXT,
+        experience_required TEXT,
+        job_type TEXT,
+        application_deadline TEXT,
+        contact_info TEXT,
+
+        -- Verification
+        is_verified BOOLEAN DEFAULT 0,
+        verification_score REAL DEFAULT 0.0,
+
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )'''
+
+    for table in ('tech_jobs', 'non_tech_jobs', 'freelance_jobs', 'fresher_jobs'):
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {table} {job_table_schema}')
+
+    # All Messages table (for backup/reference)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT UNIQUE NOT NULL,
+            group_name TEXT NOT NULL,
+            group_link TEXT,
+            sender TEXT,
+            date TIMESTAMP,
+            message_text TEXT,
+            job_type TEXT,
+            keywords_found TEXT,
+            account_used TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_name TEXT NOT NULL,
+            group_link TEXT UNIQUE NOT NULL,
+            join_date TIMESTAMP,
+            account_used TEXT,
+            messages_fetched INTEGER DEFAULT 0,
+            last_message_date TIMESTAMP,
+            last_checked TIMESTAMP,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE UNIQUE NOT NULL,
+            groups_joined INTEGER DEFAULT 0,
+            messages_fetched INTEGER DEFAULT 0,
+            tech_jobs INTEGER DEFAULT 0,
+            non_tech_jobs INTEGER DEFAULT 0,
+            freelance_jobs INTEGER DEFAULT 0,
+            accounts_used TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS account_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_name TEXT NOT NULL,
+            date DATE NOT NULL,
+            groups_joined INTEGER DEFAULT 0,
+            messages_fetched INTEGER DEFAULT 0,
+            last_action TIMESTAMP,
+            UNIQUE(account_name, date)
+        )
+    ''')
+
+
+def _messages_job_location(cursor):
+    """messages.job_location"""
+    _add_column(cursor, 'messages', 'job_location', 'TEXT')
+
+
+def _near_duplicate_clusters(cursor):
+    """messages.cluster_id and job_clusters (see src/services/near_duplicate.py)"""
+    # message_id of the first copy of a cross-posted job
+    _add_column(cursor, 'messages', 'cluster_id', 'TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_cluster_id ON messages(cluster_id)')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_clusters (
+            cluster_id TEXT PRIMARY KEY,
+            simhash INTEGER NOT NULL,
+            job_type TEXT,
+            member_count INTEGER DEFAULT 0,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_clusters_last_seen ON job_clusters(last_seen)')
+
+
+def _application_links(cursor):
+    """application_links, extracted once at ingest (read by auto_apply.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_links (
+            message_id TEXT PRIMARY KEY,
+            application_type TEXT NOT NULL,
+            application_link TEXT,
+            urls TEXT,
+            emails TEXT,
+            job_type TEXT,
+            date TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_application_links_type_date
+        ON application_links(application_type, date)
+    ''')
+
+
+def _archive_watermarks(cursor):
+    """archive_watermarks (see src/storage/archive.py)"""
+    # Newest Telegram message id moved to the archive, per chat; the
+    # fetcher stops at these so archived posts are not ingested again
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_watermarks (
+            entity_id TEXT PRIMARY KEY,
+            max_message_id INTEGER NOT NULL
+        )
+    ''')
+
+
+def _compression_dicts(cursor):
+    """compression_dicts (see src/storage/compression.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS compression_dicts (
+            dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codec INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _content_hash(cursor):
+    """messages.content_hash (unique) and reposts"""
+    # Existing rows are hashed afterwards by _backfill_content_hash
+    _add_column(cursor, 'messages', 'content_hash', 'INTEGER')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_content_hash ON messages(content_hash)')
+
+    # Exact reposts of a stored message (same normalized text, other message_id)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reposts (
+            message_id TEXT PRIMARY KEY,
+            original_message_id TEXT NOT NULL,
+            group_name TEXT,
+            date TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reposts_original ON reposts(original_message_id)')
+
+
+def _backfill_content_hash(conn, batch_size=None):
+    """
+    Hash stored messages in id-range batches, one short transaction each
+
+    Only the first copy of each text gets its hash: the unique index makes
+    UPDATE OR IGNORE skip later copies. Rows already hashed are skipped, so
+    an interrupted backfill picks up where it stopped.
+
+    Returns: number of messages hashed
+    """
+    from src.services.near_duplicate import content_hash
+
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM messages').fetchone()[0]
+    hashed = 0
+    for batch_start in range(0, max_id, batch_size):
+        rows = conn.execute('''
+            SELECT id, message_text FROM messages
+            WHERE id > ? AND id <= ? AND content_hash IS NULL
+            ORDER BY id
+        ''', (batch_start, batch_start + batch_size)).fetchall()
+        if not rows:
+            continue
+        before = conn.total_changes
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('UPDATE OR IGNORE messages SET content_hash = ? WHERE id = ?',
+                             [(content_hash(message_text), row_id) for row_id, message_text in rows])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        hashed += conn.total_changes - before
+    if hashed:
+        logger.info(f"Backfilled content hashes for {hashed} messages")
+    return hashed
+
+
+def _messages_date_indexes(cursor):
+    """Indexes for the dashboard's date and per-group queries"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_date ON messages(date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_group_date ON messages(group_name, date)')
+
+
+def _message_keywords(cursor):
+    """keywords and message_keywords (see src/storage/keyword_index.py)"""
+    # Existing messages are indexed afterwards by _backfill_message_keywords
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keywords (
+            keyword_id INTEGER PRIMARY KEY,
+            keyword TEXT UNIQUE NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS message_keywords (
+            message_rowid INTEGER NOT NULL,
+            keyword_id INTEGER NOT NULL,
+            PRIMARY KEY (message_rowid, keyword_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_message_keywords_keyword
+        ON message_keywords(keyword_id, message_rowid)
+    ''')
+
+
+def _backfill_message_keywords(conn, batch_size=None):
+    """
+    Index keywords_found of stored messages in id-range batches, one short
+    transaction each
+
+    Messages that already have keyword rows (indexed at insert, or by an
+    interrupted run of this backfill) are skipped.
+
+    Returns: number of (message, keyword) rows added
+    """
+    from src.storage.keyword_index import index_keyword_batch
+
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM messages').fetchone()[0]
+    keyword_ids = dict(conn.execute('SELECT keyword, keyword_id FROM keywords').fetchall())
+    added = 0
+    for batch_start in range(0, max_id, batch_size):
+        rows = conn.execute('''
+            SELECT id, keywords_found FROM messages m
+            WHERE id > ? AND id <= ? AND keywords_found IS NOT NULL AND keywords_found != ''
+              AND NOT EXISTS (SELECT 1 FROM message_keywords WHERE message_rowid = m.id)
+            ORDER BY id
+        ''', (batch_start, batch_start + batch_size)).fetchall()
+        if not rows:
+            continue
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            added += index_keyword_batch(cursor, rows, keyword_ids)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    if added:
+        logger.info(f"Backfilled {added} message keywords")
+    return added
+
+
+def _message_counts(cursor):
+    """message_counts, kept by triggers on messages (see src/utils/report_engine.py)"""
+    # Rows per (group, job type); NULLs are stored as '' so the key stays unique
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS message_counts (
+            group_link TEXT NOT NULL,
+            group_name TEXT NOT NULL,
+            job_type TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            last_date TIMESTAMP,
+            PRIMARY KEY (group_link, group_name, job_type)
+        )
+    ''')
+    cursor.execute('DELETE FROM message_counts')
+    cursor.execute('''
+        INSERT INTO message_counts (group_link, group_name, job_type, count, last_date)
+        SELECT IFNULL(group_link, ''), IFNULL(group_name, ''), IFNULL(job_type, ''), COUNT(*), MAX(date)
+        FROM messages
+        GROUP BY 1, 2, 3
+    ''')
+
+    key = "group_link = IFNULL({row}.group_link, '') AND group_name = IFNULL({row}.group_name, '') " \
+          "AND job_type = IFNULL({row}.job_type, '')"
+    add_new = '''
+        INSERT INTO message_counts (group_link, group_name, job_type, count, last_date)
+        VALUES (IFNULL(NEW.group_link, ''), IFNULL(NEW.group_name, ''), IFNULL(NEW.job_type, ''), 1, NEW.date)
+        ON CONFLICT (group_link, group_name, job_type) DO UPDATE
+        SET count = count + 1,
+            last_date = MAX(IFNULL(last_date, excluded.last_date), IFNULL(excluded.last_date, last_date));
+    '''
+    remove_old = f'''
+        UPDATE message_counts SET count = count - 1 WHERE {key.format(row='OLD')};
+        DELETE FROM message_counts WHERE {key.format(row='OLD')} AND count <= 0;
+    '''
+    # last_date is never lowered: deletes only archive the oldest rows, and a
+    # re-typed row keeps its date within the same group
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_message_counts_insert AFTER INSERT ON messages BEGIN {add_new} END')
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_message_counts_delete AFTER DELETE ON messages BEGIN {remove_old} END')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_message_counts_update
+        AFTER UPDATE OF group_link, group_name, job_type ON messages
+        BEGIN {remove_old} {add_new} END
+    ''')
+
+    # "New jobs in last 24h" becomes an index range
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages(created_at)')
+
+
+def _group_activity(cursor):
+    """group_activity hourly counters (see src/services/group_trends.py)"""
+    # One row per group and fetch hour (unix time // 3600)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_activity (
+            group_link TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            fetches INTEGER NOT NULL DEFAULT 0,
+            jobs INTEGER NOT NULL DEFAULT 0,
+            non_jobs INTEGER NOT NULL DEFAULT 0,
+            duplicates INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (group_link, hour)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_group_activity_hour ON group_activity(hour)')
+
+    # Newest Telegram message id already counted, per group
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_activity_marks (
+            group_link TEXT PRIMARY KEY,
+            last_message_id INTEGER NOT NULL
+        )
+    ''')
+
+
+def _group_leases(cursor):
+    """group_leases for sharded workers (TelegramJobFetcher.run_sharded)"""
+    # owner/expires_at: current lease (NULL = free); done_at: last completed fetch
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_leases (
+            shard INTEGER PRIMARY KEY,
+            owner TEXT,
+            expires_at REAL,
+            done_at REAL,
+            runs INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+
+def _fetch_checkpoints(cursor):
+    """fetch_cycles / group_checkpoints: resumable fetch cycles"""
+    # finished_at NULL = cycle still open (running or interrupted)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fetch_cycles (
+            cycle_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            finished_at REAL,
+            groups_total INTEGER NOT NULL DEFAULT 0,
+            groups_done INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # last_message_id: newest message of the last complete scan by account_name
+    # cycle_id: cycle that last completed the group
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_checkpoints (
+            group_link TEXT PRIMARY KEY,
+            last_message_id INTEGER NOT NULL DEFAULT 0,
+            account_name TEXT,
+            cycle_id INTEGER,
+            updated_at REAL
+        )
+    ''')
+
+
+def _message_keywords_delete(cursor):
+    """message_keywords rows are deleted with their message"""
+    # The archiver moves keyword rows before deleting messages; this covers
+    # every other delete, so keyword counts never include deleted messages
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_message_keywords_delete AFTER DELETE ON messages
+        BEGIN DELETE FROM message_keywords WHERE message_rowid = OLD.id; END
+    ''')
+
+
+# Version N is MIGRATIONS[N - 1]
+MIGRATIONS = [
+    _initial_schema,
+    _messages_job_location,
+    _near_duplicate_clusters,
+    _application_links,
+    _archive_watermarks,
+    _compression_dicts,
+    _content_hash,
+    _messages_date_indexes,
+    _message_keywords,
+    _message_counts,
+    _group_activity,
+    _group_leases,
+    _fetch_checkpoints,
+    _message_keywords_delete,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Data backfills run after their migration's schema change, in batches of
+# short transactions (not one long write lock); the version is bumped when
+# the backfill has finished, so an interrupted one resumes on the next start
+BACKFILLS = {
+    _content_hash: _backfill_content_hash,
+    _message_keywords: _backfill_message_keywords,
+}
+BACKFILL_BATCH_SIZE = 5000
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db_path):
+    """
+    Bring the database at `db_path` up to SCHEMA_VERSION (once per process)
+
+    Returns: the version the database was at
+    """
+    db_path = os.path.abspath(db_path)
+    if db_path in _migrated and os.path.exists(db_path):
+        return SCHEMA_VERSION
+
+    new_database = not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+    try:
+        if new_database:
+            # Must be set before WAL mode and the first table; lets
+            # maintenance free pages with PRAGMA incremental_vacuum
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+
+        start = schema_version(conn)
+        if start > SCHEMA_VERSION:
+            logger.warning(f"Database schema v{start} is newer than this code (v{SCHEMA_VERSION})")
+
+        cursor = conn.cursor()
+        for version, migration in enumerate(MIGRATIONS, start=1):
+            if version <= start:
+                continue
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                # Another process may have applied it while we waited for the lock
+                if schema_version(conn) >= version:
+                    cursor.execute('ROLLBACK')
+                    continue
+                migration(cursor)
+                backfill = BACKFILLS.get(migration)
+                if backfill is None:
+                    cursor.execute(f'PRAGMA user_version = {version}')
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            if backfill is not None:
+                backfill(conn)
+                cursor.execute('BEGIN IMMEDIATE')
+                if schema_version(conn) < version:
+                    cursor.execute(f'PRAGMA user_version = {version}')
+                cursor.execute('COMMIT')
+            logger.info(f"Applied schema migration {version}: {migration.__doc__}")
+
+        _migrated.add(db_path)
+        return start
+    finally:
+        conn.close()
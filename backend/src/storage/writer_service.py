@@ -0,0 +1,131 @@
+"""
+Single-writer service for sharded fetching
+
+One process (python run.py --writer) owns the SQLite database and the CSV
+files. Workers - on the same host or on other hosts - reach its
+DatabaseHandler and CSVHandler through multiprocessing.managers proxies,
+so every write, including the shard leases, is executed by that one
+process, one call at a time.
+
+The database file is only ever opened by the writer's host: SQLite's WAL
+mode needs shared memory between its clients, which a network filesystem
+cannot provide, so hosts share data.json (and the config) through the
+export and talk to the writer over TCP for everything else.
+
+    manager = connect_writer()
+    db, csv_handler = manager.database(), manager.csv()
+    db.insert_message(message_data)
+"""
+import os
+import sys
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import SHARDING, RUNTIME
+from src.storage.csv_handler import CSVHandler
+from src.storage.database import DatabaseHandler
+from src.utils.logger import get_logger
+
+logger = get_logger('writer_service')
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def _public_methods(cls):
+    return [name for name in dir(cls) if not name.startswith('_') and callable(getattr(cls, name))]
+
+
+class _Serialized:
+    """Proxy target: forwards method calls to `target`, one at a time across all workers"""
+
+    def __init__(self, target, lock):
+        self._target = target
+        self._lock = lock
+
+    def __getattr__(self, name):
+        method = getattr(self._target, name)
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return method(*args, **kwargs)
+        return call
+
+
+class WriterManager(BaseManager):
+    pass
+
+
+# Client side registrations (the server registers the same names with callables)
+WriterManager.register('database', exposed=_public_methods(DatabaseHandler))
+WriterManager.register('csv', exposed=_public_methods(CSVHandler))
+
+
+def _address():
+    return (SHARDING['writer_host'], SHARDING['writer_port'])
+
+
+def _authkey():
+    return (SHARDING['authkey'] or 'telegram-job-fetcher-local').encode()
+
+
+def _run_maintenance_loop(interval):
+    """Backup / checkpoint / archive when due; only the writer touches the file"""
+    from src.utils.maintenance import run_database_maintenance
+    while True:
+        time.sleep(interval)
+        try:
+            run_database_maintenance()
+        except Exception as e:
+            logger.error(f"Error in writer maintenance: {e}")
+
+
+def serve_writer():
+    """Serve the database and CSV handlers to workers until interrupted"""
+    host, port = _address()
+    if host not in LOOPBACK_HOSTS and not SHARDING['authkey']:
+        logger.error("FETCHER_WRITER_AUTHKEY must be set when the writer listens beyond loopback")
+        return False
+
+    db = DatabaseHandler()
+    db.ensure_shards(SHARDING['num_shards'])
+    lock = threading.Lock()
+    database = _Serialized(db, lock)
+    csv_handler = _Serialized(CSVHandler(), lock)
+
+    class _ServerManager(BaseManager):
+        pass
+
+    _ServerManager.register('database', callable=lambda: database, exposed=_public_methods(DatabaseHandler))
+    _ServerManager.register('csv', callable=lambda: csv_handler, exposed=_public_methods(CSVHandler))
+
+    threading.Thread(target=_run_maintenance_loop, args=(RUNTIME.get('check_interval', 3600),),
+                     daemon=True, name='writer-maintenance').start()
+
+    server = _ServerManager(address=(host, port), authkey=_authkey()).get_server()
+    logger.info(f"✍️  Writer serving {db.db_path} on {host}:{port} "
+                f"({SHARDING['num_shards']} shards)")
+    server.serve_forever()
+    return True
+
+
+def connect_writer(retries=5, retry_delay=5):
+    """
+    Connect to the writer
+
+    Returns: connected WriterManager (manager.database(), manager.csv())
+    """
+    manager = WriterManager(address=_address(), authkey=_authkey())
+    for attempt in range(retries):
+        try:
+            manager.connect()
+            return manager
+        except (ConnectionError, OSError) as e:
+            if attempt == retries - 1:
+                raise
+            logger.warning(f"Writer at {_address()[0]}:{_address()[1]} not reachable ({e}), "
+                           f"retrying in {retry_delay}s...")
+            time.sleep(retry_delay)
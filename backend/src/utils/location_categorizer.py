@@ -1,13 +1,26 @@
 """
 Location categorization utility
 Categorizes job locations into: Pan India, Remote, International, or specific city
+
+Use the shared instance (`from src.utils.location_categorizer import categorizer`):
+its keyword patterns are compiled once and categorize() is memoized.
 """
 import re
 
+from src.utils.memo import LRUCache, text_key
+
+CACHE_SIZE = 8192  # Memoized categorize() results
+
+
+def _keyword_re(keywords):
+    """One pattern for `any(keyword in text for keyword in keywords)`"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
 class LocationCategorizer:
-    """Categorize job locations"""
+    """Categorize job locations (thread-safe; categorize() is memoized)"""
     
-    def __init__(self):
+    def __init__(self, cache_size=CACHE_SIZE):
         # Pan India keywords
         self.pan_india_keywords = [
             'pan india', 'pan-india', 'panindia', 'all india', 'anywhere in india',
@@ -39,6 +52,16 @@ class LocationCategorizer:
             'indore', 'bhopal', 'nagpur', 'surat', 'vadodara', 'rajkot', 'goa',
             'mysore', 'coimbatore', 'vishakhapatnam', 'vijayawada', 'patna', 'raipur'
         ]
+        
+        # Each keyword list as one pattern: a single scan instead of one per keyword
+        self._pan_india_re = _keyword_re(self.pan_india_keywords)
+        self._remote_re = _keyword_re(self.remote_keywords)
+        self._international_re = _keyword_re(self.international_keywords)
+        self._indian_re = _keyword_re(['india'] + self.indian_cities)
+        
+        # LRU of results: key is the location, or a hash of the message text
+        # when there is no location (the only case the text is read)
+        self.cache = LRUCache(cache_size)
     
     def categorize(self, location_text, message_text=None):
         """
@@ -51,47 +74,43 @@ class LocationCategorizer:
         Returns:
             str: 'Pan India', 'Remote', 'International', or the original location
         """
+        if location_text:
+            key = location_text
+        elif message_text:
+            key = text_key(message_text)
+        else:
+            return ''
+        
+        result = self.cache.get(key)
+        if result is None:
+            result = self.cache.put(key, self._categorize(location_text, message_text))
+        return result
+    
+    def _categorize(self, location_text, message_text):
         if not location_text:
             # If no location, check message text for remote keywords
-            if message_text:
-                text_lower = message_text.lower()
-                if any(kw in text_lower for kw in self.remote_keywords):
-                    return 'Remote'
+            if self._remote_re.search(message_text.lower()):
+                return 'Remote'
             return ''
         
         location_lower = location_text.lower().strip()
         
         # Check for Pan India keywords
-        for keyword in self.pan_india_keywords:
-            if keyword in location_lower:
-                return 'Pan India'
+        if self._pan_india_re.search(location_lower):
+            return 'Pan India'
         
         # Check for Remote keywords
-        for keyword in self.remote_keywords:
-            if keyword in location_lower:
-                return 'Remote'
+        if self._remote_re.search(location_lower):
+            return 'Remote'
         
         # Check for International keywords
-        for keyword in self.international_keywords:
-            if keyword in location_lower:
-                return 'International'
+        if self._international_re.search(location_lower):
+            return 'International'
         
-        # If location contains "india" or "indian", it's Pan India (regardless of city)
-        if 'india' in location_lower or 'indian' in location_lower:
+        # If location contains "india" / "indian" or a specific Indian city, it's Pan India
+        if self._indian_re.search(location_lower):
             return 'Pan India'
         
-        # If it's a specific Indian city, it's also Pan India
-        if any(city in location_lower for city in self.indian_cities):
-            return 'Pan India'
-        
-        # If message text contains "india" or Indian cities but location is empty, it's Pan India
-        if message_text and not location_text:
-            msg_lower = message_text.lower()
-            if 'india' in msg_lower or any(city in msg_lower for city in self.indian_cities):
-                # Check if it's not international
-                if not any(kw in msg_lower for kw in self.international_keywords):
-                    return 'Pan India'
-        
         # Default: return as-is (could be a specific city name from other countries)
         return location_text.strip()
     
@@ -113,3 +132,6 @@ class LocationCategorizer:
         else:
             return 'specific_city'
 
+
+# Shared instance for the dashboard routes
+categorizer = LocationCategorizer()
@@ -1,9 +1,25 @@
 """
 Logging utility for the Telegram automation system
+
+All loggers share one background QueueListener: callers (including the
+asyncio fetch loop) only put records on an in-memory queue, and a listener
+thread does the console output and rotating file writes. Each logger name gets
+its handlers registered exactly once, no matter how often get_logger() is
+called for it.
+
+shutdown_logging() (also run at exit) drains the queue and detaches the
+loggers; the next record sets the backend up again, writing synchronously
+once the process is exiting so nothing is left in an undrained queue.
 """
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
 from datetime import datetime
 
 # Add project root to path
@@ -11,53 +27,237 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from config.settings import LOGGING, PATHS
 
+_setup_lock = threading.Lock()
+_loggers = {}
+_router = None
+_queue_handler = None
+_listener = None
+_exiting = False
+_atexit_registered = False
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line (structured mode)"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        # Optional structured fields: logger.info("...", extra={'fields': {...}})
+        fields = getattr(record, 'fields', None)
+        if isinstance(fields, dict):
+            entry.update(fields)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Formatted before it was queued (see _QueueHandler)
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback
+
+    The stock prepare() merges the traceback into the message and drops
+    exc_info / exc_text, so the JSON formatter had no exception field. Here
+    the message is only %-merged and the traceback travels as exc_text,
+    which both formatters on the listener side emit.
+    """
+
+    def prepare(self, record):
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _exception_formatter.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None  # Tracebacks don't pickle / outlive their frames
+        record.exc_text = exc_text
+        return record
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _RoutingHandler(logging.Handler):
+    """Console output plus one rotating log file per logger name"""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self._text_formatter = logging.Formatter(LOGGING['format'], datefmt=LOGGING['date_format'])
+        self._structured = bool(LOGGING.get('structured'))
+        if self._structured:
+            self._file_formatter = JsonLinesFormatter(datefmt=LOGGING['date_format'])
+        else:
+            self._file_formatter = self._text_formatter
+
+        self._console = logging.StreamHandler()
+        self._console.setLevel(logging.INFO)
+        self._console.setFormatter(self._text_formatter)
+        self._file_handlers = {}
+
+    def _file_handler(self, name):
+        handler = self._file_handlers.get(name)
+        if handler is not None:
+            return handler
+
+        os.makedirs(PATHS['logs'], exist_ok=True)
+        extension = 'jsonl' if self._structured else 'log'
+        rotation = LOGGING.get('rotation', 'size')
+
+        if rotation == 'time':
+            # The handler appends a date suffix to rotated files itself
+            log_file = os.path.join(PATHS['logs'], f"{name}.{extension}")
+            handler = logging.handlers.TimedRotatingFileHandler(
+                log_file,
+                when=LOGGING.get('when', 'midnight'),
+                backupCount=LOGGING.get('backup_count', 7),
+                encoding='utf-8',
+                delay=True
+            )
+        elif rotation == 'size':
+            log_file = os.path.join(PATHS['logs'], f"{name}_{datetime.now().strftime('%Y%m%d')}.{extension}")
+            handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=LOGGING.get('max_bytes', 10 * 1024 * 1024),
+                backupCount=LOGGING.get('backup_count', 7),
+                encoding='utf-8',
+                delay=True
+            )
+        else:
+            log_file = os.path.join(PATHS['logs'], f"{name}_{datetime.now().strftime('%Y%m%d')}.{extension}")
+            handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(self._file_formatter)
+        self._file_handlers[name] = handler
+        return handler
+
+    def emit(self, record):
+        try:
+            if record.levelno >= self._console.level:
+                self._console.handle(record)
+            self._file_handler(record.name).handle(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self._console.flush()
+        for handler in self._file_handlers.values():
+            handler.flush()
+
+    def close(self):
+        for handler in self._file_handlers.values():
+            handler.close()
+        self._file_handlers.clear()
+        super().close()
+
+
+def _get_backend_handler():
+    """Create the shared handler (and listener thread) once per process"""
+    global _router, _queue_handler, _listener, _atexit_registered
+
+    if _router is not None:
+        return _queue_handler or _router
+
+    _router = _RoutingHandler()
+    # At exit the listener thread (a daemon) may not get to drain the queue
+    if LOGGING.get('backend', 'queue') == 'queue' and not _exiting:
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, _router, respect_handler_level=True)
+        _listener.start()
+        if not _atexit_registered:
+            atexit.register(_shutdown_at_exit)
+            _atexit_registered = True
+        return _queue_handler
+    return _router
+
+
+def shutdown_logging():
+    """
+    Drain the queue and close all log files (safe to call repeatedly)
+
+    Loggers are detached from the backend first; their next record sets it
+    up again.
+    """
+    global _router, _queue_handler, _listener
+    with _setup_lock:
+        handler = _queue_handler or _router
+        for logger in _loggers.values():
+            if handler is not None:
+                logger.logger.removeHandler(handler)
+            logger._configured = False
+        if _listener is not None:
+            _listener.stop()
+        if _router is not None:
+            try:
+                _router.flush()
+            except (ValueError, OSError):
+                # Console stream already closed (e.g. pytest capture at exit)
+                pass
+            _router.close()
+        _router = _queue_handler = _listener = None
+
+
+def _shutdown_at_exit():
+    global _exiting
+    _exiting = True
+    shutdown_logging()
+
+
 class Logger:
-    """Custom logger with file and console output"""
-    
-    def __init__(self, name, log_file=None):
+    """Custom logger with file and console output
+
+    Handlers are registered on first use rather than at import time, so
+    modules that only import a logger stay cheap to load.
+    """
+
+    def __init__(self, name):
+        self.name = name
         self.logger = logging.getLogger(name)
         self.logger.setLevel(getattr(logging, LOGGING['level']))
-        
-        # Create logs directory if it doesn't exist
-        os.makedirs(PATHS['logs'], exist_ok=True)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            LOGGING['format'],
-            datefmt=LOGGING['date_format']
-        )
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-        
-        # File handler
-        if log_file is None:
-            log_file = f"{PATHS['logs']}{name}_{datetime.now().strftime('%Y%m%d')}.log"
-        
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-    
-    def info(self, message):
-        self.logger.info(message)
-    
-    def debug(self, message):
-        self.logger.debug(message)
-    
-    def warning(self, message):
-        self.logger.warning(message)
-    
-    def error(self, message):
-        self.logger.error(message)
-    
-    def critical(self, message):
-        self.logger.critical(message)
+        self._configured = False
 
-def get_logger(name):
-    """Factory function to get logger instance"""
-    return Logger(name)
+    def _configure(self):
+        """Attach the shared backend handler exactly once"""
+        with _setup_lock:
+            handler = _get_backend_handler()
+            if handler not in self.logger.handlers:
+                self.logger.addHandler(handler)
+            # Our handler does console + file; don't also bubble up to root
+            self.logger.propagate = False
+            self._configured = True
+
+    def _log(self, level, message, *args, **kwargs):
+        if not self._configured:
+            self._configure()
+        kwargs.setdefault('stacklevel', 3)
+        self.logger.log(level, message, *args, **kwargs)
+
+    def info(self, message, *args, **kwargs):
+        self._log(logging.INFO, message, *args, **kwargs)
 
+    def debug(self, message, *args, **kwargs):
+        self._log(logging.DEBUG, message, *args, **kwargs)
+
+    def warning(self, message, *args, **kwargs):
+        self._log(logging.WARNING, message, *args, **kwargs)
+
+    def error(self, message, *args, **kwargs):
+        self._log(logging.ERROR, message, *args, **kwargs)
+
+    def critical(self, message, *args, **kwargs):
+        self._log(logging.CRITICAL, message, *args, **kwargs)
+
+def get_logger(name):
+    """Factory function to get logger instance (one shared instance per name)"""
+    logger = _loggers.get(name)
+    if logger is None:
+        with _setup_lock:
+            logger = _loggers.setdefault(name, Logger(name))
+    return logger
@@ -2,13 +2,16 @@
 Maintenance utilities for automatic database and CSV synchronization
 """
 import csv
+import glob
+import json
 import sqlite3
 import os
+import time
 from datetime import datetime
 
-from config.settings import PATHS, DATABASE
-from src.services.classifier import MessageClassifier
+from config.settings import PATHS, DATABASE, DB_MAINTENANCE, ARCHIVE, GROUP_TRENDS
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger('maintenance')
 
@@ -27,7 +30,7 @@ def fix_empty_job_types(db_path=None):
         
         # Get all messages with empty or null job_type
         cursor.execute('''
-            SELECT message_id, message_text 
+            SELECT id, message_id, message_text 
             FROM messages 
             WHERE job_type IS NULL OR job_type = ''
         ''')
@@ -37,19 +40,24 @@ def fix_empty_job_types(db_path=None):
         
         if total == 0:
             logger.info("All messages already have job_type")
+            _sync_category_tables(conn)
+            conn.commit()
             conn.close()
             return 0, 0
         
         logger.info(f"Found {total} messages with empty job_type, fixing...")
         
-        # Initialize classifier
+        # Initialize classifier (imported lazily - only needed when fixing rows)
+        from src.services.classifier import MessageClassifier
+        from src.storage.keyword_index import index_message_keywords
         classifier = MessageClassifier()
         
         # Process each message
         fixed = 0
         skipped = 0
+        fixed_ids = []
         
-        for message_id, message_text in messages:
+        for message_rowid, message_id, message_text in messages:
             try:
                 # Classify the message
                 job_type, keywords = classifier.classify(message_text)
@@ -63,8 +71,10 @@ def fix_empty_job_types(db_path=None):
                         SET job_type = ?, keywords_found = ?
                         WHERE message_id = ?
                     ''', (job_type, keywords_str, message_id))
+                    index_message_keywords(cursor, message_rowid, keywords, replace=True)
                     
                     fixed += 1
+                    fixed_ids.append(message_id)
                 else:
                     skipped += 1
             
@@ -75,8 +85,8 @@ def fix_empty_job_types(db_path=None):
         # Commit changes
         conn.commit()
         
-        # Copy to category-specific tables
-        _sync_category_tables(conn)
+        # Copy new and re-classified rows to category-specific tables
+        _sync_category_tables(conn, fixed_ids)
         
         conn.commit()
         conn.close()
@@ -89,62 +99,138 @@ def fix_empty_job_types(db_path=None):
         return 0, 0
 
 
-def _sync_category_tables(conn):
-    """Sync category-specific tables from messages table"""
-    cursor = conn.cursor()
-    
-    # Tech jobs
+# Category table -> messages predicate (same split as the CSV export)
+CATEGORY_FILTERS = {
+    'tech_jobs': "job_type LIKE '%tech%' AND job_type NOT LIKE '%non_tech%'",
+    'non_tech_jobs': "job_type = 'non_tech'",
+    'freelance_jobs': "job_type LIKE '%freelance%'",
+    'fresher_jobs': "job_type LIKE '%fresher%'",
+}
+
+SYNC_WATERMARK = 'category_sync_last_id'
+
+
+def _get_state(cursor, name, default=0):
     cursor.execute('''
-        SELECT message_id, group_name, group_link, sender, date, message_text,
-               keywords_found, account_used, job_type
-        FROM messages 
-        WHERE job_type LIKE '%tech%' AND job_type NOT LIKE '%non_tech%'
+        CREATE TABLE IF NOT EXISTS maintenance_state (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
     ''')
-    tech_messages = cursor.fetchall()
+    cursor.execute('SELECT value FROM maintenance_state WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    return row[0] if row else default
+
+
+def _set_state(cursor, name, value):
+    cursor.execute('''
+        INSERT INTO maintenance_state (name, value) VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value
+    ''', (name, value))
+
+
+def _sync_category_tables(conn, message_ids=None):
+    """
+    Sync category-specific tables from messages table
+
+    Only rows added since the last sync (messages.id above the stored
+    watermark) are copied, plus `message_ids` - rows whose job_type was just
+    fixed in place and so sit below the watermark. Each table is one
+    INSERT ... SELECT, so nothing is loaded into Python.
+
+    Returns: dict with rows added per table
+    """
+    cursor = conn.cursor()
+    # Category tables store bodies compressed, like DatabaseHandler does at ingest
+    from src.storage.compression import BodyCodec
+    conn.create_function('compress_body', 1, BodyCodec.load(conn).compress)
     
-    for msg in tech_messages:
-        cursor.execute('''
-            INSERT OR IGNORE INTO tech_jobs 
-            (message_id, group_name, group_link, sender, date, message_text,
-             keywords_found, account_used, job_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', msg)
+    last_id = _get_state(cursor, SYNC_WATERMARK)
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM messages')
+    max_id = cursor.fetchone()[0]
     
-    # Non-tech jobs
-    cursor.execute('''
-        SELECT message_id, group_name, group_link, sender, date, message_text,
-               keywords_found, account_used, job_type
-        FROM messages 
-        WHERE job_type = 'non_tech'
-    ''')
-    non_tech_messages = cursor.fetchall()
+    scope = 'm.id > ? AND m.id <= ?'
+    params = [last_id, max_id]
+    if message_ids:
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS resync_ids (message_id TEXT PRIMARY KEY)')
+        cursor.execute('DELETE FROM temp.resync_ids')
+        cursor.executemany('INSERT OR IGNORE INTO temp.resync_ids VALUES (?)',
+                           ((message_id,) for message_id in message_ids))
+        scope = f'(({scope}) OR m.message_id IN (SELECT message_id FROM temp.resync_ids))'
     
-    for msg in non_tech_messages:
-        cursor.execute('''
-            INSERT OR IGNORE INTO non_tech_jobs 
+    added = {}
+    for table_name, predicate in CATEGORY_FILTERS.items():
+        # Cross-posted copies stay out, as at ingest
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO {table_name}
             (message_id, group_name, group_link, sender, date, message_text,
-             keywords_found, account_used, job_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', msg)
+             keywords_found, account_used, job_location, job_type)
+            SELECT m.message_id, m.group_name, m.group_link, m.sender, m.date, compress_body(m.message_text),
+                   m.keywords_found, m.account_used, m.job_location, m.job_type
+            FROM messages m
+            WHERE {scope}
+              AND ({predicate})
+              AND (m.cluster_id IS NULL OR m.cluster_id = m.message_id)
+        ''', params)
+        added[table_name] = cursor.rowcount
     
-    # Freelance jobs
-    cursor.execute('''
-        SELECT message_id, group_name, group_link, sender, date, message_text,
-               keywords_found, account_used, job_type
-        FROM messages 
-        WHERE job_type LIKE '%freelance%'
-    ''')
-    freelance_messages = cursor.fetchall()
+    _set_state(cursor, SYNC_WATERMARK, max_id)
+    if message_ids:
+        cursor.execute('DROP TABLE temp.resync_ids')
     
-    for msg in freelance_messages:
-        cursor.execute('''
-            INSERT OR IGNORE INTO freelance_jobs 
-            (message_id, group_name, group_link, sender, date, message_text,
-             keywords_found, account_used, job_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', msg)
+    logger.debug(f"Category tables synced up to messages.id {max_id}: {added}")
+    return added
+
+
+def compress_category_bodies(db_path=None, batch_size=5000):
+    """
+    Compress category table bodies still stored as plain text
+    
+    Trains the first compression dictionary once enough messages exist, then
+    rewrites plain rows in batches (short transactions, so the fetcher can
+    write in between). Pages freed here are returned by the next vacuum.
+    
+    Returns: number of rows compressed
+    """
+    if db_path is None:
+        db_path = os.path.join(PATHS['database'], DATABASE['name'])
+    
+    from src.storage.compression import BodyCodec, MIN_COMPRESS_BYTES, train_dictionary
+    
+    try:
+        conn = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+        codec = BodyCodec.load(conn)
+        if not codec.dictionaries:
+            samples = [row[0] for row in conn.execute(
+                'SELECT message_text FROM messages WHERE message_text IS NOT NULL ORDER BY id DESC LIMIT 2000')]
+            if len(samples) >= 100:
+                codec_id, data = train_dictionary(samples)
+                BodyCodec.store_dictionary(conn, codec_id, data)
+                codec = BodyCodec.load(conn)
+                logger.info(f"Trained body compression dictionary ({len(data)} bytes)")
+        conn.create_function('compress_body', 1, codec.compress)
+        
+        compressed = 0
+        for table_name in CATEGORY_FILTERS:
+            max_id = conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table_name}').fetchone()[0]
+            for batch_start in range(0, max_id, batch_size):
+                # Bodies too short to shrink stay text; the length check skips them
+                cursor = conn.execute(f'''
+                    UPDATE {table_name} SET message_text = compress_body(message_text)
+                    WHERE id > ? AND id <= ?
+                      AND typeof(message_text) = 'text'
+                      AND length(CAST(message_text AS BLOB)) >= ?
+                ''', (batch_start, batch_start + batch_size, MIN_COMPRESS_BYTES))
+                compressed += cursor.rowcount
+        
+        conn.close()
+        if compressed:
+            logger.info(f"Compressed {compressed} category table bodies")
+        return compressed
     
-    logger.debug("Category tables synced")
+    except Exception as e:
+        logger.error(f"Error compressing message bodies: {e}")
+        return 0
 
 
 def backup_csv_file(path):
@@ -313,11 +399,273 @@ def sync_csv_with_database(db_path=None):
         return None
 
 
+def get_database_sizes(db_path=None):
+    """Database file, WAL and page statistics"""
+    if db_path is None:
+        db_path = os.path.join(PATHS['database'], DATABASE['name'])
+    
+    wal_path = f"{db_path}-wal"
+    sizes = {
+        'db_bytes': os.path.getsize(db_path) if os.path.exists(db_path) else 0,
+        'wal_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+    }
+    
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    try:
+        for pragma in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum'):
+            sizes[pragma] = conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+    finally:
+        conn.close()
+    return sizes
+
+
+def record_database_size(db_path=None):
+    """Append current sizes to data/metrics/db_size_history.jsonl and the gauges"""
+    sizes = get_database_sizes(db_path)
+    sizes['recorded_at'] = datetime.now().isoformat(timespec='seconds')
+    
+    metrics.gauge('db_file_bytes', 'telegram_jobs.db size on disk').set(sizes['db_bytes'])
+    metrics.gauge('db_wal_bytes', 'telegram_jobs.db-wal size on disk').set(sizes['wal_bytes'])
+    metrics.gauge('db_free_pages', 'Unused pages inside the database file').set(sizes['freelist_count'])
+    
+    os.makedirs(PATHS['metrics'], exist_ok=True)
+    with open(os.path.join(PATHS['metrics'], 'db_size_history.jsonl'), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(sizes) + '\n')
+    return sizes
+
+
+def get_database_size_history(limit=500):
+    """Most recent size records, oldest first"""
+    path = os.path.join(PATHS['metrics'], 'db_size_history.jsonl')
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()[-limit:]
+    history = []
+    for line in lines:
+        try:
+            history.append(json.loads(line))
+        except ValueError:
+            continue
+    return history
+
+
+def backup_database(db_path=None, backup_dir=None):
+    """
+    Online backup with the sqlite3 backup API
+    
+    Pages are copied in small steps with a pause in between. The source
+    connection holds one WAL read snapshot for the whole copy: writers keep
+    committing to the WAL meanwhile, and without the snapshot every one of
+    their commits would restart the backup from page 1. The copy is written
+    to a .partial file, checked, then renamed; old backups beyond
+    DB_MAINTENANCE['backup_keep'] are removed.
+    
+    Returns: backup path, or None on failure
+    """
+    if db_path is None:
+        db_path = os.path.join(PATHS['database'], DATABASE['name'])
+    if backup_dir is None:
+        backup_dir = PATHS['backups']
+    
+    os.makedirs(backup_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    backup_path = os.path.join(backup_dir, f"{name}.{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+    partial_path = f"{backup_path}.partial"
+    
+    steps = {'count': 0}
+    
+    def progress(status, remaining, total):
+        steps['count'] += 1
+        # backup(sleep=...) only applies when a step is BUSY; pace every step
+        if remaining:
+            time.sleep(DB_MAINTENANCE['backup_step_sleep'])
+    
+    source = dest = None
+    try:
+        started = time.perf_counter()
+        source = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+        source.execute('BEGIN')
+        source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        dest = sqlite3.connect(partial_path)
+        source.backup(dest, pages=DB_MAINTENANCE['backup_pages_per_step'], progress=progress)
+        source.execute('COMMIT')
+        
+        check = dest.execute('PRAGMA quick_check').fetchone()[0]
+        dest.close()
+        dest = None
+        if check != 'ok':
+            logger.error(f"Backup failed quick_check: {check}")
+            os.remove(partial_path)
+            return None
+        
+        os.replace(partial_path, backup_path)
+        elapsed = time.perf_counter() - started
+        metrics.histogram('db_backup_seconds', 'Online database backup duration').observe(elapsed)
+        logger.info(f"💾 Database backed up to {backup_path} "
+                    f"({os.path.getsize(backup_path) / 1e6:.1f}MB, {steps['count']} steps, {elapsed:.1f}s)")
+    except Exception as e:
+        logger.error(f"Error backing up database: {e}")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        return None
+    finally:
+        if dest:
+            dest.close()
+        if source:
+            source.close()
+    
+    # Keep only the newest backups (timestamped names sort chronologically)
+    backups = sorted(glob.glob(os.path.join(backup_dir, f"{name}.*.db")))
+    for old_backup in backups[:-DB_MAINTENANCE['backup_keep']]:
+        try:
+            os.remove(old_backup)
+            logger.debug(f"Deleted old backup: {old_backup}")
+        except OSError as e:
+            logger.debug(f"Error deleting backup {old_backup}: {e}")
+    
+    return backup_path
+
+
+def checkpoint_wal(conn):
+    """
+    Fold the WAL back into the database and truncate it
+    
+    TRUNCATE has to wait for readers, so the connection should have a short
+    busy timeout; if it cannot finish, a PASSIVE checkpoint copies what it
+    can without waiting and the next run tries again.
+    
+    Returns: (busy, wal_frames, checkpointed_frames)
+    """
+    busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+    if busy:
+        logger.debug("WAL checkpoint(TRUNCATE) busy, falling back to PASSIVE")
+        busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+    return busy, log_frames, checkpointed
+
+
+def compact_database(conn, allow_full_vacuum=False):
+    """
+    Return free pages to the OS
+    
+    Incremental vacuum only works once the file is in auto_vacuum=INCREMENTAL
+    mode (new databases are created that way). Switching an older file needs
+    one full VACUUM, which locks out writers - only done when
+    `allow_full_vacuum` (fetcher not running) and enough of the file is free.
+    
+    Returns: number of pages freed
+    """
+    auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    free_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    
+    if auto_vacuum == 2:
+        # execute() would step this pragma once, i.e. free a single page
+        conn.executescript(f"PRAGMA incremental_vacuum({DB_MAINTENANCE['incremental_vacuum_pages']});")
+    else:
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        if not allow_full_vacuum or not page_count or \
+                free_before / page_count < DB_MAINTENANCE['full_vacuum_free_ratio']:
+            return 0
+        logger.info(f"Converting database to incremental auto_vacuum ({free_before} free pages)...")
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+    
+    return free_before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+
+def run_database_maintenance(db_path=None, force=False, allow_full_vacuum=False):
+    """
+    Run whichever database tasks are due
+    
+    Cheap to call often (e.g. after every fetch cycle): each task runs only
+    when its interval in DB_MAINTENANCE has passed since it last ran; last
+    run times are kept in the maintenance_state table. Sizes are recorded on
+    every call.
+    
+    Returns: dict with the tasks that ran
+    """
+    if db_path is None:
+        db_path = os.path.join(PATHS['database'], DATABASE['name'])
+    
+    if not os.path.exists(db_path):
+        logger.error(f"Database not found: {db_path}")
+        return None
+    
+    intervals = {
+        'archive': ARCHIVE['interval_hours'] * 3600,
+        'backup': DB_MAINTENANCE['backup_interval_hours'] * 3600,
+        'checkpoint': DB_MAINTENANCE['checkpoint_interval_minutes'] * 60,
+        'optimize': DB_MAINTENANCE['optimize_interval_hours'] * 3600,
+        'vacuum': DB_MAINTENANCE['vacuum_interval_hours'] * 3600,
+        'trends': GROUP_TRENDS['prune_interval_hours'] * 3600,
+    }
+    results = {}
+    
+    try:
+        conn = sqlite3.connect(db_path, timeout=10.0, isolation_level=None)
+        cursor = conn.cursor()
+        now = int(time.time())
+        due = {}
+        for task, interval in intervals.items():
+            last_run = _get_state(cursor, f"db_{task}_last_run")
+            due[task] = force or now - last_run >= interval
+        
+        # Archive first: the pages it frees are reclaimed by the vacuum below
+        if due['archive'] and ARCHIVE['enabled']:
+            from src.storage.archive import archive_old_messages
+            results['archived'] = sum(archive_old_messages(db_path).values())
+            _set_state(cursor, 'db_archive_last_run', now)
+        
+        if due['trends'] and GROUP_TRENDS['enabled']:
+            cutoff_hour = now // 3600 - GROUP_TRENDS['retention_days'] * 24
+            cursor.execute('DELETE FROM group_activity WHERE hour < ?', (cutoff_hour,))
+            results['activity_pruned'] = cursor.rowcount
+            _set_state(cursor, 'db_trends_last_run', now)
+        
+        if due['backup']:
+            results['backup'] = backup_database(db_path)
+            if results['backup']:
+                _set_state(cursor, 'db_backup_last_run', now)
+        
+        if due['vacuum']:
+            results['pages_freed'] = compact_database(conn, allow_full_vacuum)
+            _set_state(cursor, 'db_vacuum_last_run', now)
+        
+        if due['optimize']:
+            conn.execute('PRAGMA optimize')
+            results['optimized'] = True
+            _set_state(cursor, 'db_optimize_last_run', now)
+        
+        # Last, so it also folds in the pages the tasks above wrote
+        if due['checkpoint']:
+            # A pending TRUNCATE holds off new writers: wait at most 1s for readers
+            conn.execute('PRAGMA busy_timeout=1000')
+            busy, log_frames, checkpointed = checkpoint_wal(conn)
+            results['checkpoint'] = {'busy': busy, 'wal_frames': log_frames, 'checkpointed': checkpointed}
+            if not busy:
+                _set_state(cursor, 'db_checkpoint_last_run', now)
+        
+        conn.close()
+        
+        results['sizes'] = record_database_size(db_path)
+        if len(results) > 1:
+            logger.info(f"🗄️ Database maintenance: {', '.join(k for k in results if k != 'sizes')} - "
+                        f"db {results['sizes']['db_bytes'] / 1e6:.1f}MB, "
+                        f"wal {results['sizes']['wal_bytes'] / 1e6:.1f}MB")
+        return results
+    
+    except Exception as e:
+        logger.error(f"Error in database maintenance: {e}")
+        return None
+
+
 def perform_maintenance():
     """
     Perform all maintenance tasks:
     1. Fix empty job types
     2. Sync CSV files with database
+    3. Compress category table bodies
+    4. Archive old messages, back up, checkpoint and compact the database
     
     Returns: dict with maintenance results
     """
@@ -339,6 +687,17 @@ def perform_maintenance():
     if csv_results:
         results['csv_sync'] = csv_results
     
+    # Step 3: Compress category table bodies written before compression
+    logger.info("Step 3: Compressing stored message bodies...")
+    results['bodies_compressed'] = compress_category_bodies()
+    
+    # Step 4: Archive, backup and compaction (fetcher is not running yet,
+    # so a one-off full VACUUM is allowed here)
+    logger.info("Step 4: Database archive, backup and compaction...")
+    db_results = run_database_maintenance(allow_full_vacuum=True)
+    if db_results:
+        results['database'] = db_results
+    
     logger.info("="*60)
     logger.info("✅ Maintenance Completed")
     logger.info("="*60)
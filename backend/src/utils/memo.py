@@ -0,0 +1,61 @@
+"""
+Thread-safe LRU for memoizing per-row work in the dashboard
+
+    cache = LRUCache(4096)
+    key = text_key(message_text)
+    result = cache.get(key)
+    if result is None:
+        result = cache.put(key, compute(message_text))
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def text_key(text):
+    """16-byte digest of a text: cache keys stay small however long the message"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class LRUCache:
+    """Bounded mapping that drops the least recently used entry (None is never cached)"""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value; returns it"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        """Returns: {'size', 'max_size', 'hits', 'misses', 'hit_rate'}"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
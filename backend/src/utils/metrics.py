@@ -0,0 +1,282 @@
+"""
+Lightweight timing/counter registry for hot-path instrumentation
+
+Usage:
+    from src.utils.metrics import metrics
+
+    with metrics.timer('classifier_classify_seconds'):
+        ...
+    metrics.counter('fetcher_messages_checked_total').inc()
+
+Histograms keep a bounded window of recent samples for p50/p95/p99 plus
+running count/sum, so recording is O(1) and memory stays flat. Snapshots can
+be dumped to JSON and rendered in Prometheus text format.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Number of recent samples kept per histogram for percentile estimates
+DEFAULT_WINDOW = 4096
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _nearest_rank(sorted_samples, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(q * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self, name, help_text=''):
+        self.name = name
+        self.help = help_text
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def snapshot(self):
+        return {'help': self.help, 'value': self._value}
+
+
+class Gauge:
+    """Value that can go up and down (queue depths, sizes)"""
+
+    def __init__(self, name, help_text=''):
+        self.name = name
+        self.help = help_text
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        self._value += amount
+
+    def dec(self, amount=1):
+        self._value -= amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def snapshot(self):
+        return {'help': self.help, 'value': self._value}
+
+
+class Histogram:
+    """Timing/size distribution with windowed percentiles"""
+
+    def __init__(self, name, help_text='', window=DEFAULT_WINDOW):
+        self.name = name
+        self.help = help_text
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._samples.append(value)
+            self._count += 1
+            self._sum += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def percentile(self, q):
+        """Nearest-rank percentile over the recent sample window"""
+        with self._lock:
+            samples = sorted(self._samples)
+        return _nearest_rank(samples, q)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self._count, self._sum
+            low, high = self._min, self._max
+
+        result = {
+            'help': self.help,
+            'count': count,
+            'sum': round(total, 6),
+            'min': round(low or 0.0, 6),
+            'max': round(high or 0.0, 6),
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = round(_nearest_rank(samples, q), 6)
+        return result
+
+
+class _Timer:
+    """Context manager that observes elapsed seconds into a histogram"""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.started = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.started
+        self.histogram.observe(self.elapsed)
+        return False
+
+
+class MetricsRegistry:
+    """Process-wide registry of named counters, gauges and histograms"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, help_text)
+                    self._metrics[name] = metric
+        return metric
+
+    def counter(self, name, help_text=''):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text=''):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text=''):
+        return self._get_or_create(Histogram, name, help_text)
+
+    def timer(self, name, help_text=''):
+        """Time a block: `with metrics.timer('x_seconds'):`"""
+        return _Timer(self.histogram(name, help_text))
+
+    def timed(self, name, help_text=''):
+        """Decorator version of timer() for plain functions/methods"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, help_text):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    async def timed_aiter(self, aiterable, name, help_text=''):
+        """Yield from an async iterator, timing each wait for the next item"""
+        histogram = self.histogram(name, help_text)
+        iterator = aiterable.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            histogram.observe(time.perf_counter() - started)
+            yield item
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def snapshot(self):
+        """Plain-dict view of all metrics (JSON serialisable)"""
+        result = {
+            'generated_at': datetime.now().isoformat(),
+            'counters': {},
+            'gauges': {},
+            'histograms': {},
+        }
+        for name, metric in sorted(self._metrics.items()):
+            if isinstance(metric, Counter):
+                result['counters'][name] = metric.snapshot()
+            elif isinstance(metric, Gauge):
+                result['gauges'][name] = metric.snapshot()
+            else:
+                result['histograms'][name] = metric.snapshot()
+        return result
+
+    def dump_json(self, path):
+        """Write a snapshot atomically (readers never see a partial file)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _label_text(labels, **extra):
+    pairs = {**(labels or {}), **extra}
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in pairs.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(pairs, escaped)) + '}'
+
+
+def render_prometheus(*snapshots):
+    """
+    Render registry snapshots in Prometheus text exposition format
+
+    Each argument is a snapshot or a (labels, snapshot) pair, e.g.
+    ({'worker': 'w1'}, snapshot). A metric found in several snapshots gets
+    one HELP/TYPE header and one labelled series per snapshot.
+    """
+    families = {}  # name -> (type, help, [(labels, data)]), first-seen order
+    for entry in snapshots:
+        labels, snapshot = entry if isinstance(entry, tuple) else (None, entry)
+        for section, kind in (('counters', 'counter'), ('gauges', 'gauge'), ('histograms', 'summary')):
+            for name, data in snapshot.get(section, {}).items():
+                family = families.setdefault(name, (kind, data.get('help'), []))
+                family[2].append((labels, data))
+
+    lines = []
+    for name, (kind, help_text, series) in families.items():
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, data in series:
+            if kind != 'summary':
+                lines.append(f"{name}{_label_text(labels)} {data['value']}")
+                continue
+            for q in QUANTILES:
+                lines.append(f'{name}{_label_text(labels, quantile=q)} {data.get(f"p{int(q * 100)}", 0.0)}')
+            lines.append(f"{name}_sum{_label_text(labels)} {data['sum']}")
+            lines.append(f"{name}_count{_label_text(labels)} {data['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+
+# Shared default registry
+metrics = MetricsRegistry()
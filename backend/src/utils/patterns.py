@@ -0,0 +1,226 @@
+"""
+Shared regex registry
+
+Every pattern JobQualityScorer, JobVerifier and LinkExtractor match with is
+compiled once, here, at import. Identical patterns (same regex and flags)
+share one compiled entry, so the email pattern the verifier reads contacts
+with is the one the link extractor uses.
+
+    from src.utils.patterns import patterns
+    match = patterns['email'].search(text)
+    for pattern in patterns.group('verifier.salary'):
+        ...
+
+Each entry counts calls, hits and cumulative match time; patterns.stats()
+lists them, slowest first, for tuning.
+"""
+import re
+import threading
+import time
+
+I = re.IGNORECASE
+
+# Shared between modules
+EMAIL = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
+URL = r'https?://[^\s<>"{}|\\^`\[\]]+'
+WHITESPACE = r'\s+'
+
+INDIAN_CITIES_RE = (r'\b(bangalore|bengaluru|mumbai|delhi|ncr|pune|hyderabad|chennai|kolkata|ahmedabad|gurgaon|'
+                    r'gurugram|noida|jaipur|lucknow|chandigarh|kochi|thiruvananthapuram|indore|bhopal|nagpur|'
+                    r'surat|vadodara|rajkot)\b')
+
+# Ordered groups: callers try them in order and take the first match
+GROUPS = {
+    # JobQualityScorer
+    'scorer.company': ([
+        r'\b(company|organization|firm|startup|corp|inc|ltd|pvt|limited)\b',
+        r'\b([A-Z][a-z]+\s+(?:Technologies|Solutions|Systems|Software|Labs|Studios|Digital|Group|Services))\b',
+        r'(?:^|\n)([A-Z][A-Z\s&]+(?:Technologies|Solutions|Systems|Software|Labs|Studios|Digital|Group|Services))',
+    ], I),
+    'scorer.salary': ([
+        r'\b\d+[\s-]*(?:lpa|lakh|lakhs|k|thousand)\b',
+        r'(?:₹|rs\.?|inr)\s*\d+',
+        r'\$\s*\d+',
+        r'\b(?:salary|ctc|package|stipend)[\s:]*(?:₹|rs\.?|inr|\$)?\s*\d+',
+        r'\b\d+[\s-]*(?:to|-)[\s-]*\d+[\s-]*(?:lpa|lakh|lakhs|k)\b',
+    ], I),
+    'scorer.location': ([
+        INDIAN_CITIES_RE,
+        r'\b(india|usa|uk|singapore|dubai|uae|canada|australia|germany|netherlands|europe)\b',
+        r'(?:location|based in|office in)[\s:]*([a-z\s,]+)',
+    ], I),
+    'scorer.remote': ([
+        r'\b(remote|wfh|work from home|work-from-home|hybrid)\b',
+    ], I),
+    'scorer.skills': ([
+        r'\b(python|java|javascript|react|node|angular|vue|django|flask|spring|aws|azure|gcp|docker|kubernetes|'
+        r'sql|mongodb|postgresql|mysql|redis|kafka|spark|hadoop)\b',
+        r'\b(html|css|typescript|golang|rust|ruby|php|swift|kotlin|scala|c\+\+|\.net|laravel)\b',
+        r'\b(communication|leadership|management|sales|marketing|design|content|seo|digital marketing|'
+        r'social media|customer service|hr|finance|accounting|operations)\b',
+        r'(?:skills?|technologies?|experience in|proficiency in)[\s:]*([a-z,\s&/]+)',
+    ], I),
+    # URLs only, not emails
+    'scorer.apply_link': ([
+        r'(https?://\S+)',
+        r'(www\.\S+\.[a-z]{2,})',
+    ], I),
+
+    # JobVerifier
+    'verifier.company': ([
+        r'(?:company|firm|organization|org)[\s:]+([A-Z][A-Za-z0-9\s&\.]+)',
+        r'([A-Z][A-Za-z0-9\s&\.]+)(?:\s+is\s+hiring|\s+hiring|\s+looking for)',
+        r'(?:join|at|@)\s+([A-Z][A-Za-z0-9\s&\.]+)',
+    ], I),
+    'verifier.website': ([
+        r'(https?://(?:www\.)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,})',
+        r'(?:website|site|web)[\s:]+([a-zA-Z0-9-]+\.[a-zA-Z]{2,})',
+    ], I),
+    'verifier.linkedin': ([
+        r'(https?://(?:www\.)?linkedin\.com/company/[a-zA-Z0-9-]+)',
+        r'linkedin[\s:]+([a-zA-Z0-9-]+)',
+    ], I),
+    'verifier.contact': ([
+        r'(\+?\d{10,13})',  # Phone numbers
+        EMAIL,
+        r'(?:contact|call|whatsapp)[\s:]+(\+?\d{10,13})',
+    ], I),
+    'verifier.salary': ([
+        r'(?:salary|ctc|package)[\s:]*₹?\s*(\d+[\d,]*)\s*(?:to|-)\s*₹?\s*(\d+[\d,]*)',
+        r'₹\s*(\d+[\d,]*)\s*(?:to|-)\s*₹?\s*(\d+[\d,]*)',
+        r'(\d+)\s*(?:LPA|lpa|lakh|lakhs)',
+    ], I),
+    'verifier.experience': ([
+        r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s+)?(?:experience|exp)',
+        r'(?:experience|exp)[\s:]*(\d+)\+?\s*(?:years?|yrs?)',
+        r'(\d+)\s*(?:to|-)\s*(\d+)\s*(?:years?|yrs?)',
+    ], I),
+    'verifier.location': ([
+        r'(?:location|based in|office in|📍)[\s:]*([a-zA-Z\s,]+)',
+        r'📍\s*([a-zA-Z\s,]+)',
+    ], I),
+}
+
+# Single patterns
+SINGLE = {
+    'email': (EMAIL, I),  # Same flags as verifier.contact, so both share one entry (no effect on matches)
+    'url': (URL, I),
+    'whitespace': (WHITESPACE, 0),
+}
+
+
+class TrackedPattern:
+    """Compiled pattern that counts calls, hits and match time"""
+
+    def __init__(self, pattern, flags=0):
+        self.regex = re.compile(pattern, flags)
+        self.names = []
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _record(self, started, hit):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.calls += 1
+            self.hits += bool(hit)
+            self.seconds += elapsed
+
+    def search(self, text):
+        started = time.perf_counter()
+        match = self.regex.search(text)
+        self._record(started, match)
+        return match
+
+    def findall(self, text):
+        started = time.perf_counter()
+        found = self.regex.findall(text)
+        self._record(started, found)
+        return found
+
+    def sub(self, replacement, text):
+        started = time.perf_counter()
+        result, count = self.regex.subn(replacement, text)
+        self._record(started, count)
+        return result
+
+
+class PatternRegistry:
+    """Named, compiled-once patterns with per-pattern stats"""
+
+    def __init__(self):
+        self._by_name = {}
+        self._by_key = {}  # (regex, flags) -> TrackedPattern
+        self._groups = {}
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __len__(self):
+        """Distinct compiled patterns"""
+        return len(self._by_key)
+
+    def register(self, name, pattern, flags=0):
+        """
+        Compile pattern under name; identical pattern + flags share one entry,
+        so registering again (e.g. from a second instance) compiles nothing
+
+        Returns: TrackedPattern
+        """
+        tracked = self._by_key.get((pattern, flags))
+        if tracked is None:
+            tracked = self._by_key[(pattern, flags)] = TrackedPattern(pattern, flags)
+        if name not in tracked.names:
+            tracked.names.append(name)
+        self._by_name[name] = tracked
+        return tracked
+
+    def register_group(self, name, regexes, flags=0):
+        """Ordered list of patterns, entries named name.0, name.1, ..."""
+        self._groups[name] = [self.register(f'{name}.{index}', pattern, flags)
+                              for index, pattern in enumerate(regexes)]
+        return self._groups[name]
+
+    def group(self, name):
+        return self._groups[name]
+
+    def stats(self, reset=False):
+        """
+        Returns: per compiled pattern {'names', 'pattern', 'calls', 'hits', 'hit_rate', 'seconds'}, slowest first
+
+        reset: zero the counters; each entry is read and reset under its lock,
+        so matches from other threads land in this report or the next one
+        """
+        rows = []
+        for tracked in self._by_key.values():
+            with tracked._lock:
+                calls, hits, seconds = tracked.calls, tracked.hits, tracked.seconds
+                if reset:
+                    tracked.calls = tracked.hits = 0
+                    tracked.seconds = 0.0
+            rows.append({
+                'names': list(tracked.names),
+                'pattern': tracked.regex.pattern,
+                'calls': calls,
+                'hits': hits,
+                'hit_rate': hits / calls if calls else None,
+                'seconds': seconds,
+            })
+        return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+    def reset_stats(self):
+        self.stats(reset=True)
+
+
+def _build_registry():
+    registry = PatternRegistry()
+    for name, (pattern, flags) in SINGLE.items():
+        registry.register(name, pattern, flags)
+    for name, (regexes, flags) in GROUPS.items():
+        registry.register_group(name, regexes, flags)
+    return registry
+
+
+# Shared registry, compiled at import
+patterns = _build_registry()
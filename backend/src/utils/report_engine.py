@@ -0,0 +1,290 @@
+"""
+Report engine for generate_report
+
+build_report() never scans messages. The totals, job type breakdown, top
+groups and per-group export are all folded in Python from one read of
+message_counts - rows per (group_link, group_name, job_type), kept exact by
+triggers on messages (migration 10) - so their cost depends on the number
+of groups, not messages. The remaining sections are index ranges: the
+daily trend over idx_messages_date, recent activity over
+idx_messages_created_at, keywords over the covering indexes of
+message_keywords.
+
+The result is a plain dict; render_text / render_csv / render_json turn the
+same dict into the three output formats.
+
+    with messages_view() as conn:
+        report = build_report(conn, days=7)
+    print(render_text(report))
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+TOP_GROUPS = 10
+TOP_KEYWORDS = 20
+TREND_KEYWORDS = 5
+PROFILE_GROUPS = 5
+PROFILE_KEYWORDS = 5
+
+
+def _has_view(cursor, name):
+    return cursor.execute("SELECT 1 FROM sqlite_temp_master WHERE type = 'view' AND name = ?",
+                          (name,)).fetchone() is not None
+
+
+def _keyword_sections(cursor, cutoff_date, top_groups):
+    """Top keywords, plus their daily trend and the top groups' keywords since cutoff_date"""
+    if not _has_view(cursor, 'all_message_keywords'):
+        return [], [], {}
+
+    cursor.execute(f"""
+        SELECT k.keyword, top.count
+        FROM (
+            SELECT keyword_id, COUNT(*) AS count
+            FROM all_message_keywords
+            GROUP BY keyword_id
+            ORDER BY count DESC
+            LIMIT {TOP_KEYWORDS}
+        ) top
+        JOIN keywords k ON k.keyword_id = top.keyword_id
+        ORDER BY top.count DESC
+    """)
+    top_keywords = [{'keyword': kw, 'count': count} for kw, count in cursor.fetchall()]
+
+    keyword_trend = []
+    trend_keywords = [row['keyword'] for row in top_keywords[:TREND_KEYWORDS]]
+    if trend_keywords:
+        placeholders = ', '.join('?' * len(trend_keywords))
+        cursor.execute(f"""
+            SELECT DATE(m.date) AS day, k.keyword, COUNT(*)
+            FROM all_messages m
+            JOIN all_message_keywords mk ON mk.message_rowid = m.id
+            JOIN keywords k ON k.keyword_id = mk.keyword_id
+            WHERE m.date >= ? AND k.keyword IN ({placeholders})
+            GROUP BY day, k.keyword
+            ORDER BY day DESC
+        """, (cutoff_date, *trend_keywords))
+        by_day = {}
+        for day, kw, count in cursor.fetchall():
+            by_day.setdefault(day, {kw: 0 for kw in trend_keywords})[kw] = count
+        keyword_trend = [{'day': day, 'counts': counts} for day, counts in by_day.items()]
+
+    group_keywords = {}
+    for name in top_groups[:PROFILE_GROUPS]:
+        cursor.execute(f"""
+            SELECT k.keyword, COUNT(*) AS count
+            FROM all_messages m
+            JOIN all_message_keywords mk ON mk.message_rowid = m.id
+            JOIN keywords k ON k.keyword_id = mk.keyword_id
+            WHERE m.group_name = ? AND m.date >= ?
+            GROUP BY mk.keyword_id
+            ORDER BY count DESC
+            LIMIT {PROFILE_KEYWORDS}
+        """, (name, cutoff_date))
+        group_keywords[name] = [{'keyword': kw, 'count': count} for kw, count in cursor.fetchall()]
+
+    return top_keywords, keyword_trend, group_keywords
+
+
+def build_report(conn, days=7, now=None):
+    """
+    Compute every report section
+
+    conn: connection with the all_messages, all_message_counts and
+    all_message_keywords views (src.storage.archive.messages_view)
+
+    Returns: dict with summary, job_types, top_groups, daily_trend, top_keywords,
+    keyword_trend, group_keywords, accounts, recent_24h and groups (the
+    per-group export)
+    """
+    now = now or datetime.now()
+    cutoff_date = (now - timedelta(days=days)).strftime('%Y-%m-%d')
+    cutoff_time = (now - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT group_link, group_name, job_type, count, last_date FROM all_message_counts")
+
+    total = 0
+    by_type = {}
+    by_group_name = {}
+    by_link = {}
+    for group_link, group_name, job_type, count, last_date in cursor.fetchall():
+        total += count
+        by_type[job_type] = by_type.get(job_type, 0) + count
+        by_group_name[group_name] = by_group_name.get(group_name, 0) + count
+        link = by_link.setdefault(group_link, [0, None])
+        link[0] += count
+        if last_date is not None and (link[1] is None or last_date > link[1]):
+            link[1] = last_date
+
+    cursor.execute("SELECT COUNT(*) FROM all_messages WHERE created_at >= ?", (cutoff_time,))
+    recent = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT DATE(date) AS day, COUNT(*)
+        FROM all_messages
+        WHERE date >= ?
+        GROUP BY day
+        ORDER BY day DESC
+    """, (cutoff_date,))
+    daily_trend = [{'day': day, 'count': count} for day, count in cursor.fetchall()]
+
+    cursor.execute("SELECT group_name, group_link, join_date FROM groups")
+    joined_groups = cursor.fetchall()
+
+    # Every joined group with its job count (joined on group_link in Python,
+    # so no messages/groups join is needed)
+    groups = []
+    for group_name, group_link, join_date in joined_groups:
+        job_count, last_job_date = by_link.get(group_link, (0, None))
+        groups.append({'group_name': group_name, 'group_link': group_link, 'job_count': job_count,
+                       'last_job_date': last_job_date, 'join_date': join_date})
+    groups.sort(key=lambda g: g['job_count'], reverse=True)
+
+    top_groups = sorted(by_group_name.items(), key=lambda item: item[1], reverse=True)[:TOP_GROUPS]
+    top_keywords, keyword_trend, group_keywords = _keyword_sections(
+        cursor, cutoff_date, [name for name, _ in top_groups])
+
+    cursor.execute("""
+        SELECT account_name,
+               SUM(groups_joined) as total_groups,
+               SUM(messages_fetched) as total_messages
+        FROM account_usage
+        GROUP BY account_name
+    """)
+    accounts = [{'account': account, 'groups': groups_joined or 0, 'messages': messages or 0}
+                for account, groups_joined, messages in cursor.fetchall()]
+
+    return {
+        'generated_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+        'days': days,
+        'summary': {
+            'total_messages': total,
+            'active_groups': len(by_group_name),
+            'total_groups': len(joined_groups),
+        },
+        'job_types': [{'job_type': job_type, 'count': count,
+                       'percentage': round(count / total * 100, 2) if total else 0}
+                      for job_type, count in sorted(by_type.items(), key=lambda item: item[1], reverse=True)],
+        'top_groups': [{'group_name': name, 'job_count': count} for name, count in top_groups],
+        'daily_trend': daily_trend,
+        'top_keywords': top_keywords,
+        'keyword_trend': keyword_trend,
+        'group_keywords': group_keywords,
+        'accounts': accounts,
+        'recent_24h': recent,
+        'groups': groups,
+    }
+
+
+def render_text(report):
+    """The human-readable report"""
+    lines = []
+    rule = "-"*70
+
+    lines += ["="*70, "TELEGRAM JOB FETCHER - COMPREHENSIVE REPORT",
+              f"Generated: {report['generated_at']}", "="*70, ""]
+
+    summary = report['summary']
+    lines += ["📊 SUMMARY STATISTICS", rule,
+              f"Total Job Messages: {summary['total_messages']}",
+              f"Active Groups with Jobs: {summary['active_groups']}",
+              f"Total Groups Joined: {summary['total_groups']}", ""]
+
+    lines += ["📈 JOB TYPE BREAKDOWN", rule]
+    for row in report['job_types']:
+        lines.append(f"{str(row['job_type']):20s}: {row['count']:5d} ({row['percentage']:5.2f}%)")
+    lines.append("")
+
+    lines += ["🏆 TOP 10 GROUPS BY JOB COUNT", rule]
+    for i, row in enumerate(report['top_groups'], 1):
+        lines.append(f"{i:2d}. {str(row['group_name']):40s}: {row['job_count']:4d} jobs")
+    lines.append("")
+
+    lines += [f"📅 DAILY TREND (LAST {report['days']} DAYS)", rule]
+    lines += [f"{row['day']}: {row['count']:4d} jobs" for row in report['daily_trend']] or ["No data available"]
+    lines.append("")
+
+    lines += ["🔑 TOP KEYWORDS FOUND", rule]
+    lines += [f"{row['keyword']:30s}: {row['count']:4d}" for row in report['top_keywords']]
+    lines.append("")
+
+    lines += [f"📈 KEYWORD TREND (TOP 5, LAST {report['days']} DAYS)", rule]
+    if report['keyword_trend']:
+        keywords = list(report['keyword_trend'][0]['counts'])
+        lines.append(f"{'day':12s}" + ''.join(f"{kw[:14]:>15s}" for kw in keywords))
+        for row in report['keyword_trend']:
+            lines.append(f"{row['day']:12s}" + ''.join(f"{row['counts'][kw]:15d}" for kw in keywords))
+    else:
+        lines.append("No data available")
+    lines.append("")
+
+    lines += [f"🧭 KEYWORD PROFILE OF TOP 5 GROUPS (LAST {report['days']} DAYS)", rule]
+    for name, profile in report['group_keywords'].items():
+        text = ', '.join(f"{row['keyword']} ({row['count']})" for row in profile)
+        lines.append(f"{str(name)[:30]:30s}: {text or '-'}")
+    lines.append("")
+
+    lines += ["👥 ACCOUNT USAGE SUMMARY", rule]
+    for row in report['accounts']:
+        lines.append(f"{row['account']:20s}: {row['groups']:3d} groups, {row['messages']:5d} messages")
+    lines.append("")
+
+    lines += ["🕒 RECENT ACTIVITY (Last 24 hours)", rule,
+              f"New jobs in last 24h: {report['recent_24h']}", ""]
+
+    lines += ["="*70, "END OF REPORT", "="*70]
+    return '\n'.join(lines) + '\n'
+
+
+def render_csv(report):
+    """Every section as section,key,value rows"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['section', 'key', 'value'])
+    writer.writerow(['meta', 'generated_at', report['generated_at']])
+    writer.writerow(['meta', 'days', report['days']])
+    for key, value in report['summary'].items():
+        writer.writerow(['summary', key, value])
+    for row in report['job_types']:
+        writer.writerow(['job_types', row['job_type'], row['count']])
+    for row in report['top_groups']:
+        writer.writerow(['top_groups', row['group_name'], row['job_count']])
+    for row in report['daily_trend']:
+        writer.writerow(['daily_trend', row['day'], row['count']])
+    for row in report['top_keywords']:
+        writer.writerow(['top_keywords', row['keyword'], row['count']])
+    for row in report['keyword_trend']:
+        for kw, count in row['counts'].items():
+            writer.writerow(['keyword_trend', f"{row['day']}|{kw}", count])
+    for name, profile in report['group_keywords'].items():
+        for row in profile:
+            writer.writerow(['group_keywords', f"{name}|{row['keyword']}", row['count']])
+    for row in report['accounts']:
+        writer.writerow(['accounts', row['account'], row['messages']])
+    writer.writerow(['recent', 'jobs_last_24h', report['recent_24h']])
+    return out.getvalue()
+
+
+def render_json(report):
+    return json.dumps(report, indent=2, ensure_ascii=False)
+
+
+def render_top_groups_csv(report):
+    """Per-group export: every joined group with its job count"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['Group Name', 'Group Link', 'Job Count', 'Last Job Date', 'Join Date'])
+    for group in report['groups']:
+        writer.writerow([group['group_name'], group['group_link'], group['job_count'],
+                         group['last_job_date'], group['join_date']])
+    return out.getvalue()
+
+
+RENDERERS = {
+    'text': ('txt', render_text),
+    'csv': ('csv', render_csv),
+    'json': ('json', render_json),
+}
@@ -1,12 +1,14 @@
 """
 Patch Telethon's SQLite session to use WAL mode and proper timeouts
 This prevents database lock errors during disconnect
+
+Telethon is imported only when the patch is applied, so read-only tools that
+happen to import this module do not pay for loading Telethon.
 """
 import sqlite3
-from telethon.sessions import SQLiteSession
 
-# Store original _execute method
-_original_execute = SQLiteSession._execute
+# Store original _execute method (set when the patch is applied)
+_original_execute = None
 
 def _patched_execute(self, stmt, *values):
     """Patched execute that ensures WAL mode and timeout"""
@@ -27,10 +29,13 @@ def _patched_execute(self, stmt, *values):
     return _original_execute(self, stmt, *values)
 
 def patch_telethon_sessions():
-    """Apply the patch to Telethon's SQLiteSession"""
+    """Apply the patch to Telethon's SQLiteSession (idempotent)"""
+    global _original_execute
+    from telethon.sessions import SQLiteSession
+    
+    if _original_execute is not None:
+        return
+    
+    _original_execute = SQLiteSession._execute
     SQLiteSession._execute = _patched_execute
     print("✅ Telethon session patch applied (WAL mode + timeout)")
-
-# Auto-patch on import
-patch_telethon_sessions()
-